@@ -0,0 +1,225 @@
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+
+from untappd_miner.pipeline import ParsePool
+from untappd_miner.ratings import RatingStore
+from untappd_miner.untappd_miner import BeerRating
+
+from .fake_server import FakeUntappd, quiet
+
+
+# Extractor spans recorded by the miner metrics
+EXTRACTORS = [
+    "brewery_baseinfo_from_tr_page",
+    "brewery_description",
+    "brewery_checkin_stats",
+    "brewery_locations",
+    "brewery_top_beers",
+    "brewery_popular_locations",
+    "beers_from_beer_list",
+]
+
+
+def bench_parse(server: FakeUntappd, html_parser: str, repeat: int) -> dict:
+    # Parse latency of a brewery page (full vs scoped) and per extractor, in ms
+    miner = server.miner("untappd-miner-bench", html_parser=html_parser)
+    html = server.render("/brewery-canada-micro-brewery-0")
+    results = {"brewery_page_kb": len(html) / 1024}
+    with quiet():
+        for scoped in (False, True):
+            miner.scoped_parsing = scoped
+            start = time.perf_counter()
+            for _ in range(repeat):
+                miner._brewery_home_soup(html)
+            results[f"parse_{'scoped' if scoped else 'full'}_ms"] = (time.perf_counter() - start) / repeat * 1000
+
+        soup = miner._brewery_home_soup(html)
+        miner.metrics.reset()
+        for _ in range(repeat):
+            miner._brewery_details_from_home_page(soup)
+        tr_soup = miner.parse_html(server.render("/brewery/top_rated", "country=canada&brewery_type=micro-brewery"))
+        beer_soup = miner.parse_html(server.render("/brewery-canada-micro-brewery-0/beer"))
+        for _ in range(repeat):
+            miner._brewery_baseinfo_from_tr_page(tr_soup, "canada")
+            miner._beers_from_beer_list(beer_soup, "brewery-canada-micro-brewery-0")
+
+    for method in EXTRACTORS:
+        timing = miner.metrics.timing("extract", method=method)
+        results[f"extract_{method}_ms"] = timing.total / timing.count * 1000
+    return results
+
+
+def bench_fetch(server: FakeUntappd, html_parser: str, n_pages: int, max_concurrency: int) -> dict:
+    # Raw page throughput of the sync and async clients
+    miner = server.miner("untappd-miner-bench", html_parser=html_parser)
+    urls = [f"{server.url}/brewery-canada-micro-brewery-{i}" for i in range(n_pages)]
+    with quiet():
+        start = time.perf_counter()
+        for url in urls:
+            miner.fetch_url(url)
+        sync_elapsed = time.perf_counter() - start
+
+        async def fetch_all() -> None:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            async def fetch(url: str) -> None:
+                async with semaphore:
+                    await miner.afetch_url(url)
+            async with miner.async_session():
+                await asyncio.gather(*[fetch(url) for url in urls])
+
+        start = time.perf_counter()
+        asyncio.run(fetch_all())
+        async_elapsed = time.perf_counter() - start
+    return {"sync_pages_per_s": n_pages / sync_elapsed, "async_pages_per_s": n_pages / async_elapsed}
+
+
+def bench_crawl(server: FakeUntappd, html_parser: str, max_concurrency: int, parse_workers: int = 0) -> dict:
+    # End-to-end top-rated crawl, then the full beer list of one brewery
+    results = {}
+    modes = ["sync", "async"] + (["async_pool"] if parse_workers else [])
+    for mode in modes:
+        miner = server.miner("untappd-miner-bench", html_parser=html_parser)
+        if mode == "async_pool":
+            miner.parse_pool = ParsePool(workers=parse_workers, html_parser=html_parser)
+        server.hits.clear()
+        with quiet():
+            start = time.perf_counter()
+            if mode == "sync":
+                breweries = miner.get_top_rated_breweries()
+            else:
+                breweries = asyncio.run(miner.aget_top_rated_breweries(max_concurrency=max_concurrency))
+            elapsed = time.perf_counter() - start
+        if miner.parse_pool is not None:
+            miner.parse_pool.close()
+        results[f"{mode}_breweries"] = len(breweries)
+        results[f"{mode}_breweries_per_s"] = len(breweries) / elapsed
+        results[f"{mode}_pages_per_s"] = sum(server.hits.values()) / elapsed
+        results[f"{mode}_connection_reuse"] = miner.transport_stats.summary()["reuse_ratio"]
+        results[f"{mode}_stage_seconds"] = {
+            stage: round(s["seconds"], 4) for stage, s in miner.metrics.summary().items()
+        }
+
+    miner = server.miner("untappd-miner-bench", html_parser=html_parser)
+    with quiet():
+        start = time.perf_counter()
+        beers = miner.all_beers_from_brewery("brewery-canada-micro-brewery-0", max_concurrency=max_concurrency)
+        elapsed = time.perf_counter() - start
+    results["beer_list_beers"] = len(beers)
+    results["beer_list_beers_per_s"] = len(beers) / elapsed
+    return results
+
+
+def bench_memory(server: FakeUntappd, html_parser: str, n_ratings: int) -> dict:
+    # Bytes still allocated per entity once the crawl is over
+    results = {}
+    miner = server.miner("untappd-miner-bench", html_parser=html_parser)
+    with quiet():
+        miner.get_top_rated_breweries()    # Warm up imports and caches
+        miner.breweries.clear()
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        miner.get_top_rated_breweries()
+        gc.collect()
+        results["bytes_per_brewery"] = (tracemalloc.get_traced_memory()[0] - baseline) / len(miner.breweries)
+
+        baseline = tracemalloc.get_traced_memory()[0]
+        beers = miner.all_beers_from_brewery("brewery-canada-micro-brewery-0")
+        gc.collect()
+        results["bytes_per_beer"] = (tracemalloc.get_traced_memory()[0] - baseline) / len(beers)
+
+    start = datetime(2023, 1, 1)
+    ratings = [
+        BeerRating(
+            user_id=f"drinker{i % 5000}",
+            checkin_venue=f"/v/bar-{i % 300}/{i % 300}",
+            serving_type="Draft",
+            comment="",
+            purchased_at=None,
+            number_tagged_friends=0,
+            has_picture=i % 3 == 0,
+            checkin_time=start + timedelta(minutes=i),
+        )
+        for i in range(n_ratings)
+    ]
+    gc.collect()
+    baseline = tracemalloc.get_traced_memory()[0]
+    store = RatingStore(ratings)
+    gc.collect()
+    results["bytes_per_rating_store"] = (tracemalloc.get_traced_memory()[0] - baseline) / len(store)
+    del store
+    gc.collect()
+    baseline = tracemalloc.get_traced_memory()[0]
+    rating_list = [BeerRating(**{f: getattr(r, f) for f in BeerRating.__slots__}) for r in ratings]
+    gc.collect()
+    results["bytes_per_rating_list"] = (tracemalloc.get_traced_memory()[0] - baseline) / len(rating_list)
+    tracemalloc.stop()
+    return results
+
+
+def run(
+    html_parser: str = "html.parser",
+    breweries_per_page: int = 10,
+    latency: float = 0.0,
+    repeat: int = 20,
+    max_concurrency: int = 10,
+    n_ratings: int = 10_000,
+    parse_workers: int = 0,
+) -> dict:
+    with FakeUntappd(breweries_per_page=breweries_per_page, latency=latency) as server:
+        return {
+            "config": {
+                "html_parser": html_parser,
+                "breweries_per_page": breweries_per_page,
+                "latency": latency,
+                "max_concurrency": max_concurrency,
+                "parse_workers": parse_workers,
+            },
+            "parse": bench_parse(server, html_parser, repeat),
+            "fetch": bench_fetch(server, html_parser, n_pages=breweries_per_page * 5, max_concurrency=max_concurrency),
+            "crawl": bench_crawl(server, html_parser, max_concurrency, parse_workers),
+            "memory": bench_memory(server, html_parser, n_ratings),
+        }
+
+
+def print_results(results: dict) -> None:
+    for section, values in results.items():
+        print(f"[{section}]")
+        for key, value in values.items():
+            print(f"  {key:<36} {value:,.3f}" if isinstance(value, float) else f"  {key:<36} {value}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a local stand-in for untappd.com")
+    parser.add_argument("--parser", default="html.parser", help="bs4 tree builder, e.g. lxml")
+    parser.add_argument("--breweries-per-page", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--repeat", type=int, default=20, help="iterations of the parse benchmarks")
+    parser.add_argument("--max-concurrency", type=int, default=10)
+    parser.add_argument("--ratings", type=int, default=10_000, help="ratings of the memory benchmark")
+    parser.add_argument("--parse-workers", type=int, default=0, help="also crawl with a ParsePool of this size")
+    parser.add_argument("--json", help="also write the results to this file, to diff runs")
+    args = parser.parse_args(argv)
+
+    results = run(
+        html_parser=args.parser,
+        breweries_per_page=args.breweries_per_page,
+        latency=args.latency,
+        repeat=args.repeat,
+        max_concurrency=args.max_concurrency,
+        n_ratings=args.ratings,
+        parse_workers=args.parse_workers,
+    )
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
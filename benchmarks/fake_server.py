@@ -0,0 +1,387 @@
+from collections import Counter
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+from urllib.parse import parse_qs, urlsplit
+import os
+import re
+import threading
+import time
+import zlib
+
+from untappd_miner import UntappdWebMiner
+from untappd_miner.lookups import LookupTables
+from untappd_miner.rate_limit import HostRateLimiter
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+COUNTRIES = {"canada": "Montreal, QC Canada", "belgium": "Bruges, West Flanders Belgium", "united-states": "Portland, OR United States"}
+BREWERY_TYPES = {"micro-brewery": "Micro Brewery", "brew-pub": "Brew Pub", "meadery": "Meadery"}
+EMPTY_BREWERY_TYPES = {"meadery"}    # Served with the "no activity" placeholder
+POPULAR_VENUES = 3    # Listed by every brewery page, as the big beer bars are
+STYLES = ["IPA - New England / Hazy", "Stout - Imperial / Double", "Sour - Fruited", "Lager - Pilsner"]
+
+ROUTES = [
+    ("top_rated", re.compile(r"^/brewery/top_rated$")),
+    ("more_beer", re.compile(r"^/brewery/more_beer/(?P<num_id>\d+)/(?P<offset>\d+)$")),
+    ("beer_list", re.compile(r"^/(?P<brewery>brewery-[\w-]+)/beer$")),
+    ("brewery", re.compile(r"^/(?P<brewery>brewery-[\w-]+)$")),
+    ("venue", re.compile(r"^/v/(?P<slug>[\w-]+)/(?P<venue_id>\d+)$")),
+    ("beer", re.compile(r"^/b/(?P<slug>[\w-]+)/(?P<bid>\d+)$")),
+    ("more_feed", re.compile(r"^/beer/more_feed/(?P<bid>\d+)/(?P<max_id>\d+)$")),
+]
+REDIRECTS = [
+    (re.compile(r"^/venue/(?P<id>\d+)$"), "/v/venue/{id}"),
+    (re.compile(r"^/beer/(?P<id>\d+)$"), "/b/beer/{id}"),
+]
+FIRST_CHECKIN = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128    # Concurrent crawls open many connections at once
+    daemon_threads = True
+
+
+def load_fixture(name: str) -> Template:
+    return Template((FIXTURES / name).read_text())
+
+
+@contextmanager
+def quiet():
+    # The miner prints every request, keep it out of test and benchmark output
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        yield
+
+
+def popular_venue_id(k: int) -> int:
+    # Outside the range of brewery_num_id, which also numbers the taprooms
+    return 2_000_000 + k
+
+
+def brewery_num_id(brewery: str) -> int:
+    # Stable numeric id, as used by the "Show More" endpoint
+    return zlib.crc32(brewery.encode()) % 1_000_000
+
+
+class FakeUntappd:
+    # Local stand-in for untappd.com, pages are rendered from hand-written fixtures
+    # that follow the markup of the live pages
+    def __init__(
+        self,
+        breweries_per_page: int = 10,
+        beers_per_brewery: int = 60,
+        page_size: int = 25,
+        feed_items: int = 25,
+        latency: float = 0.0,
+        checkins_per_beer: int = 120,
+        port: int = 0,
+    ) -> None:
+        self.breweries_per_page = breweries_per_page
+        self.beers_per_brewery = beers_per_brewery
+        self.page_size = page_size    # Beers on the first list page and per "Show More"
+        self.feed_items = feed_items    # Checkins of the activity feed, bulk of a brewery page
+        self.latency = latency    # Seconds added to every response
+        self.checkins_per_beer = checkins_per_beer    # Raise it to simulate new activity
+        self.removed_venues: set[int] = set()    # Served without the venue header
+        self.broken_breweries: set[str] = set()    # Served without the sidebar, as a changed layout
+        self.hits: Counter[str] = Counter()    # Requests served per route
+        self.bytes_served = 0
+        self._templates = {f.stem: load_fixture(f.name) for f in FIXTURES.glob("*.html")}
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", port), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self) -> "FakeUntappd":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def expected_breweries(self, countries: list[str] | None = None, brewery_types: list[str] | None = None) -> int:
+        countries = COUNTRIES if countries is None else countries
+        brewery_types = BREWERY_TYPES if brewery_types is None else brewery_types
+        n_pages = len(countries) * len([t for t in brewery_types if t not in EMPTY_BREWERY_TYPES])
+        return n_pages * self.breweries_per_page
+
+    def expected_venues(self, countries: list[str] | None = None, brewery_types: list[str] | None = None) -> int:
+        # One taproom per brewery plus the popular venues they all list
+        return self.expected_breweries(countries, brewery_types) + POPULAR_VENUES
+
+    def lookups(self) -> LookupTables:
+        # Same slugs as the picker page, so crawls skip the bundled tables
+        countries = {slug: slug.replace("-", " ").title() for slug in COUNTRIES}
+        return LookupTables(countries=countries, brewery_types=dict(BREWERY_TYPES))
+
+    def miner(self, user_agent: str = "test", **kwargs) -> UntappdWebMiner:
+        # Web miner crawling this server, with its lookup tables and no politeness delay
+        miner = UntappdWebMiner(user_agent=user_agent, **kwargs)
+        miner.BASE_URL = self.url
+        miner.lookups = self.lookups()
+        miner.rate_limiter = HostRateLimiter(rate=1000, burst=1000, max_rate=1000)
+        return miner
+
+    ### Pages ###
+
+    def render(self, path: str, query: str = "") -> str | None:
+        for route, pattern in ROUTES:
+            match = pattern.match(path)
+            if match is not None:
+                with self._lock:
+                    self.hits[route] += 1
+                return getattr(self, f"_{route}_page")(**match.groupdict(), **self._query(query))
+        return None
+
+    def _top_rated_page(self, country: str | None = None, brewery_type: str | None = None) -> str:
+        countries = "\n".join(
+            f'          <option value="{slug}" data-value-slug="{slug}">{slug.replace("-", " ").title()}</option>'
+            for slug in COUNTRIES
+        )
+        brewery_types = "\n".join(
+            f'          <option value="{slug}" data-value-slug="{slug}">{name}</option>'
+            for slug, name in BREWERY_TYPES.items()
+        )
+        if country is None or brewery_type is None:
+            items = ""
+        elif country not in COUNTRIES or brewery_type not in BREWERY_TYPES or brewery_type in EMPTY_BREWERY_TYPES:
+            items = '        <p class="no-activity">No breweries found.</p>'
+        else:
+            items = "\n".join(self._tr_item(country, brewery_type, i) for i in range(self.breweries_per_page))
+        return self._templates["top_rated"].substitute(countries=countries, brewery_types=brewery_types, items=items)
+
+    def _tr_item(self, country: str, brewery_type: str, i: int) -> str:
+        brewery = f"brewery-{country}-{brewery_type}-{i}"
+        return self._templates["tr_item"].substitute(
+            id_url=f"/{brewery}",
+            slug=brewery,
+            name=f"Brewery {country.title()} {i}",
+            geography=COUNTRIES[country],
+            brewery_type=BREWERY_TYPES[brewery_type],
+            number_of_beers=self.beers_per_brewery,
+            total_ratings=f"{(i + 1) * 1234:,}",
+            rating=f"{4.5 - i * 0.01:.3f}",
+        )
+
+    def _brewery_page(self, brewery: str) -> str:
+        if brewery in self.broken_breweries:
+            return f'<html><body><div class="content"><h1>{brewery}</h1></div></body></html>'
+        num_id = brewery_num_id(brewery)
+        country, brewery_type = self._brewery_filters(brewery)
+        sidebar = self._templates["sidebar_item"]
+        feed = self._templates["checkin_item"]
+        return self._templates["brewery"].substitute(
+            name=brewery.replace("-", " ").title(),
+            num_id=num_id,
+            geography=COUNTRIES.get(country, ""),
+            brewery_type=BREWERY_TYPES.get(brewery_type, ""),
+            total=f"{num_id * 3:,}",
+            unique=f"{num_id * 2:,}",
+            monthly=f"{num_id % 997:,}",
+            likes=f"{num_id % 5003:,}",
+            number_of_beers=self.beers_per_brewery,
+            rating="4.125",
+            description=f"Independent brewery number {num_id}, brewing since 2012.",
+            locations=sidebar.substitute(href=f"/v/{brewery}-taproom/{num_id}", label="Taproom"),
+            top_beers="\n".join(
+                sidebar.substitute(href=f"/b/{brewery}-beer-{k}/{num_id * 1000 + k}", label=f"Beer {k}")
+                for k in range(5)
+            ),
+            popular_locations="\n".join(
+                sidebar.substitute(href=f"/v/bar-{k}/{popular_venue_id(k)}", label=f"Bar {k}")
+                for k in range(POPULAR_VENUES)
+            ),
+            feed="\n".join(
+                feed.substitute(
+                    checkin_id=num_id * 100 + k,
+                    user=k,
+                    beer_slug=f"{brewery}-beer-{k}",
+                    bid=num_id * 1000 + k,
+                    beer_name=f"Beer {k}",
+                    brewery_url=f"/{brewery}",
+                    brewery_name=brewery,
+                )
+                for k in range(self.feed_items)
+            ),
+        )
+
+    def _beer_list_page(self, brewery: str) -> str:
+        num_id = brewery_num_id(brewery)
+        return self._templates["beer_list"].substitute(
+            name=brewery.replace("-", " ").title(),
+            num_id=num_id,
+            items=self._beer_items(num_id, 0),
+        )
+
+    def _more_beer_page(self, num_id: str, offset: str) -> str:
+        return self._beer_items(int(num_id), int(offset))
+
+    def _beer_items(self, num_id: int, offset: int) -> str:
+        stop = min(offset + self.page_size, self.beers_per_brewery)
+        return "\n".join(
+            self._templates["beer_item"].substitute(
+                bid=num_id * 1000 + k,
+                slug=f"beer-{k}",
+                name=f"Beer {k}",
+                style=STYLES[k % len(STYLES)],
+                abv=f"{4 + k % 8}.5",
+                ibu=10 + k % 60 if k % 5 else "N/A",
+                raters=f"{(k + 1) * 321:,}",
+                added=f"{1 + k % 12:02d}/15/20",
+                rating=f"{3.5 + (k % 10) / 10:.3f}",
+            )
+            for k in range(offset, stop)
+        )
+
+    def _venue_page(self, slug: str, venue_id: str) -> str:
+        venue_id = int(venue_id)
+        if venue_id in self.removed_venues:
+            return '<html><body><div class="container"><p>This venue has been removed.</p></div></body></html>'
+        verified = venue_id % 2 == 0
+        sidebar = self._templates["sidebar_item"]
+        menu = ""
+        if verified:
+            menu = (
+                '    <div class="box menu">\n'
+                f'      <div class="menu-header"><h4>Beer Menu</h4><p class="count">{venue_id % 97 + 3} Beers</p></div>\n'
+                '    </div>'
+            )
+        return self._templates["venue"].substitute(
+            venue_id=venue_id,
+            name=slug.replace("-", " ").title(),
+            categories="Bar, Beer Store",
+            verified='<span class="verified">Verified Venue</span>' if verified else "",
+            adress=f"{venue_id % 1000} Rue Saint-Denis, Montreal, QC",
+            total=f"{venue_id * 5:,}",
+            unique=f"{venue_id * 3:,}",
+            monthly=f"{venue_id % 991:,}",
+            menu=menu,
+            patrons="\n".join(
+                sidebar.substitute(href=f"/user/patron-{venue_id}-{k}", label=f"Patron {k}") for k in range(4)
+            ),
+            feed="\n".join(
+                self._templates["checkin_item"].substitute(
+                    checkin_id=venue_id * 100 + k,
+                    user=k,
+                    beer_slug=f"beer-{k}",
+                    bid=k,
+                    beer_name=f"Beer {k}",
+                    brewery_url=f"/brewery-{k}",
+                    brewery_name=f"brewery-{k}",
+                )
+                for k in range(self.feed_items)
+            ),
+        )
+
+    def _beer_page(self, slug: str, bid: str) -> str:
+        bid = int(bid)
+        return self._templates["beer"].substitute(
+            name=slug.replace("-", " ").title(),
+            bid=bid,
+            feed=self._beer_checkins(bid, max_id=None),
+        )
+
+    def _more_feed_page(self, bid: str, max_id: str) -> str:
+        return self._beer_checkins(int(bid), int(max_id))
+
+    def _beer_checkins(self, bid: int, max_id: int | None) -> str:
+        # Newest first, checkin ids grow with time as on untappd.com
+        stop = self.checkins_per_beer if max_id is None else max_id - self.checkin_id(bid, 0)
+        start = max(0, stop - self.feed_items)
+        return "\n".join(self._beer_checkin(bid, k) for k in reversed(range(start, max(stop, 0))))
+
+    def _beer_checkin(self, bid: int, k: int) -> str:
+        venue = f"/v/bar-{k % 7}/{popular_venue_id(k % 7)}"
+        extras = []
+        if k % 3 == 0:
+            extras.append(f'              <p class="purchased">Purchased at <a href="{venue}">Bar {k % 7}</a></p>')
+        if k % 4 == 0:
+            extras.append('              <div class="tagged-friends">With <a href="/user/friend1">Friend 1</a> <a href="/user/friend2">Friend 2</a></div>')
+        if k % 5 == 0:
+            extras.append('              <p class="photo"><a href="#"><img src="https://assets.untappd.com/photos/default.jpg" alt=""></a></p>')
+        checkin_time = FIRST_CHECKIN + timedelta(minutes=k)
+        return self._templates["beer_checkin_item"].substitute(
+            checkin_id=self.checkin_id(bid, k),
+            user=k % 11,
+            bid=bid,
+            venue=f' at <a href="{venue}">Bar {k % 7}</a>' if k % 2 else "",
+            comment=f"Checkin {k}" if k % 6 else "",
+            serving=["Draft", "Can", "Bottle"][k % 3],
+            extras="\n".join(extras),
+            checkin_time=checkin_time.strftime("%a, %d %b %Y %H:%M:%S %z"),
+        )
+
+    @staticmethod
+    def checkin_id(bid: int, k: int) -> int:
+        return bid * 1_000_000 + k
+
+    @staticmethod
+    def redirect(path: str) -> str | None:
+        # /venue/{id} and /beer/{bid} redirect to the slugged pages
+        for pattern, location in REDIRECTS:
+            match = pattern.match(path)
+            if match is not None:
+                return location.format(**match.groupdict())
+        return None
+
+    @staticmethod
+    def _brewery_filters(brewery: str) -> tuple[str | None, str | None]:
+        for country in COUNTRIES:
+            for brewery_type in BREWERY_TYPES:
+                if brewery.startswith(f"brewery-{country}-{brewery_type}-"):
+                    return country, brewery_type
+        return None, None
+
+    @staticmethod
+    def _query(query: str) -> dict[str, str]:
+        return {k: v[0] for k, v in parse_qs(query).items() if k in ("country", "brewery_type")}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"    # Keep-alive, as httpx expects from a real host
+            disable_nagle_algorithm = True    # Headers and body are separate writes
+
+            def do_GET(self) -> None:
+                url = urlsplit(self.path)
+                location = fake.redirect(url.path)
+                if location is not None:
+                    self.send_response(301)
+                    self.send_header("Location", location)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                page = fake.render(url.path, url.query)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if page is None:
+                    self.send_error(404)
+                    return
+                body = page.encode()
+                with fake._lock:
+                    fake.bytes_served += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
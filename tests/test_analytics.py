@@ -0,0 +1,53 @@
+from untappd_miner.untappd_miner import Beer, Brewery
+from datetime import date
+import unittest
+
+try:
+    from untappd_miner.analytics import MinerAnalytics
+except ImportError:
+    MinerAnalytics = None
+
+def make_brewery(name: str, country: str, btype: str, ratings: int, score: float) -> Brewery:
+    return Brewery(f"/{name}", name, None, None, country, btype, 10, ratings, score, None)
+
+def make_beer(bid: int, brewery: str, style: str, ratings: int, score: float) -> Beer:
+    return Beer(f"/b/{brewery.lower()}-{bid}/{bid}", bid, brewery, f"Beer {bid}", style, 6.0, None, score, ratings, date(2020, 1, 1), None)
+
+@unittest.skipIf(MinerAnalytics is None, "pandas/numpy are not installed")
+class TestMinerAnalytics(unittest.TestCase):
+    def setUp(self):
+        breweries = [
+            make_brewery("Dunham", "Canada", "Micro Brewery", 100, 4.0),
+            make_brewery("DieuDuCiel", "Canada", "Brew Pub", 300, 3.0),
+            make_brewery("Hill", "United States", "Micro Brewery", 50, 4.5),
+        ]
+        beers = [
+            make_beer(1, "Dunham", "IPA", 1000, 4.0),
+            make_beer(2, "Dunham", "Stout", 2, 5.0),
+            make_beer(3, "DieuDuCiel", "Stout", 500, 4.2),
+            make_beer(4, "Hill", "IPA", 10, 4.4),
+        ]
+        self.analytics = MinerAnalytics(breweries, beers)
+        
+    def test_group_stats_by_country(self):
+        stats = self.analytics.group_stats("breweries", by="country")
+        self.assertEqual(stats.loc["Canada", "count"], 2)
+        self.assertAlmostEqual(stats.loc["Canada", "mean_rating"], 3.5)
+        self.assertAlmostEqual(stats.loc["Canada", "weighted_rating"], 3.25)
+    
+    def test_beers_inherit_brewery_country(self):
+        stats = self.analytics.group_stats("beers", by=["country", "style"])
+        self.assertEqual(stats.loc[("Canada", "Stout"), "count"], 2)
+    
+    def test_bayesian_rating_shrinks_low_counts(self):
+        score = self.analytics.bayesian_rating("beers", min_ratings=100, prior_mean=4.0)
+        self.assertAlmostEqual(score["/b/dunham-2/2"], (2 * 5.0 + 100 * 4.0) / 102)
+        top = self.analytics.top_k("beers", k=1)
+        self.assertEqual(top["id_url"].tolist(), ["/b/dieuduciel-3/3"])
+    
+    def test_top_k_per_group(self):
+        top = self.analytics.top_k("beers", k=1, by="weight_avg_ratings", group="style")
+        self.assertEqual(top["id_url"].tolist(), ["/b/hill-4/4", "/b/dunham-2/2"])
+    
+    def test_empty(self):
+        self.assertTrue(MinerAnalytics().group_stats("beers", by="style").empty)
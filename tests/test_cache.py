@@ -0,0 +1,50 @@
+from untappd_miner.cache import ResponseCache
+import httpx
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(Path(self.tmpdir.name) / "cache.sqlite", ttl=60, max_bytes=100)
+        self.url = "https://untappd.com/brewery/top_rated"
+        
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+    
+    def _response(self, content: bytes, **headers) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "text/html", **headers}, content=content)
+    
+    def test_roundtrip_keyed_by_params(self):
+        self.cache.put(self.url, {"country": "canada"}, self._response(b"<p>ca</p>", ETag='"abc"'))
+        cached = self.cache.get(self.url, {"country": "canada"})
+        self.assertEqual(cached.to_response().text, "<p>ca</p>")
+        self.assertEqual(cached.validators(), {"If-None-Match": '"abc"'})
+        self.assertIsNone(self.cache.get(self.url, {"country": "france"}))
+    
+    def test_ttl_and_refresh(self):
+        self.cache.put(self.url, None, self._response(b"x"))
+        cached = self.cache.get(self.url)
+        self.assertTrue(cached.is_fresh(self.cache.ttl))
+        cached.stored_at -= 120
+        self.assertFalse(cached.is_fresh(self.cache.ttl))
+        self.cache.refresh(cached)
+        self.assertTrue(self.cache.get(self.url).is_fresh(self.cache.ttl))
+    
+    def test_lru_eviction_by_size(self):
+        self.cache.put(self.url, {"page": 1}, self._response(b"a" * 40))
+        time.sleep(0.01)
+        self.cache.put(self.url, {"page": 2}, self._response(b"b" * 40))
+        time.sleep(0.01)
+        self.cache.get(self.url, {"page": 1})    # page 2 becomes least recently used
+        self.cache.put(self.url, {"page": 3}, self._response(b"c" * 40))
+        self.assertIsNone(self.cache.get(self.url, {"page": 2}))
+        self.assertIsNotNone(self.cache.get(self.url, {"page": 1}))
+        self.assertLessEqual(self.cache.total_bytes, 100)
+    
+    def test_non_ok_responses_not_stored(self):
+        self.cache.put(self.url, None, httpx.Response(404, content=b"missing"))
+        self.assertEqual(len(self.cache), 0)
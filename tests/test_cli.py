@@ -0,0 +1,113 @@
+from benchmarks.fake_server import FakeUntappd
+from untappd_miner.cache import ResponseCache
+from untappd_miner.cli import main
+from untappd_miner.models import BeerRating
+from untappd_miner.ratings import RatingArchive
+from datetime import datetime, timezone
+from pathlib import Path
+import httpx
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+
+def run(*argv: str) -> tuple[int, dict]:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        code = main(list(argv))
+    return code, json.loads(out.getvalue())
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.frontier = str(Path(self.tmp.name) / "frontier.sqlite")
+        self.graph = str(Path(self.tmp.name) / "graph.sqlite")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_stats_of_missing_stores(self):
+        code, report = run("stats", "--frontier", self.frontier, "--graph", self.graph)
+        self.assertEqual((code, report), (0, {}))
+        self.assertFalse(Path(self.frontier).exists())
+    
+    def test_crawl_export_stats(self):
+        with FakeUntappd(breweries_per_page=2, feed_items=1) as server:
+            code, summary = run(
+                "crawl", "--country", "canada", "--brewery-type", "micro-brewery", "--venues",
+                "--frontier", self.frontier, "--graph", self.graph, "--base-url", server.url,
+            )
+            top_rated_hits = server.hits["top_rated"]
+        self.assertEqual(code, 0)
+        self.assertEqual(summary["breweries"], 2)
+        self.assertEqual(summary["venues"], 2 + 3)    # Taprooms and the shared popular venues
+        self.assertEqual(top_rated_hits, 1)    # The bundled lookup tables are not refreshed
+        
+        out = Path(self.tmp.name) / "export"
+        code, written = run("export", str(out), "--frontier", self.frontier)
+        self.assertEqual(written, {"breweries": 2, "venues": 5})
+        breweries = [json.loads(line) for line in (out / "breweries.jsonl").read_text().splitlines()]
+        self.assertEqual(breweries[0]["country"], "Canada")
+        
+        code, report = run("stats", "--frontier", self.frontier, "--graph", self.graph)
+        self.assertEqual(report["frontier"]["brewery"], {"done": 2})
+        self.assertEqual(report["graph"]["brewery"], 2)
+    
+    def test_second_crawl_resumes_or_starts_fresh(self):
+        with FakeUntappd(breweries_per_page=2, feed_items=1) as server:
+            crawl = ["crawl", "--country", "canada", "--brewery-type", "micro-brewery", "--venues",
+                     "--frontier", self.frontier, "--base-url", server.url]
+            _, first = run(*crawl)
+            
+            # Everything is done already, the frontier answers without a request
+            _, resumed = run(*crawl)
+            self.assertEqual(resumed["requests"], 0)
+            self.assertEqual((resumed["breweries"], resumed["venues"]), (first["breweries"], first["venues"]))
+            
+            _, fresh = run(*crawl, "--fresh")
+            self.assertEqual(fresh["requests"], first["requests"])
+            self.assertEqual(fresh["frontier"], first["frontier"])
+    
+    def test_stats_of_cache_and_ratings(self):
+        cache_path = str(Path(self.tmp.name) / "cache.sqlite")
+        ratings_path = str(Path(self.tmp.name) / "ratings.sqlite")
+        with ResponseCache(cache_path) as cache:
+            cache.put("https://untappd.com/brewery/top_rated", None, httpx.Response(200, html="<html></html>"))
+        rating = BeerRating(
+            user_id="user1", checkin_venue=None, serving_type="Draft", comment="", purchased_at=None,
+            number_tagged_friends=0, has_picture=False, checkin_time=datetime(2023, 5, 1, tzinfo=timezone.utc),
+        )
+        with RatingArchive(ratings_path) as archive:
+            archive.append(42, [(1, rating), (2, rating)])
+        
+        code, report = run("stats", "--frontier", self.frontier, "--cache", cache_path, "--ratings", ratings_path)
+        self.assertEqual(code, 0)
+        self.assertEqual(report["cache"], {"responses": 1, "bytes": len("<html></html>")})
+        self.assertEqual(report["ratings"], {"beers": 1, "ratings": 2})
+    
+    def test_export_without_a_crawl(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["export", self.tmp.name, "--frontier", self.frontier]), 1)
+
+class TestLazyImports(unittest.TestCase):
+    def loaded(self, statement: str) -> set[str]:
+        # Fresh interpreter, modules already imported by the test run do not count
+        code = f"import sys; {statement}; print(' '.join(sys.modules))"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        return set(out.split())
+    
+    def test_cli_imports_no_third_party_module(self):
+        modules = self.loaded("import untappd_miner.cli")
+        self.assertFalse({"httpx", "bs4", "selenium"} & modules)
+    
+    def test_miner_does_not_import_the_browser(self):
+        modules = self.loaded("from untappd_miner import UntappdWebMiner")
+        self.assertIn("httpx", modules)
+        self.assertFalse({m for m in modules if m.startswith("selenium")})
+    
+    def test_models_without_httpx(self):
+        modules = self.loaded("from untappd_miner import Brewery, RatingStore")
+        self.assertNotIn("httpx", modules)
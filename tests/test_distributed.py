@@ -0,0 +1,87 @@
+from benchmarks.fake_server import FakeUntappd, quiet
+from untappd_miner.distributed import CrawlCoordinator, CrawlWorker, LeaseQueue, LeaseServer, RemoteLeaseQueue
+from untappd_miner.frontier import TR_PAGE
+from pathlib import Path
+import tempfile
+import threading
+import time
+import unittest
+
+class TestLeaseQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.queue = LeaseQueue(Path(self.tmpdir.name) / "leases.sqlite", lease_ttl=60, max_attempts=2)
+        self.queue.add_many(TR_PAGE, [("canada/micro-brewery", None), ("belgium/brew-pub", None)])
+    
+    def tearDown(self):
+        self.queue.close()
+        self.tmpdir.cleanup()
+    
+    def test_claims_are_exclusive(self):
+        first = self.queue.claim("a")
+        second = self.queue.claim("b", n=5)
+        self.assertEqual([l.key for l in first], ["canada/micro-brewery"])
+        self.assertEqual([l.key for l in second], ["belgium/brew-pub"])
+        self.assertEqual(self.queue.claim("c"), [])
+    
+    def test_expired_lease_is_reclaimed_and_fenced(self):
+        self.queue.lease_ttl = 0.01
+        lease = self.queue.claim("a")[0]
+        time.sleep(0.05)
+        reclaimed = self.queue.claim("b")[0]
+        self.assertEqual((reclaimed.key, reclaimed.attempts), (lease.key, 2))
+        self.assertFalse(self.queue.complete(lease.token, {"late": True}))
+        self.assertEqual(self.queue.heartbeat([lease.token, reclaimed.token]), [reclaimed.token])
+    
+    def test_fail_retries_then_gives_up(self):
+        lease = self.queue.claim("a", kinds=[TR_PAGE])[0]
+        self.assertTrue(self.queue.fail(lease.token, "503"))
+        lease = self.queue.claim("a", kinds=[TR_PAGE])[0]
+        self.assertEqual(lease.attempts, 2)
+        self.queue.fail(lease.token, "503")
+        self.assertEqual(self.queue.failures(TR_PAGE), [("canada/micro-brewery", "503")])
+    
+    def test_release_keeps_attempts(self):
+        lease = self.queue.claim("a")[0]
+        self.assertTrue(self.queue.release(lease.token))
+        self.assertEqual(self.queue.claim("b")[0].attempts, 1)
+
+class TestDistributedCrawl(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.queue = LeaseQueue(Path(self.tmpdir.name) / "leases.sqlite")
+        self.server = FakeUntappd(breweries_per_page=2, beers_per_brewery=30, feed_items=1)
+        self.server.start()
+        self.enterContext(quiet())
+    
+    def tearDown(self):
+        self.server.stop()
+        self.queue.close()
+        self.tmpdir.cleanup()
+    
+    def test_workers_share_the_crawl(self):
+        coordinator = CrawlCoordinator(self.queue, self.server.miner())
+        self.assertEqual(coordinator.seed_top_rated(country="canada"), 3)
+        
+        with LeaseServer(self.queue, port=0) as lease_server:
+            workers = [
+                CrawlWorker(RemoteLeaseQueue(lease_server.url), self.server.miner(), worker_id=f"w{i}", crawl_beers=True)
+                for i in range(3)
+            ]
+            threads = [threading.Thread(target=w.run, kwargs={"idle_timeout": 0.5, "poll_interval": 0.05}) for w in workers]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            for w in workers:
+                w.queue.close()
+        
+        self.assertTrue(coordinator.done())
+        n_breweries = self.server.expected_breweries(countries=["canada"])
+        self.assertEqual(sum(w.processed for w in workers), 3 + 2 * n_breweries)
+        breweries = coordinator.breweries()
+        self.assertEqual(len(breweries), n_breweries)
+        self.assertEqual(breweries["/brewery-canada-brew-pub-1"].city, "Montreal")
+        beers = coordinator.beers()
+        self.assertEqual(len(beers), 30 * n_breweries)
+        self.assertIsNotNone(next(iter(beers.values())).date_added.year)
@@ -0,0 +1,45 @@
+from untappd_miner.untappd_miner import Beer, BeerRating, Brewery, BreweryCheckinStats, BreweryDetails
+from datetime import date, datetime, timezone
+import tempfile
+import unittest
+
+try:
+    import pyarrow.compute as pc
+    from untappd_miner.export import ParquetExporter, read_table
+except ImportError:
+    pc = None
+
+def make_brewery(id_url: str, country: str) -> Brewery:
+    stats = BreweryCheckinStats(total=10, unique=5, monthly=1, current_user=0, likes=3)
+    details = BreweryDetails("desc", stats, ["/v/a/1"], ["/b/x/1"], [], ["/v/b/2"])
+    return Brewery(id_url, id_url.strip("/"), None, None, country, "Micro Brewery", 10, 100, 3.9, details)
+
+@unittest.skipIf(pc is None, "pyarrow is not installed")
+class TestParquetExporter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_breweries_partitioned_by_country(self):
+        breweries = [make_brewery(f"/b{i}", "Canada" if i % 2 else "United States") for i in range(5)]
+        with ParquetExporter(self.tmpdir.name, partition_by="country", batch_size=2) as exporter:
+            exporter.write_breweries(breweries)
+        self.assertEqual(exporter.rows_written["breweries"], 5)
+        
+        table = read_table(self.tmpdir.name, "breweries", columns=["id_url", "likes", "top_beers"],
+                           filter=pc.field("country") == "United States")
+        self.assertEqual(sorted(table.column("id_url").to_pylist()), ["/b0", "/b2", "/b4"])
+        self.assertEqual(table.column("top_beers").to_pylist()[0], ["/b/x/1"])
+    
+    def test_beers_without_details_and_ratings(self):
+        beer = Beer("/b/x/1", 1, "Dunham", "X", "IPA", 6.5, None, 3.8, 12, date(2020, 1, 15), None)
+        rating = BeerRating("u1", "/v/a/1", "Draft", "", None, 0, False, datetime(2023, 5, 1, tzinfo=timezone.utc))
+        with ParquetExporter(self.tmpdir.name, crawl_date=date(2024, 1, 1)) as exporter:
+            exporter.write_beers([beer])
+            exporter.write_ratings("/b/x/1", [rating, rating])
+        beers = read_table(self.tmpdir.name, "beers")
+        self.assertEqual(beers.column("ibu").to_pylist(), [None])
+        ratings = read_table(self.tmpdir.name, "ratings", columns=["beer_id", "crawl_date"])
+        self.assertEqual(ratings.num_rows, 2)
@@ -0,0 +1,52 @@
+from untappd_miner.frontier import BREWERY, DONE, FAILED, IN_PROGRESS, PENDING, TR_PAGE, CrawlFrontier
+import tempfile
+import unittest
+from pathlib import Path
+
+class TestCrawlFrontier(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "frontier.sqlite"
+        self.frontier = CrawlFrontier(self.path, max_attempts=2)
+        
+    def tearDown(self):
+        self.frontier.close()
+        self.tmpdir.cleanup()
+    
+    def test_claim_at_most_once_per_run(self):
+        self.assertTrue(self.frontier.claim(TR_PAGE, "canada/micro_brewery"))
+        self.assertFalse(self.frontier.claim(TR_PAGE, "canada/micro_brewery"))
+        self.assertEqual(self.frontier.status(TR_PAGE, "canada/micro_brewery"), IN_PROGRESS)
+    
+    def test_add_keeps_existing_status_and_payload(self):
+        self.frontier.add(BREWERY, "/Dunham", {"id_url": "/Dunham"})
+        self.frontier.claim(BREWERY, "/Dunham")
+        self.frontier.mark_done(BREWERY, "/Dunham", {"id_url": "/Dunham", "fullname": "Dunham"})
+        self.assertFalse(self.frontier.add(BREWERY, "/Dunham", {"id_url": "/Dunham"}))
+        self.assertEqual(self.frontier.entries(BREWERY, DONE), [("/Dunham", {"id_url": "/Dunham", "fullname": "Dunham"})])
+    
+    def test_interrupted_and_failed_work_is_requeued(self):
+        self.frontier.claim(BREWERY, "/Crashed")
+        self.frontier.claim(BREWERY, "/Failed")
+        self.frontier.mark_failed(BREWERY, "/Failed", "503")
+        self.frontier.close()
+        
+        self.frontier = CrawlFrontier(self.path, max_attempts=2)
+        self.assertEqual(self.frontier.status(BREWERY, "/Crashed"), PENDING)
+        self.assertTrue(self.frontier.claim(BREWERY, "/Failed"))
+        self.frontier.mark_failed(BREWERY, "/Failed", "503")
+        self.frontier.close()
+        
+        # Out of attempts
+        self.frontier = CrawlFrontier(self.path, max_attempts=2)
+        self.assertEqual(self.frontier.status(BREWERY, "/Failed"), FAILED)
+        self.assertEqual(self.frontier.counts()[BREWERY], {PENDING: 1, FAILED: 1})
+    
+    def test_interrupted_work_is_capped(self):
+        # An entry that crashes every run is given up after max_attempts
+        for _ in range(2):
+            self.assertTrue(self.frontier.claim(BREWERY, "/Crashing"))
+            self.frontier.close()
+            self.frontier = CrawlFrontier(self.path, max_attempts=2)
+        self.assertEqual(self.frontier.status(BREWERY, "/Crashing"), FAILED)
+        self.assertFalse(self.frontier.claim(BREWERY, "/Crashing"))
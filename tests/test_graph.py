@@ -0,0 +1,82 @@
+from benchmarks.fake_server import FakeUntappd, popular_venue_id, quiet
+from untappd_miner.graph import EntityGraph
+from untappd_miner.untappd_miner import (
+    Beer, BeerDetails, Brewery, BreweryCheckinStats, BreweryDetails, CheckinStats, Venue,
+)
+from pathlib import Path
+import tempfile
+import unittest
+
+def make_brewery(slug: str, top_beers: list[int], venues: list[int]) -> Brewery:
+    stats = BreweryCheckinStats(10, 5, 1, 0, 3)
+    details = BreweryDetails(
+        "desc", stats, [f"/v/taproom/{venues[0]}"], [f"/b/beer/{b}" for b in top_beers], [],
+        [f"/v/bar/{v}" for v in venues[1:]],
+    )
+    return Brewery(f"/{slug}", slug.title(), "City", "Region", "Canada", "Micro Brewery", 10, 100, 4.0, details)
+
+def make_beer(bid: int, brewery: str, similar: list[int] = (), venues: list[int] = ()) -> Beer:
+    details = BeerDetails(
+        CheckinStats(1, 1, 1, 0), "desc", ["/user/alice"], list(similar), [f"/v/bar/{v}" for v in venues], None,
+    )
+    return Beer(f"/b/beer-{bid}/{bid}", bid, brewery, f"Beer {bid}", "IPA", 6.5, 40, 4.0, 10, None, details)
+
+class TestEntityGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.graph = EntityGraph(Path(self.tmp.name) / "graph.sqlite", batch_size=3)
+        self.graph.upsert([
+            ("brewery", make_brewery("brewery-a", [1, 2], [100, 200])),
+            ("brewery", make_brewery("brewery-b", [3], [101, 200])),
+            ("beer", make_beer(1, "brewery-a", similar=[2], venues=[200, 300])),
+            ("beer", make_beer(2, "brewery-a", similar=[3], venues=[300])),
+            ("beer", make_beer(3, "brewery-b", similar=[4], venues=[400])),
+            ("venue", Venue(200, "Bar", "1 Main St", None, True, [], CheckinStats(1, 1, 1, 0), ["bob"], 12)),
+        ])
+    
+    def tearDown(self):
+        self.graph.close()
+        self.tmp.cleanup()
+    
+    def test_venues_pouring_top_beers(self):
+        self.assertEqual(self.graph.venues_pouring("brewery-a"), ["200", "300"])
+        self.assertEqual(self.graph.venues_pouring("/brewery-b"), ["400"])
+    
+    def test_similar_beers_within_hops(self):
+        self.assertEqual(self.graph.within("beer", "1", "similar", hops=1), {"2": 1})
+        self.assertEqual(self.graph.within("beer", "1", "similar", hops=2), {"2": 1, "3": 2})
+    
+    def test_reverse_edges(self):
+        self.assertEqual(self.graph.breweries_at(200), ["/brewery-a", "/brewery-b"])
+        self.assertEqual(self.graph.neighbours("brewery", "/brewery-a", "~brewed_by"), [("beer", "1"), ("beer", "2")])
+        self.assertEqual(self.graph.neighbours("user", "alice", "~loyal_drinker"), [("beer", "1"), ("beer", "2"), ("beer", "3")])
+        with self.assertRaises(ValueError):
+            self.graph.neighbours("beer", "1", "pours")
+    
+    def test_upsert_replaces_edges_and_keeps_stubs(self):
+        self.graph.upsert([("beer", make_beer(1, "brewery-a", similar=[3]))])
+        self.assertEqual(self.graph.within("beer", "1", "similar", hops=1), {"3": 1})
+        self.assertEqual(self.graph.node("beer", "1")["name"], "Beer 1")
+        self.assertIsNone(self.graph.node("beer", "4"))    # Only known from an id list
+        self.assertEqual(self.graph.counts()["venue"], 5)
+    
+    def test_buffered_adds_are_flushed(self):
+        self.graph.add("beer", make_beer(5, "brewery-b", venues=[500]))
+        self.assertEqual(len(self.graph._pending), 1)
+        self.assertEqual(self.graph.neighbours("beer", "5", "verified_location"), [("venue", "500")])
+        self.assertEqual(self.graph._pending, [])
+
+class TestMinerGraph(unittest.TestCase):
+    def test_crawl_fills_the_graph(self):
+        with tempfile.TemporaryDirectory() as tmp, FakeUntappd(breweries_per_page=2, feed_items=1) as server:
+            miner = server.miner()
+            miner.graph = EntityGraph(Path(tmp) / "graph.sqlite")
+            with quiet(), miner:
+                miner.get_top_rated_breweries(country="canada")
+                miner.get_venues()
+            
+            breweries = miner.graph.breweries_at(popular_venue_id(0))
+            self.assertEqual(breweries, sorted(miner.breweries))
+            self.assertEqual(miner.graph.counts()["venue"], server.expected_venues(countries=["canada"]))
+            self.assertIsNotNone(miner.graph.node("venue", str(popular_venue_id(0))))
+            miner.graph.close()
@@ -0,0 +1,85 @@
+from benchmarks.fake_server import FakeUntappd
+from untappd_miner import UntappdWebMiner
+from untappd_miner.lookups import LookupTables, parse_geography
+from datetime import date, timedelta
+from pathlib import Path
+import contextlib
+import io
+import tempfile
+import unittest
+
+class TestParseGeography(unittest.TestCase):
+    def test_city_region_country(self):
+        self.assertEqual(parse_geography("Montreal, QC Canada", "Canada"), ("Montreal", "QC"))
+    
+    def test_multi_word_country(self):
+        self.assertEqual(parse_geography("Portland, OR United States", "United States"), ("Portland", "OR"))
+        self.assertEqual(parse_geography("Brussels, Brussels-Capital Region Belgium", "Belgium"), ("Brussels", "Brussels-Capital Region"))
+    
+    def test_missing_parts(self):
+        self.assertEqual(parse_geography("Bruges, Belgium", "Belgium"), ("Bruges", None))
+        self.assertEqual(parse_geography("Canada", "Canada"), (None, None))
+        self.assertEqual(parse_geography("Montreal, QC", "Canada"), ("Montreal", "QC"))
+
+class TestLookupTables(unittest.TestCase):
+    def test_bundled_tables(self):
+        tables = LookupTables.load()
+        self.assertEqual(tables.countries["united-states"], "United States")
+        self.assertEqual(tables.country_name("bosnia-and-herzegovina"), "Bosnia and Herzegovina")
+        self.assertEqual(tables.country_name("atlantis"), "Atlantis")
+        self.assertIn("micro-brewery", tables.brewery_types)
+    
+    def test_saved_copy_wins_when_newer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "lookups.json"
+            LookupTables(countries={"canada": "Canada"}, brewery_types={}).save(path)
+            self.assertEqual(LookupTables.load(path).countries, {"canada": "Canada"})
+            LookupTables(countries={}, brewery_types={}, updated=date(2000, 1, 1)).save(path)
+            self.assertIn("canada", LookupTables.load(path).countries)
+    
+    def test_stale(self):
+        tables = LookupTables(countries={}, brewery_types={}, updated=date.today() - timedelta(days=31))
+        self.assertTrue(tables.is_stale(timedelta(days=30)))
+
+class TestRefreshLookups(unittest.TestCase):
+    def test_refresh_from_picker_page(self):
+        with FakeUntappd() as server, tempfile.TemporaryDirectory() as tmpdir:
+            miner = UntappdWebMiner(user_agent="test")
+            miner.BASE_URL = server.url
+            miner.lookups_path = Path(tmpdir) / "lookups.json"
+            with contextlib.redirect_stdout(io.StringIO()):
+                tables = miner.refresh_lookups()
+            self.assertEqual(tables.countries, server.lookups().countries)
+            self.assertEqual(LookupTables.load(miner.lookups_path).brewery_types["brew-pub"], "Brew Pub")
+            miner.close()
+    
+    def test_filters_need_no_request(self):
+        # The bundled tables are old, but only a saved copy is ever refreshed
+        miner = UntappdWebMiner(user_agent="test")
+        self.assertTrue(miner.lookups.is_stale(miner.lookups_max_age))
+        self.assertEqual(miner._tr_filters("canada", "brew-pub"), (["canada"], ["brew-pub"]))
+        with self.assertRaises(ValueError):
+            miner._tr_filters("atlantis", "all")
+        self.assertIsNone(miner._lookups_refresh)
+        miner.close()
+    
+    def test_stale_saved_copy_is_refreshed(self):
+        with FakeUntappd() as server, tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "lookups.json"
+            # Saved after the bundled tables, so it is loaded, but over a month ago
+            saved = LookupTables.load()
+            saved.updated += timedelta(days=1)
+            saved.save(path)
+            miner = UntappdWebMiner(user_agent="test")
+            miner.BASE_URL = server.url
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                miner.lookups_path = path
+                miner._tr_filters("canada", "all")
+                miner._tr_filters("belgium", "all")
+                miner._lookups_refresh.join()
+            self.assertEqual(server.hits["top_rated"], 1)
+            self.assertEqual(miner.metrics.counter("lookups_refresh", result="ok"), 1)
+            self.assertNotIn("refreshed", out.getvalue())
+            self.assertEqual(LookupTables.load(path).updated, date.today())
+            miner.close()
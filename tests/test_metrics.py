@@ -0,0 +1,71 @@
+from untappd_miner.metrics import Metrics, profiled, timed
+from urllib.request import urlopen
+import contextlib
+import io
+import time
+import unittest
+
+class Extractor:
+    def __init__(self):
+        self.metrics = Metrics()
+    
+    @timed("extract")
+    def _brewery_description(self):
+        return "desc"
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics(buckets=(0.01, 1.0))
+    
+    def test_counters_by_labels(self):
+        self.metrics.inc("cache", result="hit")
+        self.metrics.inc("cache", result="hit")
+        self.metrics.inc("response_bytes", 512)
+        self.assertEqual(self.metrics.counter("cache", result="hit"), 2)
+        self.assertEqual(self.metrics.counter("cache", result="miss"), 0)
+        self.assertEqual(self.metrics.counter("response_bytes"), 512)
+    
+    def test_span_records_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.metrics.span("parse"):
+                time.sleep(0.02)
+                raise ValueError
+        timing = self.metrics.timing("parse")
+        self.assertEqual(timing.count, 1)
+        self.assertGreaterEqual(timing.total, 0.02)
+        self.assertEqual(timing.counts, [0, 1, 0])
+    
+    def test_timed_method(self):
+        extractor = Extractor()
+        self.assertEqual(extractor._brewery_description(), "desc")
+        self.assertEqual(extractor.metrics.timing("extract", method="brewery_description").count, 1)
+        self.assertEqual(extractor.metrics.summary()["extract"]["count"], 1)
+    
+    def test_render_prometheus_text(self):
+        self.metrics.inc("requests", status=200)
+        self.metrics.observe("fetch", 0.5, host="untappd.com")
+        text = self.metrics.render()
+        self.assertIn("# TYPE untappd_miner_requests_total counter", text)
+        self.assertIn('untappd_miner_requests_total{status="200"} 1', text)
+        self.assertIn('untappd_miner_fetch_seconds_bucket{host="untappd.com",le="0.01"} 0', text)
+        self.assertIn('untappd_miner_fetch_seconds_bucket{host="untappd.com",le="+Inf"} 1', text)
+        self.assertIn('untappd_miner_fetch_seconds_count{host="untappd.com"} 1', text)
+    
+    def test_serve(self):
+        self.metrics.inc("retries")
+        with contextlib.redirect_stdout(io.StringIO()):
+            server = self.metrics.serve(port=0)
+        try:
+            with urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as res:
+                self.assertIn("untappd_miner_retries_total 1", res.read().decode())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+class TestProfiled(unittest.TestCase):
+    def test_prints_stats(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            with profiled(limit=5):
+                sum(range(1000))
+        self.assertIn("function calls", out.getvalue())
@@ -0,0 +1,150 @@
+from benchmarks.fake_server import FakeUntappd, quiet
+from untappd_miner.frontier import BREWERY, DONE, FAILED, CrawlFrontier
+from pathlib import Path
+import asyncio
+import contextlib
+import tempfile
+import unittest
+
+class TestOfflineCrawl(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeUntappd(breweries_per_page=3, beers_per_brewery=60, page_size=25, feed_items=2)
+        cls.server.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+    
+    def setUp(self):
+        self.miner = self.server.miner()
+        self.enterContext(quiet())
+    
+    def test_top_rated_breweries(self):
+        breweries = self.miner.get_top_rated_breweries(country="canada")
+        self.assertEqual(len(breweries), self.server.expected_breweries(countries=["canada"]))
+        brewery = breweries["/brewery-canada-micro-brewery-0"]
+        self.assertEqual((brewery.city, brewery.region, brewery.country), ("Montreal", "QC", "Canada"))
+        self.assertEqual(brewery.total_ratings, 1234)
+        self.assertEqual(len(brewery.details.top_beers), 5)
+        self.assertEqual(len(brewery.details.popular_locations), 3)
+        self.assertEqual(brewery.details.checkin_stats.current_user, 0)
+    
+    def test_scoped_and_full_parse_agree(self):
+        html = self.server.render("/brewery-belgium-brew-pub-1")
+        scoped = self.miner._brewery_details_from_home_page(self.miner._brewery_home_soup(html))
+        self.miner.scoped_parsing = False
+        full = self.miner._brewery_details_from_home_page(self.miner._brewery_home_soup(html))
+        self.assertEqual(scoped, full)
+    
+    def test_async_top_rated_breweries(self):
+        breweries = asyncio.run(self.miner.aget_top_rated_breweries(country="belgium", max_concurrency=4))
+        self.assertEqual(len(breweries), self.server.expected_breweries(countries=["belgium"]))
+    
+    def test_async_crawl_matches_sync_crawl(self):
+        breweries = asyncio.run(self.miner.aget_top_rated_breweries(country="canada", max_concurrency=3))
+        sync_miner = self.server.miner()
+        self.assertEqual(breweries, sync_miner.get_top_rated_breweries(country="canada"))
+    
+    def test_iter_keeps_no_brewery(self):
+        breweries = list(self.miner.iter_top_rated_breweries(country="canada"))
+        self.assertEqual(len(breweries), self.server.expected_breweries(countries=["canada"]))
+        self.assertEqual(self.miner.breweries, {})
+    
+    def test_aiter_stops_early(self):
+        async def first():
+            async with contextlib.aclosing(self.miner.aiter_top_rated_breweries(max_concurrency=1)) as breweries:
+                async for brewery in breweries:
+                    return brewery
+        
+        # Closing the iterator cancels the fetches still pending
+        before = self.server.hits["brewery"]
+        self.assertIsNotNone(asyncio.run(first()))
+        self.assertLess(self.server.hits["brewery"] - before, self.server.expected_breweries())
+        self.assertEqual(self.miner.breweries, {})
+    
+    def test_async_crawl_invalid_concurrency(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self.miner.aget_top_rated_breweries(max_concurrency=0))
+    
+    def test_all_beers_from_paginated_list(self):
+        beers = self.miner.all_beers_from_brewery("brewery-canada-brew-pub-2", max_concurrency=2)
+        self.assertEqual(len(beers), 60)
+        self.assertEqual(len({beer.bid for beer in beers}), 60)
+        self.assertIsNone(beers[0].ibu)    # "N/A IBU"
+    
+    def crawl_with_broken_brewery(self, crawl) -> dict[str, int]:
+        # Frontier counts of a crawl where one brewery page cannot be parsed
+        broken = "brewery-canada-brew-pub-1"
+        self.server.broken_breweries.add(broken)
+        self.addCleanup(self.server.broken_breweries.clear)
+        with tempfile.TemporaryDirectory() as tmp, CrawlFrontier(Path(tmp) / "frontier.sqlite") as frontier:
+            self.miner.frontier = frontier
+            breweries = crawl()
+            self.assertNotIn(f"/{broken}", breweries)
+            self.assertEqual(frontier.status(BREWERY, f"/{broken}"), FAILED)
+            return frontier.counts()[BREWERY]
+    
+    def test_unparsable_brewery_is_failed(self):
+        counts = self.crawl_with_broken_brewery(lambda: self.miner.get_top_rated_breweries(country="canada"))
+        self.assertEqual(counts, {DONE: self.server.expected_breweries(["canada"]) - 1, FAILED: 1})
+    
+    def test_unparsable_brewery_is_failed_async(self):
+        counts = self.crawl_with_broken_brewery(
+            lambda: asyncio.run(self.miner.aget_top_rated_breweries(country="canada", max_concurrency=4))
+        )
+        self.assertEqual(counts, {DONE: self.server.expected_breweries(["canada"]) - 1, FAILED: 1})
+    
+    def test_all_beers_are_stored(self):
+        async def crawl():
+            # Nested in an open session, as during an async brewery crawl
+            async with self.miner.async_session():
+                return await self.miner.aall_beers_from_brewery("/brewery-canada-micro-brewery-0/")
+        
+        beers = asyncio.run(crawl())
+        self.assertEqual(len(beers), 60)
+        self.assertEqual(sorted(self.miner.beers), sorted(beer.id_url for beer in beers))
+    
+    def test_all_beers_fall_back_to_webdriver(self):
+        # The whole list, as loaded by clicking "Show More" in the browser
+        self.server.page_size = 100
+        html = self.server.render("/brewery-canada-micro-brewery-0/beer")
+        self.server.page_size = 25
+        self.miner.MORE_BEER_ENDPOINT = "/missing/{brewery_num_id}/{offset}"
+        self.miner._brewery_all_beers = lambda brewery_endpoint: html
+        beers = self.miner.all_beers_from_brewery("brewery-canada-micro-brewery-0")
+        self.assertEqual(len(beers), 60)
+    
+    def all_beers(self, n_beers: int) -> tuple[list, int]:
+        # Beers of a brewery listing n_beers, with the "Show More" requests it took
+        self.server.beers_per_brewery = n_beers
+        self.addCleanup(setattr, self.server, "beers_per_brewery", 60)
+        before = self.server.hits["more_beer"]
+        beers = self.miner.all_beers_from_brewery("brewery-belgium-micro-brewery-1", max_concurrency=1)
+        return beers, self.server.hits["more_beer"] - before
+    
+    def test_all_beers_last_page_shorter(self):
+        beers, requests = self.all_beers(60)    # 25 + 25 + 10
+        self.assertEqual(len(beers), 60)
+        self.assertEqual(requests, 2)
+    
+    def test_all_beers_ends_on_empty_page(self):
+        beers, requests = self.all_beers(50)    # 25 + 25, then an empty fragment
+        self.assertEqual(len(beers), 50)
+        self.assertEqual(requests, 2)
+    
+    def test_all_beers_on_one_page(self):
+        beers, requests = self.all_beers(7)
+        self.assertEqual(len(beers), 7)
+        self.assertEqual(requests, 0)
+    
+    def test_beer_items_without_numeric_id_are_skipped(self):
+        html = """
+        <div class="beer-item"><p class="name"><a href="/b/ipa/12">IPA</a></p></div>
+        <div class="beer-item"><p class="name"><a href="/b/mystery-beer/">Mystery Beer</a></p></div>
+        <div class="beer-item"><p class="name"><a href="/b/stout/34/">Stout</a></p></div>
+        """
+        soup = self.miner.parse_html(html)
+        beers = self.miner._beers_from_beer_list(soup, "brewery-x")
+        self.assertEqual([beer.bid for beer in beers], [12, 34])
+        self.assertEqual(self.miner._count_beer_items(soup), 3)
@@ -0,0 +1,54 @@
+from untappd_miner import UntappdWebMiner
+from untappd_miner.parsing import has_regions, region, region_strainer
+from bs4 import BeautifulSoup
+import contextlib
+import io
+import unittest
+
+HTML = """
+<div class="header"><p>Brewery header</p></div>
+<div class="stats stats-wide"><p><span>Total</span><span>1,000</span></p></div>
+<div class="feed"><abbr>ignored, nested in a skipped region</abbr></div>
+<div class="sidebar"><div class="box"><h3>Top Beers</h3><div><a class="track-click" href="/b/x/1">X</a></div></div></div>
+"""
+
+BREWERY_HOME = """
+<div class="header"><h1>Brewery</h1></div>
+<div class="beer-descrption-read-less">Brewing since 2012.</div>
+<div class="stats"><p><span class="count">1,000</span><span class="title">Total</span></p></div>
+<div class="actions"><abbr class="date-time">1,234</abbr> likes</div>
+<div class="feed"><div class="checkin">ignored</div></div>
+<div class="sidebar"><div class="box"><h3>Top Beers</h3><div><a class="track-click" href="/b/x/1">X</a></div></div></div>
+"""
+
+class TestRegionStrainer(unittest.TestCase):
+    def setUp(self):
+        self.regions = [region("div", "stats"), region("div", "sidebar")]
+        self.soup = BeautifulSoup(HTML, "html.parser", parse_only=region_strainer(self.regions))
+        
+    def test_only_regions_are_built(self):
+        self.assertIsNone(self.soup.find("div", class_="header"))
+        self.assertIsNone(self.soup.find("abbr"))
+        self.assertEqual(self.soup.find("h3").text, "Top Beers")
+    
+    def test_multi_valued_class_matches(self):
+        self.assertIsNotNone(self.soup.find("div", class_="stats"))
+    
+    def test_has_regions(self):
+        self.assertTrue(has_regions(self.soup, self.regions))
+        self.assertFalse(has_regions(self.soup, self.regions + [region("abbr")]))
+    
+    def test_has_regions_without_classes_matches_any_tag(self):
+        soup = BeautifulSoup('<p><abbr class="date-time">12</abbr></p>', "html.parser")
+        self.assertTrue(has_regions(soup, [region("abbr")]))
+
+class TestScopedBreweryHome(unittest.TestCase):
+    def test_scoped_parse_is_kept(self):
+        # Every region is found, so there is no fallback to a full parse
+        miner = UntappdWebMiner(user_agent="test")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            soup = miner._brewery_home_soup(BREWERY_HOME)
+        self.assertNotIn("parsing the whole page", out.getvalue())
+        self.assertIsNotNone(soup.find("abbr"))
+        self.assertIsNone(soup.find("div", class_="feed"))
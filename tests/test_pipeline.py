@@ -0,0 +1,41 @@
+from benchmarks.fake_server import FakeUntappd, quiet
+from untappd_miner import UntappdWebMiner
+from untappd_miner.pipeline import ParsePool, parse_brewery_home, parse_tr_page
+import asyncio
+import unittest
+
+class TestParsePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeUntappd(breweries_per_page=3, feed_items=2)
+        cls.pool = ParsePool(workers=2)
+        cls.miner = UntappdWebMiner(user_agent="test")
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+    
+    def test_worker_output_matches_inline_parse(self):
+        html = self.server.render("/brewery-canada-brew-pub-0")
+        inline = self.miner._brewery_details_from_home_page(self.miner._brewery_home_soup(html))
+        pooled = asyncio.run(self.pool.run(parse_brewery_home, html.encode()))
+        self.assertEqual(pooled, inline)
+    
+    def test_empty_tr_page(self):
+        html = self.server.render("/brewery/top_rated", "country=canada&brewery_type=meadery")
+        self.assertIsNone(asyncio.run(self.pool.run(parse_tr_page, html.encode(), "canada")))
+    
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ParsePool(workers=-1)
+
+class TestPooledCrawl(unittest.TestCase):
+    def test_async_crawl_with_parse_pool(self):
+        with FakeUntappd(breweries_per_page=3, feed_items=2) as server, ParsePool(workers=2) as pool:
+            miner = server.miner()
+            miner.parse_pool = pool
+            with quiet():
+                breweries = asyncio.run(miner.aget_top_rated_breweries(country="canada", max_concurrency=4))
+            self.assertEqual(len(breweries), server.expected_breweries(countries=["canada"]))
+            self.assertEqual(miner.metrics.summary()["parse_pool"]["count"], len(breweries) + 3)
+            self.assertEqual(len(breweries["/brewery-canada-micro-brewery-1"].details.top_beers), 5)
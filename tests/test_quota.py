@@ -0,0 +1,55 @@
+from untappd_miner.quota import HourlyQuota
+from untappd_miner import UntappdApiMiner
+import httpx
+import unittest
+
+class TestHourlyQuota(unittest.TestCase):
+    def test_reserve_is_capped_by_limit(self):
+        quota = HourlyQuota(limit=5)
+        self.assertEqual(quota.reserve(3), 3)
+        self.assertEqual(quota.reserve(3), 2)
+        self.assertEqual(quota.reserve(), 0)
+        self.assertEqual(quota.remaining, 0)
+        self.assertGreater(quota.reset_in(), 0)
+    
+    def test_window_expiry(self):
+        quota = HourlyQuota(limit=2, window=0.0)
+        quota.reserve(2)
+        self.assertEqual(quota.remaining, 2)
+        self.assertEqual(quota.reset_in(), 0.0)
+    
+    def test_sync_with_server_count(self):
+        quota = HourlyQuota(limit=100)
+        quota.reserve(1)
+        quota.sync(remaining=90, limit=100)
+        self.assertEqual(quota.remaining, 90)
+        
+        # A lower server count never gives back local reservations
+        quota.sync(remaining=99)
+        self.assertEqual(quota.remaining, 90)
+
+class TestPlanSources(unittest.TestCase):
+    def test_quota_goes_to_costliest_web_path(self):
+        miner = UntappdApiMiner(hourly_limit=4)
+        miner.api_reserve = 1
+        plan = miner.plan_sources({"brewery": [1, 2], "beer_checkins": [7, 8]})
+        self.assertEqual(plan["beer_checkins"], {"api": ["7", "8"], "web": []})
+        self.assertEqual(plan["brewery"], {"api": ["1"], "web": ["2"]})
+
+class TestManyAPI(unittest.TestCase):
+    def test_malformed_responses_are_failed(self):
+        bodies = {
+            "1": httpx.Response(200, json={"response": {"brewery": {"brewery_id": 1}}}),
+            "2": httpx.Response(200, json={"meta": {"code": 500}}),
+            "3": httpx.Response(200, content=b"{not json", headers={"content-type": "application/json"}),
+            "4": httpx.Response(200, html="<html></html>"),
+        }
+        async def afetch_api(kind, entity_id, params=None):
+            return bodies[entity_id]
+        
+        miner = UntappdApiMiner()
+        miner.afetch_api = afetch_api
+        batch = miner.get_many_API("brewery", [1, 2, 3, 4])
+        self.assertEqual(batch.results, {"1": {"brewery": {"brewery_id": 1}}})
+        self.assertEqual(sorted(batch.failed), ["2", "3", "4"])
+        self.assertTrue(batch.failed["2"].startswith("KeyError"))
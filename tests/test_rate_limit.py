@@ -0,0 +1,43 @@
+from untappd_miner.rate_limit import HostRateLimiter, backoff_delay, parse_retry_after
+import unittest
+
+class TestHostRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.limiter = HostRateLimiter(rate=10.0, burst=2, max_rate=10.0)
+        self.url = "https://untappd.com/brewery/top_rated"
+        
+    def test_burst_does_not_wait(self):
+        self.assertEqual(self.limiter.acquire(self.url), 0.0)
+        self.assertEqual(self.limiter.acquire(self.url), 0.0)
+        self.assertEqual(self.limiter.stats["untappd.com"].requests, 2)
+    
+    def test_waits_once_bucket_is_empty(self):
+        for _ in range(2):
+            self.limiter.acquire(self.url)
+        waited = self.limiter.acquire(self.url)
+        self.assertGreater(waited, 0.0)
+        self.assertGreater(self.limiter.stats["untappd.com"].total_wait, 0.0)
+    
+    def test_hosts_have_separate_buckets(self):
+        for _ in range(2):
+            self.limiter.acquire(self.url)
+        self.assertEqual(self.limiter.acquire("https://api.untappd.com/v4"), 0.0)
+    
+    def test_throttle_halves_rate_and_blocks_host(self):
+        self.limiter.on_throttle(self.url, retry_after=0.2)
+        self.assertEqual(self.limiter.current_rate(self.url), 5.0)
+        self.assertGreaterEqual(self.limiter.acquire(self.url), 0.1)
+        self.assertEqual(self.limiter.stats["untappd.com"].throttled, 1)
+    
+class TestBackoff(unittest.TestCase):
+    def test_parse_retry_after_seconds(self):
+        self.assertEqual(parse_retry_after("120"), 120.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+    
+    def test_parse_retry_after_past_http_date(self):
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+    
+    def test_backoff_honours_retry_after(self):
+        self.assertGreaterEqual(backoff_delay(0, retry_after=30.0), 30.0)
+        self.assertLessEqual(backoff_delay(10, cap=5.0), 5.0)
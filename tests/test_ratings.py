@@ -0,0 +1,165 @@
+from benchmarks.fake_server import FakeUntappd, quiet
+from untappd_miner.ratings import RatingArchive, RatingStore
+from untappd_miner.untappd_miner import BeerRating
+from datetime import datetime, timezone
+from pathlib import Path
+import tempfile
+import unittest
+
+def make_rating(i: int) -> BeerRating:
+    return BeerRating(
+        user_id=f"user{i % 3}",
+        checkin_venue="/v/station-ho-st/3" if i % 2 else None,
+        serving_type="Draft",
+        comment=f"comment {i}" if i % 4 else "",
+        purchased_at="/v/station-ho-st/3",
+        number_tagged_friends=i,
+        has_picture=bool(i % 2),
+        checkin_time=datetime(2023, 5, 1, 12, i, tzinfo=timezone.utc),
+    )
+
+class TestRatingStore(unittest.TestCase):
+    def setUp(self):
+        self.ratings = [make_rating(i) for i in range(10)]
+        self.store = RatingStore(self.ratings)
+        
+    def test_rows_roundtrip(self):
+        self.assertEqual(len(self.store), 10)
+        self.assertEqual(list(self.store), self.ratings)
+        self.assertEqual(self.store[-1], self.ratings[-1])
+        self.assertEqual(self.store[2:4], self.ratings[2:4])
+        with self.assertRaises(IndexError):
+            self.store[10]
+    
+    def test_strings_are_interned(self):
+        self.assertEqual(len(self.store.users), 3)
+        self.assertEqual(len(self.store.venues), 1)
+        self.assertEqual(self.store.user_ids()[:4], ["user0", "user1", "user2", "user0"])
+    
+    def test_naive_checkin_time_is_utc(self):
+        store = RatingStore([make_rating(0)])
+        naive = make_rating(1)
+        naive.checkin_time = datetime(2023, 5, 1, 12, 1)
+        store.append(naive)
+        self.assertEqual(store[1].checkin_time, datetime(2023, 5, 1, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(max(store.checkin_times), int(store[1].checkin_time.timestamp()))
+    
+    def test_beer_rating_has_no_dict(self):
+        self.assertFalse(hasattr(self.ratings[0], "__dict__"))
+
+
+class TestRatingArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = RatingArchive(Path(self.tmp.name) / "ratings.sqlite")
+    
+    def tearDown(self):
+        self.archive.close()
+        self.tmp.cleanup()
+    
+    def test_append_ignores_known_checkins(self):
+        checkins = [(i, make_rating(i)) for i in range(5)]
+        self.assertEqual(self.archive.append(7, checkins), 5)
+        self.assertEqual(self.archive.append(7, checkins[3:] + [(5, make_rating(5))]), 1)
+        self.assertEqual(self.archive.count(7), 6)
+        self.assertEqual(list(self.archive.load(7)), [make_rating(i) for i in range(6)])
+    
+    def test_mark_only_moves_forward(self):
+        self.assertIsNone(self.archive.mark(7))
+        self.archive.set_mark(7, 10, make_rating(10).checkin_time)
+        self.archive.set_mark(7, 4, make_rating(4).checkin_time)
+        self.assertEqual(self.archive.mark(7), 10)
+    
+    def test_cursor(self):
+        self.assertIsNone(self.archive.cursor(7))
+        self.archive.set_cursor(7, 50, 59, make_rating(59).checkin_time)
+        self.archive.set_cursor(7, 25, 59, make_rating(59).checkin_time)
+        self.assertEqual(self.archive.cursor(7), (25, 59, make_rating(59).checkin_time))
+        self.archive.clear_cursor(7)
+        self.assertIsNone(self.archive.cursor(7))
+
+class TestRatingsHarvest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeUntappd(feed_items=25, checkins_per_beer=120)
+        cls.server.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+    
+    def setUp(self):
+        self.server.checkins_per_beer = 120
+        self.tmp = tempfile.TemporaryDirectory()
+        self.miner = self.server.miner()
+        self.miner.rating_archive = RatingArchive(Path(self.tmp.name) / "ratings.sqlite")
+        self.enterContext(quiet())
+    
+    def tearDown(self):
+        self.miner.rating_archive.close()
+        self.tmp.cleanup()
+    
+    def test_feed_parsing(self):
+        ratings = self.miner.get_all_beer_ratings(42, max_pages=1)
+        self.assertEqual(len(ratings), 25)
+        newest = ratings[0]    # k = 119
+        self.assertEqual(newest.user_id, "drinker9")
+        self.assertEqual(newest.checkin_venue, "/v/bar-0/2000000")
+        self.assertEqual(newest.serving_type, "Bottle")
+        self.assertEqual(newest.comment, "Checkin 119")
+        self.assertIsNone(newest.purchased_at)
+        self.assertEqual(ratings[2].purchased_at, "/v/bar-5/2000005")    # k = 117
+        self.assertEqual(ratings[3].number_tagged_friends, 2)    # k = 116
+        self.assertTrue(ratings[4].has_picture)    # k = 115
+        self.assertEqual(newest.checkin_time, datetime(2023, 1, 1, 1, 59, tzinfo=timezone.utc))
+    
+    def test_incremental_harvest(self):
+        # First run pages through the whole history
+        self.assertEqual(len(self.miner.get_all_beer_ratings(42)), 120)
+        self.assertEqual(self.miner.rating_archive.mark(42), FakeUntappd.checkin_id(42, 119))
+        
+        # Next runs only read down to the mark
+        before = self.server.hits["beer"] + self.server.hits["more_feed"]
+        self.assertEqual(self.miner.get_all_beer_ratings(42), [])
+        self.server.checkins_per_beer = 130
+        self.assertEqual(len(self.miner.get_all_beer_ratings(42)), 10)
+        self.assertEqual(self.server.hits["beer"] + self.server.hits["more_feed"] - before, 2)
+        self.assertEqual(self.miner.rating_archive.count(42), 130)
+    
+    def test_partial_backfill_keeps_the_mark(self):
+        self.miner.get_all_beer_ratings(42, max_pages=2)
+        self.assertIsNone(self.miner.rating_archive.mark(42))
+        self.assertEqual(self.miner.rating_archive.count(42), 50)
+        self.miner.get_all_beer_ratings(42)
+        self.assertEqual(self.miner.rating_archive.count(42), 120)
+        self.assertIsNotNone(self.miner.rating_archive.mark(42))
+    
+    def test_capped_backfill_reaches_the_first_checkin(self):
+        # Each capped run resumes below the oldest checkin of the previous one
+        archive = self.miner.rating_archive
+        runs = 0
+        while archive.mark(42) is None:
+            runs += 1
+            self.assertLessEqual(runs, 3)
+            self.assertEqual(len(self.miner.get_all_beer_ratings(42, max_pages=2)), min(50, 120 - (runs - 1) * 50))
+        self.assertEqual(archive.count(42), 120)
+        self.assertEqual(archive.mark(42), FakeUntappd.checkin_id(42, 119))
+        self.assertIsNone(archive.cursor(42))
+        
+        # New checkins posted meanwhile are read down to the mark by the next run
+        self.server.checkins_per_beer = 125
+        self.assertEqual(len(self.miner.get_all_beer_ratings(42, max_pages=2)), 5)
+        self.assertEqual(archive.count(42), 125)
+    
+    def test_harvest_catalogue(self):
+        counts = self.miner.harvest_ratings([1, 2, 3], max_concurrency=2)
+        self.assertEqual(counts, {1: 120, 2: 120, 3: 120})
+        self.server.checkins_per_beer = 121
+        self.assertEqual(self.miner.harvest_ratings([1, 2, 3]), {1: 1, 2: 1, 3: 1})
+    
+    def test_harvest_needs_an_archive(self):
+        self.miner.rating_archive.close()
+        self.miner.rating_archive = None
+        with self.assertRaises(RuntimeError):
+            self.miner.harvest_ratings([1])
+        self.miner.rating_archive = RatingArchive(Path(self.tmp.name) / "ratings.sqlite")
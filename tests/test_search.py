@@ -0,0 +1,39 @@
+from untappd_miner.search import SearchIndex
+from untappd_miner.untappd_miner import Beer, Brewery
+from datetime import date
+import tempfile
+import unittest
+from pathlib import Path
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add_entity("brewery", Brewery("/DieuDuCiel", "Brasserie Dieu du Ciel!", "Montréal", "QC", "Canada", "Brew Pub", 1, 1, 4.0, None))
+        self.index.add_entity("brewery", Brewery("/Dunham", "Brasserie Dunham", "Dunham", "QC", "Canada", "Micro Brewery", 1, 1, 4.0, None))
+        self.index.add_entity("beer", Beer("/b/dunham-saison/1", 1, "Dunham", "Saison Rustique", "Saison / Farmhouse Ale", 5.5, None, 3.9, 10, date(2020, 1, 1), None))
+        
+    def test_prefix_and_accents(self):
+        hits = self.index.search("montre")
+        self.assertEqual([h.key for h in hits], ["/DieuDuCiel"])
+        hits = self.index.search("brasserie du")
+        self.assertEqual([h.key for h in hits], ["/DieuDuCiel", "/Dunham"])
+    
+    def test_kind_and_field_filters(self):
+        self.assertEqual([h.key for h in self.index.search("dunham", kind="brewery", fields=["city"])], ["/Dunham"])
+        self.assertEqual([h.kind for h in self.index.search("saison")], ["beer"])
+    
+    def test_fuzzy(self):
+        self.assertEqual(self.index.search("dunhma"), [])
+        self.assertEqual([h.key for h in self.index.search("dunhma", fuzzy=True, kind="brewery")], ["/Dunham"])
+    
+    def test_update_remove_and_persist(self):
+        self.index.add("brewery", "/Dunham", {"fullname": "Dunham Brewing"})
+        self.assertEqual(self.index.search("brasserie dunham"), [])
+        self.index.remove("beer", "/b/dunham-saison/1")
+        self.assertEqual(self.index.search("saison"), [])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "index.json"
+            self.index.save(path)
+            loaded = SearchIndex.load(path)
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.search("dunham brew")[0].key, "/Dunham")
@@ -0,0 +1,39 @@
+from untappd_miner.snapshot import BrewerySnapshot
+from untappd_miner.untappd_miner import Brewery, BreweryCheckinStats, BreweryDetails
+from dataclasses import asdict
+import tempfile
+import unittest
+from pathlib import Path
+
+def make_brewery(total_ratings: int = 100) -> Brewery:
+    stats = BreweryCheckinStats(total=10, unique=5, monthly=1, current_user=0, likes=3)
+    details = BreweryDetails("desc", stats, ["/v/a/1"], ["/b/x/1"], [], ["/v/b/2"])
+    return Brewery("/Dunham", "Brasserie Dunham", "Dunham", "QC", "Canada", "Micro Brewery", 10, total_ratings, 3.9, details)
+
+class TestBrewerySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot = BrewerySnapshot(Path(self.tmpdir.name) / "snapshot.sqlite", max_age=3600)
+        
+    def tearDown(self):
+        self.snapshot.close()
+        self.tmpdir.cleanup()
+    
+    def _summary(self, brewery: Brewery) -> dict:
+        summary = asdict(brewery)
+        summary.pop("details")
+        return summary
+    
+    def test_unchanged_summary_reuses_previous(self):
+        brewery = make_brewery()
+        self.assertIsNone(self.snapshot.previous(self._summary(brewery)))
+        self.snapshot.put(brewery)
+        self.assertEqual(self.snapshot.previous(self._summary(brewery)), asdict(brewery))
+        self.assertEqual((self.snapshot.stats.new, self.snapshot.stats.reused), (1, 1))
+    
+    def test_changed_summary_or_stale_is_refetched(self):
+        self.snapshot.put(make_brewery())
+        self.assertIsNone(self.snapshot.previous(self._summary(make_brewery(total_ratings=101))))
+        self.snapshot.max_age = 0
+        self.assertIsNone(self.snapshot.previous(self._summary(make_brewery())))
+        self.assertEqual((self.snapshot.stats.changed, self.snapshot.stats.stale), (1, 1))
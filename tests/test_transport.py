@@ -0,0 +1,47 @@
+from benchmarks.fake_server import FakeUntappd
+from untappd_miner import UntappdWebMiner
+from untappd_miner.transport import TransportConfig, TransportStats
+import asyncio
+import contextlib
+import io
+import unittest
+
+class TestTransportConfig(unittest.TestCase):
+    def test_client_settings(self):
+        config = TransportConfig(max_connections=4, max_keepalive_connections=2, connect_timeout=1.5)
+        client = config.client()
+        self.assertEqual(client.timeout.connect, 1.5)
+        self.assertEqual(client.timeout.read, config.read_timeout)
+        self.assertIn("gzip", client.headers["Accept-Encoding"])
+        client.close()
+    
+    def test_no_compression(self):
+        self.assertEqual(TransportConfig(compression=False).headers(), {"Accept-Encoding": "identity"})
+    
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            TransportConfig(max_connections=2, max_keepalive_connections=3)
+
+class TestConnectionReuse(unittest.TestCase):
+    def test_keep_alive_connections_are_reused(self):
+        with FakeUntappd(feed_items=1) as server, UntappdWebMiner(user_agent="test") as miner:
+            urls = [f"{server.url}/brewery-canada-brew-pub-{i}" for i in range(5)]
+            with contextlib.redirect_stdout(io.StringIO()):
+                for url in urls:
+                    miner.fetch_url(url)
+                
+                async def fetch_all():
+                    async with miner.async_session():
+                        for url in urls:
+                            await miner.afetch_url(url)
+                asyncio.run(fetch_all())
+            
+            summary = miner.transport_stats.summary()
+            self.assertEqual(summary["requests"], 10)
+            self.assertEqual(summary["connections"], 2)    # One per client
+            self.assertEqual(summary["reused"], 8)
+            self.assertEqual(summary["http_versions"], {"HTTP/1.1": 10})
+        self.assertTrue(miner.client.is_closed)
+    
+    def test_empty_stats(self):
+        self.assertEqual(TransportStats().summary()["reuse_ratio"], 0.0)
@@ -17,7 +17,7 @@ class TestUntappdMiner(unittest.TestCase):
     
     def test_parse_response_text(self):
         res = self.miner_default.fetch_url(self.base_url)
-        parsed_res = self.miner_default._parse_response(res)
+        parsed_res = self.miner_default.parse_response(res)
         self.assertIsInstance(parsed_res, str)
         
     # TODO test JSON PARSER
@@ -0,0 +1,104 @@
+from benchmarks.fake_server import FakeUntappd, popular_venue_id, quiet
+from untappd_miner.frontier import DONE, FAILED, IN_PROGRESS, VENUE, CrawlFrontier
+from untappd_miner.untappd_miner import venue_id_from_href
+import tempfile
+import unittest
+from pathlib import Path
+
+class TestVenueHref(unittest.TestCase):
+    def test_venue_id_from_href(self):
+        self.assertEqual(venue_id_from_href("/v/station-ho-st/3"), 3)
+        self.assertEqual(venue_id_from_href("/venue/107"), 107)
+        self.assertIsNone(venue_id_from_href("/b/some-beer/12"))
+
+class TestVenueCrawl(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeUntappd(breweries_per_page=3, feed_items=2)
+        cls.server.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+    
+    def setUp(self):
+        self.miner = self.server.miner()
+        self.enterContext(quiet())
+    
+    def test_venue_details(self):
+        venue = self.miner.get_venue_details(f"/v/bar-0/{popular_venue_id(0)}")
+        self.assertEqual(venue.id_venue, popular_venue_id(0))
+        self.assertEqual(venue.name, "Bar 0")
+        self.assertEqual(venue.details, ["Bar", "Beer Store"])
+        self.assertEqual(venue.adress, "0 Rue Saint-Denis, Montreal, QC")
+        self.assertTrue(venue.map_url.startswith("https://maps.google.com/"))
+        self.assertTrue(venue.is_verified)
+        self.assertEqual(venue.stats.total, popular_venue_id(0) * 5)
+        self.assertEqual(venue.loyal_patrons[0], f"patron-{popular_venue_id(0)}-0")
+        self.assertEqual(venue.num_beers_on_menu, popular_venue_id(0) % 97 + 3)
+    
+    def test_unverified_venue_by_id(self):
+        # /venue/{id} redirects to the slugged page
+        venue = self.miner.get_venue_details(popular_venue_id(1))
+        self.assertFalse(venue.is_verified)
+        self.assertIsNone(venue.num_beers_on_menu)
+        self.assertIn(popular_venue_id(1), self.miner.venues)
+    
+    def test_scoped_and_full_parse_agree(self):
+        html = self.server.render(f"/v/bar-2/{popular_venue_id(2)}")
+        scoped = self.miner._venue_from_page(self.miner._venue_page_soup(html), 1)
+        self.miner.scoped_parsing = False
+        full = self.miner._venue_from_page(self.miner._venue_page_soup(html), 1)
+        self.assertEqual(scoped, full)
+    
+    def test_venues_fetched_once(self):
+        self.miner.get_top_rated_breweries(country="canada")
+        before = self.server.hits["venue"]
+        venues = self.miner.get_venues(max_concurrency=4)
+        
+        # Popular venues are listed by every brewery but requested once
+        expected = self.server.expected_venues(countries=["canada"])
+        self.assertEqual(len(venues), expected)
+        self.assertEqual(self.server.hits["venue"] - before, expected)
+        
+        # A second pass has nothing left to fetch
+        self.miner.get_venues()
+        self.assertEqual(self.server.hits["venue"] - before, expected)
+    
+    def test_venues_resume_from_frontier(self):
+        self.miner.get_top_rated_breweries(country="belgium", brewery_type="brew-pub")
+        breweries = list(self.miner.breweries.values())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "frontier.sqlite"
+            with CrawlFrontier(path) as frontier:
+                self.miner.frontier = frontier
+                self.miner.get_venues(breweries[:1])
+                done = len(frontier.entries(VENUE, DONE))
+            
+            # A new miner loads the finished venues instead of fetching them
+            miner = self.server.miner()
+            before = self.server.hits["venue"]
+            with CrawlFrontier(path) as frontier:
+                miner.frontier = frontier
+                venues = miner.get_venues(breweries)
+            self.assertEqual(len(venues), len(breweries) + 3)
+            self.assertEqual(self.server.hits["venue"] - before, len(venues) - done)
+    
+    def test_removed_venue_is_failed(self):
+        self.miner.get_top_rated_breweries(country="canada", brewery_type="brew-pub")
+        removed = popular_venue_id(1)
+        self.server.removed_venues.add(removed)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                with CrawlFrontier(Path(tmp) / "frontier.sqlite") as frontier:
+                    self.miner.frontier = frontier
+                    venues = self.miner.get_venues()
+                    counts = frontier.counts()
+        finally:
+            self.server.removed_venues.clear()
+        
+        # The other venues are mined, the removed one is retried on the next run
+        self.assertNotIn(removed, venues)
+        self.assertEqual(len(venues), self.server.expected_venues(["canada"], ["brew-pub"]) - 1)
+        self.assertEqual(counts[VENUE][FAILED], 1)
+        self.assertNotIn(IN_PROGRESS, counts[VENUE])
@@ -0,0 +1,67 @@
+from untappd_miner.webdriver_pool import WebDriverPool, export_cookies
+from selenium.common.exceptions import WebDriverException
+import httpx
+import unittest
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+    
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise WebDriverException("browser crashed")
+        return "https://untappd.com/"
+    
+    def get_cookies(self):
+        return [{"name": "untappd_user_v3_e", "value": "abc", "domain": ".untappd.com", "path": "/"}]
+    
+    def quit(self):
+        self.quit_called = True
+
+class TestWebDriverPool(unittest.TestCase):
+    def setUp(self):
+        self.drivers = []
+        self.pool = WebDriverPool(factory=self._factory, size=2, max_uses=3)
+        
+    def _factory(self):
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        return driver
+    
+    def test_sessions_are_reused(self):
+        for _ in range(3):
+            with self.pool.session():
+                pass
+        self.assertEqual(len(self.drivers), 1)
+        self.assertEqual(self.pool.stats.reused, 2)
+    
+    def test_recycled_after_max_uses(self):
+        for _ in range(4):
+            with self.pool.session():
+                pass
+        self.assertEqual(len(self.drivers), 2)
+        self.assertTrue(self.drivers[0].quit_called)
+    
+    def test_dead_driver_is_replaced(self):
+        with self.pool.session() as driver:
+            pass
+        driver.alive = False
+        with self.pool.session() as new_driver:
+            self.assertIsNot(new_driver, driver)
+        self.assertEqual(self.pool.stats.recycled, 1)
+    
+    def test_close_quits_idle_drivers(self):
+        with self.pool.session():
+            pass
+        self.pool.close()
+        self.assertTrue(self.drivers[0].quit_called)
+        with self.assertRaises(RuntimeError):
+            with self.pool.session():
+                pass
+    
+    def test_export_cookies(self):
+        client = httpx.Client()
+        self.assertEqual(export_cookies(FakeDriver(), client), 1)
+        self.assertEqual(client.cookies.get("untappd_user_v3_e"), "abc")
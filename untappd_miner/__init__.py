@@ -1 +1,46 @@
-from .untappd_miner import UntappdMiner, UntappdApiMiner, UntappdWebMiner
\ No newline at end of file
+from importlib import import_module
+
+# Public name -> submodule, imported on first access so `import untappd_miner`
+# (and the CLI) stay fast until a miner, httpx or bs4 is actually needed
+_EXPORTS = {
+    "UntappdMiner": "untappd_miner",
+    "UntappdApiMiner": "untappd_miner",
+    "UntappdWebMiner": "untappd_miner",
+    "Beer": "models",
+    "BeerDetails": "models",
+    "BeerRating": "models",
+    "Brewery": "models",
+    "BreweryCheckinStats": "models",
+    "BreweryDetails": "models",
+    "CheckinStats": "models",
+    "Venue": "models",
+    "ResponseCache": "cache",
+    "CrawlFrontier": "frontier",
+    "BrewerySnapshot": "snapshot",
+    "SearchIndex": "search",
+    "EntityGraph": "graph",
+    "RatingArchive": "ratings",
+    "RatingStore": "ratings",
+    "LookupTables": "lookups",
+    "TransportConfig": "transport",
+    "HostRateLimiter": "rate_limit",
+    "Metrics": "metrics",
+    "ParsePool": "pipeline",
+    "ParquetExporter": "export",
+    "MinerAnalytics": "analytics",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value    # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
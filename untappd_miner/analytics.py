@@ -0,0 +1,118 @@
+from typing import TYPE_CHECKING, Iterable
+
+try:    # Optional dependency, pip install untappd-miner[analytics]
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+from .models import Beer, Brewery
+
+if TYPE_CHECKING:    # Analytics of exported data need neither httpx nor bs4
+    from .untappd_miner import UntappdMiner
+
+
+BREWERY_COLUMNS = [
+    "id_url", "fullname", "city", "region", "country", "brewery_type",
+    "number_of_beers", "total_ratings", "weight_avg_ratings",
+]
+BEER_COLUMNS = [
+    "id_url", "bid", "brewery_id", "name", "style", "abv", "ibu",
+    "weight_avg_ratings", "total_ratings", "date_added",
+]
+
+
+class MinerAnalytics:
+    # Columns are built once, every report is then a vectorized pandas/numpy operation
+    def __init__(self, breweries: Iterable[Brewery] = (), beers: Iterable[Beer] = ()) -> None:
+        if pd is None:
+            raise ImportError("pandas and numpy are required for analytics, install untappd-miner[analytics].")
+        self.breweries = self._frame(breweries, BREWERY_COLUMNS)
+        self.beers = self._frame(beers, BEER_COLUMNS)
+
+        # Brewery attributes on each beer, beer brewery_id has no leading "/"
+        brewery_keys = self.breweries["id_url"].str.strip("/")
+        brewery_info = self.breweries.assign(brewery_id=brewery_keys)[["brewery_id", "country", "brewery_type"]]
+        self.beers = self.beers.merge(brewery_info, on="brewery_id", how="left")
+        for frame in (self.breweries, self.beers):
+            for column in ("country", "brewery_type", "style"):
+                if column in frame:
+                    frame[column] = frame[column].astype("category")
+
+    @classmethod
+    def from_miner(cls, miner: "UntappdMiner") -> "MinerAnalytics":
+        return cls(miner.breweries.values(), miner.beers.values())
+
+    def group_stats(self, table: str = "breweries", by: str | list[str] = "country") -> "pd.DataFrame":
+        # e.g. mean weight_avg_ratings by country, brewery_type or style
+        frame = self._table(table)
+        grouped = frame.groupby(by, observed=True)
+        stats = grouped.agg(
+            count=("id_url", "size"),
+            mean_rating=("weight_avg_ratings", "mean"),
+            total_ratings=("total_ratings", "sum"),
+        )
+
+        # Mean of each item's rating weighted by its number of ratings
+        weighted = (frame["weight_avg_ratings"] * frame["total_ratings"]).groupby(
+            [frame[b] for b in ([by] if isinstance(by, str) else by)], observed=True
+        ).sum()
+        stats["weighted_rating"] = weighted / stats["total_ratings"].replace(0, np.nan)
+        return stats.sort_values("weighted_rating", ascending=False)
+
+    def bayesian_rating(
+        self,
+        table: str = "beers",
+        min_ratings: float | None = None,
+        prior_mean: float | None = None,
+    ) -> "pd.Series":
+        # (v * R + m * C) / (v + m): few ratings are pulled towards the global mean C
+        frame = self._table(table)
+        ratings = frame["weight_avg_ratings"].to_numpy(dtype=float)
+        counts = frame["total_ratings"].fillna(0).to_numpy(dtype=float)
+        valid = ~np.isnan(ratings)
+        if prior_mean is None:
+            prior_mean = np.average(ratings[valid], weights=counts[valid]) if counts[valid].sum() else np.nan
+        if min_ratings is None:
+            min_ratings = np.median(counts[valid]) if valid.any() else 0.0
+        score = (counts * np.nan_to_num(ratings) + min_ratings * prior_mean) / (counts + min_ratings)
+        score[~valid] = np.nan
+        return pd.Series(score, index=frame["id_url"], name="bayesian_rating")
+
+    def top_k(
+        self,
+        table: str = "beers",
+        k: int = 10,
+        by: str = "bayesian_rating",
+        group: str | None = None,
+    ) -> "pd.DataFrame":
+        # Top k overall, or per group (e.g. per style or country)
+        frame = self._table(table)
+        if by == "bayesian_rating":
+            frame = frame.assign(bayesian_rating=self.bayesian_rating(table).to_numpy())
+        if group is None:
+            return frame.nlargest(k, by)
+        ranked = frame.sort_values(by, ascending=False)
+        return ranked.groupby(group, observed=True, sort=False).head(k).sort_values([group, by], ascending=[True, False])
+
+    def _table(self, table: str) -> "pd.DataFrame":
+        if table == "breweries":
+            return self.breweries
+        if table == "beers":
+            return self.beers
+        raise ValueError("'table' must be one of ['breweries', 'beers']")
+
+    @staticmethod
+    def _frame(entities: Iterable, columns: list[str]) -> "pd.DataFrame":
+        # One list per column, no intermediate dicts
+        entities = list(entities)
+        data = {c: pd.Series([getattr(e, c) for e in entities], dtype=object) for c in columns}
+        frame = pd.DataFrame(data, columns=columns)
+        for column in ("number_of_beers", "total_ratings", "bid", "ibu"):
+            if column in frame:
+                frame[column] = pd.to_numeric(frame[column]).astype("Int64")
+        for column in ("weight_avg_ratings", "abv"):
+            if column in frame:
+                frame[column] = pd.to_numeric(frame[column]).astype(float)
+        return frame
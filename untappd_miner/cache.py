@@ -0,0 +1,209 @@
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlencode
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import httpx
+
+
+# Headers that no longer describe the stored (already decoded) body
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+@dataclass
+class CachedResponse():
+    key: str
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> dict[str, str]:
+        # Conditional request headers for revalidation
+        validators = {}
+        if self.etag is not None:
+            validators["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            validators["If-Modified-Since"] = self.last_modified
+        return validators
+
+    def to_response(self, params: dict | None = None) -> httpx.Response:
+        request = httpx.Request("GET", self.url, params=params)
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request
+        )
+
+
+@dataclass
+class CacheStats():
+    hits: int = 0
+    revalidated: int = 0    # 304 Not Modified
+    misses: int = 0
+    evictions: int = 0
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str | Path = ".untappd_cache.sqlite",
+        ttl: float = 24 * 3600,
+        max_bytes: int = 512 * 1024 ** 2,
+    ) -> None:
+        if ttl < 0:
+            raise ValueError("'ttl' must be positive.")
+        if max_bytes < 1:
+            raise ValueError("'max_bytes' must be at least 1.")
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses(accessed_at)")
+        self._conn.commit()
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url: str, params: dict | None = None) -> CachedResponse | None:
+        key = self.cache_key(url, params)
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT key, url, status_code, headers, content, etag, last_modified, stored_at
+                FROM responses WHERE key = ?
+                """,
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CachedResponse(
+            key=row[0],
+            url=row[1],
+            status_code=row[2],
+            headers=json.loads(row[3]),
+            content=row[4],
+            etag=row[5],
+            last_modified=row[6],
+            stored_at=row[7]
+        )
+
+    def put(self, url: str, params: dict | None, res: httpx.Response) -> None:
+        # Only successful GETs are worth replaying
+        if res.status_code != 200:
+            return
+        key = self.cache_key(url, params)
+        headers = {k: v for k, v in res.headers.items() if k.lower() not in DROPPED_HEADERS}
+        content = res.content
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                (key, url, status_code, headers, content, etag, last_modified, stored_at, accessed_at, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    url,
+                    res.status_code,
+                    json.dumps(headers),
+                    content,
+                    res.headers.get("ETag"),
+                    res.headers.get("Last-Modified"),
+                    now,
+                    now,
+                    len(content)
+                )
+            )
+            self._conn.commit()
+        self.evict()
+
+    def refresh(self, cached: CachedResponse) -> None:
+        # Server confirmed the copy is still valid (304), restart its ttl
+        now = time.time()
+        cached.stored_at = now
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, cached.key)
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        # Drop least recently used entries until under max_bytes
+        evicted = 0
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return evicted
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC")
+            to_delete = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                to_delete.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+            self._conn.commit()
+            evicted = len(to_delete)
+        self.stats.evictions += evicted
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    @staticmethod
+    def cache_key(url: str, params: dict | None = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
@@ -0,0 +1,196 @@
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import asdict
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+
+# Only the standard library at import time, each command imports what it uses
+
+
+@contextmanager
+def quiet(enabled: bool = True):
+    # The miner prints every request, the command output stays readable
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        yield
+
+
+def print_json(data: dict) -> None:
+    print(json.dumps(data, indent=2, default=str))
+
+
+### Commands ###
+
+def crawl(args: argparse.Namespace) -> int:
+    import asyncio
+    from .cache import ResponseCache
+    from .frontier import CrawlFrontier
+    from .graph import EntityGraph
+    from .untappd_miner import UntappdWebMiner
+
+    user_agent = args.user_agent or (None if args.dotenv else UntappdWebMiner.DEFAULT_USER_AGENT)
+    miner = UntappdWebMiner(args.dotenv, user_agent=user_agent, html_parser=args.html_parser)
+    if args.base_url is not None:
+        miner.BASE_URL = args.base_url
+    if args.lookups is not None:
+        miner.lookups_path = args.lookups    # Refreshed in the background once older than a month
+    with miner, CrawlFrontier(args.frontier) as frontier:
+        if args.fresh:
+            frontier.reset()    # Otherwise pages and breweries done by a previous crawl are skipped
+        miner.frontier = frontier    # Results are kept there, see the export command
+        if args.cache is not None:
+            miner.cache = ResponseCache(args.cache)
+        if args.graph is not None:
+            miner.graph = EntityGraph(args.graph)
+        try:
+            with quiet(not args.verbose):
+                asyncio.run(miner.aget_top_rated_breweries(args.country, args.brewery_type, args.concurrency))
+                if args.venues:
+                    miner.get_venues(max_concurrency=args.concurrency)
+        finally:
+            if miner.cache is not None:
+                miner.cache.close()
+            if miner.graph is not None:
+                miner.graph.close()
+        print_json({
+            "breweries": len(miner.breweries),
+            "venues": len(miner.venues),
+            "frontier": frontier.counts(),
+            "requests": miner.transport_stats.summary()["requests"],
+        })
+    return 0
+
+
+def export(args: argparse.Namespace) -> int:
+    from .frontier import BREWERY, DONE, VENUE, CrawlFrontier
+
+    if not Path(args.frontier).exists():
+        print(f"No frontier at {args.frontier}, run 'untappd-miner crawl' first.", file=sys.stderr)
+        return 1
+    with CrawlFrontier(args.frontier) as frontier:
+        breweries = [payload for _, payload in frontier.entries(BREWERY, DONE)]
+        venues = [payload for _, payload in frontier.entries(VENUE, DONE)]
+
+    out = Path(args.output)
+    out.mkdir(parents=True, exist_ok=True)
+    if args.format == "parquet":
+        written = _export_parquet(out, breweries, venues, args.ratings)
+    else:
+        written = _export_jsonl(out, breweries, venues, args.ratings)
+    print_json(written)
+    return 0
+
+
+def stats(args: argparse.Namespace) -> int:
+    # Only stores that exist are opened, stats never creates an empty database
+    report = {}
+    if Path(args.frontier).exists():
+        from .frontier import CrawlFrontier
+        with CrawlFrontier(args.frontier) as frontier:
+            report["frontier"] = frontier.counts()
+    if args.graph is not None and Path(args.graph).exists():
+        from .graph import EntityGraph
+        with EntityGraph(args.graph) as graph:
+            report["graph"] = graph.counts()
+    if args.ratings is not None and Path(args.ratings).exists():
+        from .ratings import RatingArchive
+        with RatingArchive(args.ratings) as archive:
+            report["ratings"] = {"beers": len(archive.bids()), "ratings": len(archive)}
+    if args.cache is not None and Path(args.cache).exists():
+        from .cache import ResponseCache
+        with ResponseCache(args.cache) as cache:
+            report["cache"] = {"responses": len(cache), "bytes": cache.total_bytes}
+    print_json(report)
+    return 0
+
+
+def _export_jsonl(out: Path, breweries: list[dict], venues: list[dict], ratings_path: str | None) -> dict:
+    # Frontier payloads are written as is, one entity per line
+    written = {"breweries": len(breweries), "venues": len(venues)}
+    for name, rows in (("breweries", breweries), ("venues", venues)):
+        with open(out / f"{name}.jsonl", "w") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str) + "\n")
+    if ratings_path is not None:
+        with open(out / "ratings.jsonl", "w") as f:
+            def write_ratings(bid: str, ratings) -> None:
+                for rating in ratings:
+                    f.write(json.dumps({"bid": bid, **asdict(rating)}, default=str) + "\n")
+            written["ratings"] = _export_ratings(ratings_path, write_ratings)
+    return written
+
+
+def _export_parquet(out: Path, breweries: list[dict], venues: list[dict], ratings_path: str | None) -> dict:
+    from .export import ParquetExporter
+    from .models import brewery_from_dict, venue_from_dict
+
+    written = {"breweries": len(breweries), "venues": len(venues)}
+    with ParquetExporter(out) as exporter:
+        exporter.write_breweries(brewery_from_dict(payload) for payload in breweries)
+        exporter.write_venues(venue_from_dict(payload) for payload in venues)
+        if ratings_path is not None:
+            written["ratings"] = _export_ratings(ratings_path, exporter.write_ratings)
+    return written
+
+
+def _export_ratings(path: str, write) -> int:
+    from .ratings import RatingArchive
+
+    n = 0
+    with RatingArchive(path) as archive:
+        for bid in archive.bids():
+            ratings = archive.load(bid)
+            write(str(bid), ratings)
+            n += len(ratings)
+    return n
+
+
+### Entry point ###
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="untappd-miner", description="Crawl and export untappd.com data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    crawl_parser = commands.add_parser("crawl", help="Crawl the top-rated breweries, checkpointed in the frontier")
+    crawl_parser.add_argument("--country", default="all", help="Country slug, e.g. canada")
+    crawl_parser.add_argument("--brewery-type", default="all", help="Brewery type slug, e.g. micro-brewery")
+    crawl_parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight")
+    crawl_parser.add_argument("--venues", action="store_true", help="Also mine the venues listed by the breweries")
+    crawl_parser.add_argument("--frontier", default=".untappd_frontier.sqlite")
+    crawl_parser.add_argument("--fresh", action="store_true", help="Forget previous crawls and fetch everything again")
+    crawl_parser.add_argument("--cache", default=None, help="On-disk response cache")
+    crawl_parser.add_argument("--graph", default=None, help="Entity graph kept in sync with the crawl")
+    crawl_parser.add_argument("--lookups", default=None, help="Country and brewery type tables, kept up to date")
+    crawl_parser.add_argument("--dotenv", default=None, help="File with USER_AGENT and the Untappd credentials")
+    crawl_parser.add_argument("--user-agent", default=None)
+    crawl_parser.add_argument("--html-parser", default="html.parser", help="bs4 tree builder, e.g. lxml")
+    crawl_parser.add_argument("--base-url", default=None, help=argparse.SUPPRESS)    # Local fake server
+    crawl_parser.add_argument("-v", "--verbose", action="store_true", help="Print every request")
+    crawl_parser.set_defaults(handler=crawl)
+
+    export_parser = commands.add_parser("export", help="Write the crawled entities as JSON lines or parquet")
+    export_parser.add_argument("output", help="Output directory")
+    export_parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    export_parser.add_argument("--frontier", default=".untappd_frontier.sqlite")
+    export_parser.add_argument("--ratings", default=None, help="Rating archive to export as well")
+    export_parser.set_defaults(handler=export)
+
+    stats_parser = commands.add_parser("stats", help="Counts of the local stores")
+    stats_parser.add_argument("--frontier", default=".untappd_frontier.sqlite")
+    stats_parser.add_argument("--graph", default=None)
+    stats_parser.add_argument("--ratings", default=None)
+    stats_parser.add_argument("--cache", default=None)
+    stats_parser.set_defaults(handler=stats)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "concurrency", 1) < 1:
+        parser.error("--concurrency must be at least 1")
+    return args.handler(args)
@@ -0,0 +1,470 @@
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+import httpx
+
+from .frontier import BREWERY, DONE, FAILED, PENDING, TR_PAGE
+from .untappd_miner import Beer, Brewery, UntappdWebMiner, beer_from_dict, brewery_from_dict
+
+
+LEASED = "leased"
+
+# Kinds of leases, on top of the frontier ones
+BEER_LIST = "beer_list"    # key is the brewery id, without the leading "/"
+
+
+@dataclass
+class Lease():
+    kind: str
+    key: str
+    payload: dict | None
+    token: str    # Changes on every claim, stale workers cannot complete a re-leased entry
+    worker: str
+    expires_at: float
+    attempts: int
+
+
+class LeaseQueue:
+    # Shared work queue, entries are leased to one worker at a time and expire without heartbeats
+    def __init__(
+        self,
+        path: str | Path = ".untappd_leases.sqlite",
+        lease_ttl: float = 300.0,
+        max_attempts: int = 3,
+    ) -> None:
+        if lease_ttl <= 0:
+            raise ValueError("'lease_ttl' must be positive.")
+        if max_attempts < 1:
+            raise ValueError("'max_attempts' must be at least 1.")
+        self.path = Path(path)
+        self.lease_ttl = lease_ttl
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT,
+                token TEXT,
+                worker TEXT,
+                expires_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_leases_status ON leases(status, kind)")
+        self._conn.commit()
+
+    def __enter__(self) -> "LeaseQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def add(self, kind: str, key: str, payload: dict | None = None) -> bool:
+        return self.add_many(kind, [(key, payload)]) == 1
+
+    def add_many(self, kind: str, entries: list[tuple[str, dict | None]]) -> int:
+        # Known entries keep their status, workers can fan out without duplicates
+        now = time.time()
+        rows = [
+            (kind, key, PENDING, json.dumps(payload) if payload is not None else None, now)
+            for key, payload in entries
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO leases (kind, key, status, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def claim(self, worker: str, n: int = 1, kinds: list[str] | None = None) -> list[Lease]:
+        now = time.time()
+        kind_filter = f"AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+        with self._lock:
+            self._expire(now)
+            # Single statement, atomic between processes sharing the file
+            rows = self._conn.execute(
+                f"""
+                UPDATE leases
+                SET status = ?, worker = ?, token = lower(hex(randomblob(8))), expires_at = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE rowid IN (
+                    SELECT rowid FROM leases WHERE status = ? {kind_filter} ORDER BY rowid LIMIT ?
+                )
+                RETURNING kind, key, payload, token, worker, expires_at, attempts
+                """,
+                (LEASED, worker, now + self.lease_ttl, now, PENDING, *(kinds or []), n)
+            ).fetchall()
+            self._conn.commit()
+        return [
+            Lease(kind, key, json.loads(payload) if payload is not None else None, token, worker_, expires_at, attempts)
+            for kind, key, payload, token, worker_, expires_at, attempts in rows
+        ]
+
+    def heartbeat(self, tokens: list[str]) -> list[str]:
+        # Extends the leases still held, lost ones are left out of the returned tokens
+        now = time.time()
+        held = []
+        with self._lock:
+            for token in tokens:
+                cur = self._conn.execute(
+                    "UPDATE leases SET expires_at = ?, updated_at = ? WHERE token = ? AND status = ?",
+                    (now + self.lease_ttl, now, token, LEASED)
+                )
+                if cur.rowcount == 1:
+                    held.append(token)
+            self._conn.commit()
+        return held
+
+    def complete(self, token: str, result=None) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                """
+                UPDATE leases SET status = ?, result = ?, error = NULL, token = NULL, updated_at = ?
+                WHERE token = ? AND status = ?
+                """,
+                (DONE, json.dumps(result, default=str) if result is not None else None, time.time(), token, LEASED)
+            )
+            self._conn.commit()
+        return cur.rowcount == 1
+
+    def fail(self, token: str, error: str) -> bool:
+        # Back to pending until max_attempts
+        with self._lock:
+            cur = self._conn.execute(
+                """
+                UPDATE leases
+                SET status = CASE WHEN attempts < ? THEN ? ELSE ? END, error = ?, token = NULL, updated_at = ?
+                WHERE token = ? AND status = ?
+                """,
+                (self.max_attempts, PENDING, FAILED, error, time.time(), token, LEASED)
+            )
+            self._conn.commit()
+        return cur.rowcount == 1
+
+    def release(self, token: str) -> bool:
+        # Hand a lease back untouched, e.g. on worker shutdown
+        with self._lock:
+            cur = self._conn.execute(
+                """
+                UPDATE leases SET status = ?, attempts = MAX(attempts - 1, 0), token = NULL, updated_at = ?
+                WHERE token = ? AND status = ?
+                """,
+                (PENDING, time.time(), token, LEASED)
+            )
+            self._conn.commit()
+        return cur.rowcount == 1
+
+    def results(self, kind: str) -> list[tuple[str, object]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, result FROM leases WHERE kind = ? AND status = ? ORDER BY rowid", (kind, DONE)
+            ).fetchall()
+        return [(key, json.loads(result) if result is not None else None) for key, result in rows]
+
+    def failures(self, kind: str) -> list[tuple[str, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, error FROM leases WHERE kind = ? AND status = ? ORDER BY rowid", (kind, FAILED)
+            ).fetchall()
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            self._expire(time.time())
+            self._conn.commit()
+            rows = self._conn.execute("SELECT kind, status, COUNT(*) FROM leases GROUP BY kind, status").fetchall()
+        counts = {}
+        for kind, status, n in rows:
+            counts.setdefault(kind, {})[status] = n
+        return counts
+
+    def _expire(self, now: float) -> None:
+        # Leases of dead workers go back to pending, or fail once out of attempts
+        self._conn.execute(
+            """
+            UPDATE leases
+            SET status = CASE WHEN attempts < ? THEN ? ELSE ? END,
+                error = 'lease expired', token = NULL, updated_at = ?
+            WHERE status = ? AND expires_at < ?
+            """,
+            (self.max_attempts, PENDING, FAILED, now, LEASED, now)
+        )
+
+
+# Methods of LeaseQueue served to remote workers
+REMOTE_METHODS = ["add_many", "claim", "heartbeat", "complete", "fail", "release", "results", "failures", "counts"]
+
+
+class LeaseServer:
+    # JSON over HTTP front of a LeaseQueue, for workers on other machines
+    def __init__(self, queue: LeaseQueue, host: str = "127.0.0.1", port: int = 8765) -> None:
+        self.queue = queue
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "LeaseServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def serve_forever(self) -> None:
+        print(f"Serving leases on {self.url}")
+        self._server.serve_forever()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        queue = self.queue
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/config":
+                    self.send_error(404)
+                    return
+                self._reply({"lease_ttl": queue.lease_ttl, "max_attempts": queue.max_attempts})
+
+            def do_POST(self) -> None:
+                method = self.path.strip("/")
+                if method not in REMOTE_METHODS:
+                    self.send_error(404)
+                    return
+                kwargs = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                result = getattr(queue, method)(**kwargs)
+                if method == "claim":
+                    result = [asdict(lease) for lease in result]
+                self._reply(result)
+
+            def _reply(self, data) -> None:
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+class RemoteLeaseQueue:
+    # Same interface as LeaseQueue, backed by a LeaseServer
+    def __init__(self, url: str, timeout: float = 30.0) -> None:
+        self.url = url.rstrip("/")
+        self._client = httpx.Client(base_url=self.url, timeout=timeout)
+        config = self._client.get("/config").raise_for_status().json()
+        self.lease_ttl = config["lease_ttl"]
+        self.max_attempts = config["max_attempts"]
+
+    def __enter__(self) -> "RemoteLeaseQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._client.close()
+
+    def add(self, kind: str, key: str, payload: dict | None = None) -> bool:
+        return self.add_many(kind, [(key, payload)]) == 1
+
+    def add_many(self, kind: str, entries: list[tuple[str, dict | None]]) -> int:
+        return self._call("add_many", kind=kind, entries=entries)
+
+    def claim(self, worker: str, n: int = 1, kinds: list[str] | None = None) -> list[Lease]:
+        return [Lease(**lease) for lease in self._call("claim", worker=worker, n=n, kinds=kinds)]
+
+    def heartbeat(self, tokens: list[str]) -> list[str]:
+        return self._call("heartbeat", tokens=tokens)
+
+    def complete(self, token: str, result=None) -> bool:
+        # Round-trip through JSON first, dates become ISO strings as in LeaseQueue
+        return self._call("complete", token=token, result=json.loads(json.dumps(result, default=str)))
+
+    def fail(self, token: str, error: str) -> bool:
+        return self._call("fail", token=token, error=error)
+
+    def release(self, token: str) -> bool:
+        return self._call("release", token=token)
+
+    def results(self, kind: str) -> list[tuple[str, object]]:
+        return [tuple(row) for row in self._call("results", kind=kind)]
+
+    def failures(self, kind: str) -> list[tuple[str, str]]:
+        return [tuple(row) for row in self._call("failures", kind=kind)]
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        return self._call("counts")
+
+    def _call(self, method: str, **kwargs):
+        return self._client.post(f"/{method}", json=kwargs).raise_for_status().json()
+
+
+class CrawlCoordinator:
+    # Seeds the shared queue and collects what the workers returned
+    def __init__(self, queue: LeaseQueue | RemoteLeaseQueue, miner: UntappdWebMiner | None = None) -> None:
+        self.queue = queue
+        self.miner = miner
+
+    def seed_top_rated(self, country: str = "all", brewery_type: str = "all") -> int:
+        # One lease per TR page, workers fan out the breweries they list
+        if self.miner is None:
+            raise ValueError("A miner is required to read the top-rated filters.")
+        countries, brewery_types = self.miner._tr_filters(country, brewery_type)
+        return self.queue.add_many(TR_PAGE, [(f"{c}/{b}", None) for c in countries for b in brewery_types])
+
+    def seed_beer_lists(self, brewery_ids: list[str]) -> int:
+        return self.queue.add_many(BEER_LIST, [(str(b).strip("/"), None) for b in brewery_ids])
+
+    def progress(self) -> dict[str, dict[str, int]]:
+        return self.queue.counts()
+
+    def done(self) -> bool:
+        return not any(
+            statuses.get(PENDING, 0) or statuses.get(LEASED, 0) for statuses in self.progress().values()
+        )
+
+    def wait(self, poll_interval: float = 5.0, timeout: float | None = None) -> bool:
+        # True once nothing is pending or leased
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def breweries(self) -> dict[str, Brewery]:
+        return {key: brewery_from_dict(result) for key, result in self.queue.results(BREWERY)}
+
+    def beers(self) -> dict[str, Beer]:
+        beers = {}
+        for _, result in self.queue.results(BEER_LIST):
+            for data in result or []:
+                beer = beer_from_dict(data)
+                beers[beer.id_url] = beer
+        return beers
+
+
+class CrawlWorker:
+    # Claims leases from the shared queue, one miner (client, IP, session) per worker
+    def __init__(
+        self,
+        queue: LeaseQueue | RemoteLeaseQueue,
+        miner: UntappdWebMiner,
+        worker_id: str | None = None,
+        kinds: list[str] | None = None,
+        crawl_beers: bool = False,
+        heartbeat_interval: float | None = None,
+    ) -> None:
+        self.queue = queue
+        self.miner = miner
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.kinds = kinds    # None takes any kind
+        self.crawl_beers = crawl_beers    # Queue the beer list of every mined brewery
+        self.heartbeat_interval = heartbeat_interval or queue.lease_ttl / 3
+        self.processed = 0
+        self.failed = 0
+        self.handlers = {TR_PAGE: self._crawl_tr_page, BREWERY: self._crawl_brewery, BEER_LIST: self._crawl_beer_list}
+
+    def run(self, max_leases: int | None = None, idle_timeout: float = 30.0, poll_interval: float = 1.0) -> int:
+        # Stops after max_leases or once the queue stayed empty for idle_timeout
+        idle_since = time.monotonic()
+        while max_leases is None or self.processed + self.failed < max_leases:
+            leases = self.queue.claim(self.worker_id, n=1, kinds=self.kinds)
+            if not leases:
+                if time.monotonic() - idle_since >= idle_timeout:
+                    break
+                time.sleep(poll_interval)
+                continue
+            for lease in leases:
+                self.process(lease)
+            idle_since = time.monotonic()
+        return self.processed
+
+    def process(self, lease: Lease) -> bool:
+        with self._heartbeat(lease):
+            try:
+                result = self.handlers[lease.kind](lease)
+            except KeyboardInterrupt:
+                self.queue.release(lease.token)
+                raise
+            except Exception as e:    # Any page error fails the lease, not the worker
+                print(f"Lease {lease.kind} {lease.key} failed on {self.worker_id}: {e!r}")
+                self.queue.fail(lease.token, repr(e))
+                self.failed += 1
+                return False
+        if not self.queue.complete(lease.token, result):
+            print(f"Lease {lease.kind} {lease.key} was lost by {self.worker_id}, result dropped")
+            return False
+        self.processed += 1
+        return True
+
+    @contextmanager
+    def _heartbeat(self, lease: Lease):
+        # Keeps the lease alive while a slow page (selenium, backoff) is crawled
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(self.heartbeat_interval):
+                if not self.queue.heartbeat([lease.token]):
+                    return
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def _crawl_tr_page(self, lease: Lease) -> list[dict]:
+        c_slug, btype = lease.key.split("/", 1)
+        url = self.miner.BASE_URL + self.miner.BREWERY_TR_ENDPOINT
+        headers = {"User-Agent": self.miner.user_agent}
+        soup = self.miner.fetch_soup(url=url, headers=headers, params={"country": c_slug, "brewery_type": btype})
+        breweries_data = self.miner._tr_page_breweries(soup, c_slug) or []
+        self.queue.add_many(BREWERY, [(data["id_url"], data) for data in breweries_data])
+        return breweries_data
+
+    def _crawl_brewery(self, lease: Lease) -> dict:
+        if lease.payload is None:
+            raise ValueError(f"Brewery lease {lease.key} has no top-rated base info.")
+        brewery_data = self.miner._brewery_from_baseinfo(lease.payload)
+        if self.crawl_beers:
+            self.queue.add(BEER_LIST, brewery_data.id_url.strip("/"))
+        return asdict(brewery_data)
+
+    def _crawl_beer_list(self, lease: Lease) -> list[dict]:
+        return [asdict(beer) for beer in self.miner.all_beers_from_brewery(lease.key)]
@@ -0,0 +1,285 @@
+from datetime import date
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import quote
+import uuid
+
+try:    # Optional dependency, pip install untappd-miner[parquet]
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from .models import Beer, BeerRating, Brewery, Venue
+
+
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"    # Same as hive/pyarrow for null values
+
+
+def _schemas() -> dict:
+    checkin_fields = [
+        pa.field("checkins_total", pa.int64()),
+        pa.field("checkins_unique", pa.int64()),
+        pa.field("checkins_monthly", pa.int64()),
+        pa.field("checkins_current_user", pa.int64()),
+    ]
+    ids = pa.list_(pa.string())
+    return {
+        "breweries": pa.schema([
+            pa.field("id_url", pa.string(), nullable=False),
+            pa.field("fullname", pa.string()),
+            pa.field("city", pa.string()),
+            pa.field("region", pa.string()),
+            pa.field("country", pa.string()),
+            pa.field("brewery_type", pa.string()),
+            pa.field("number_of_beers", pa.int64()),
+            pa.field("total_ratings", pa.int64()),
+            pa.field("weight_avg_ratings", pa.float64()),
+            pa.field("description", pa.string()),
+            *checkin_fields,
+            pa.field("likes", pa.int64()),
+            pa.field("brewery_locations", ids),
+            pa.field("top_beers", ids),
+            pa.field("all_beers", ids),
+            pa.field("popular_locations", ids),
+            pa.field("crawl_date", pa.date32()),
+        ]),
+        "beers": pa.schema([
+            pa.field("id_url", pa.string(), nullable=False),
+            pa.field("bid", pa.int64()),
+            pa.field("brewery_id", pa.string()),
+            pa.field("name", pa.string()),
+            pa.field("style", pa.string()),
+            pa.field("abv", pa.float64()),
+            pa.field("ibu", pa.int64()),
+            pa.field("weight_avg_ratings", pa.float64()),
+            pa.field("total_ratings", pa.int64()),
+            pa.field("date_added", pa.date32()),
+            pa.field("description", pa.string()),
+            *checkin_fields,
+            pa.field("loyal_drinkers", ids),
+            pa.field("similar_beers", pa.list_(pa.int64())),
+            pa.field("verified_locations", ids),
+            pa.field("crawl_date", pa.date32()),
+        ]),
+        "venues": pa.schema([
+            pa.field("id_venue", pa.int64(), nullable=False),
+            pa.field("name", pa.string()),
+            pa.field("adress", pa.string()),
+            pa.field("map_url", pa.string()),
+            pa.field("is_verified", pa.bool_()),
+            pa.field("details", ids),
+            *checkin_fields,
+            pa.field("loyal_patrons", ids),
+            pa.field("num_beers_on_menu", pa.int64()),
+            pa.field("crawl_date", pa.date32()),
+        ]),
+        "ratings": pa.schema([
+            pa.field("beer_id", pa.string(), nullable=False),
+            pa.field("user_id", pa.string()),
+            pa.field("checkin_venue", pa.string()),
+            pa.field("serving_type", pa.string()),
+            pa.field("comment", pa.string()),
+            pa.field("purchased_at", pa.string()),
+            pa.field("number_tagged_friends", pa.int64()),
+            pa.field("has_picture", pa.bool_()),
+            pa.field("checkin_time", pa.timestamp("s", tz="UTC")),
+            pa.field("crawl_date", pa.date32()),
+        ]),
+    }
+
+
+def _checkin_columns(stats) -> dict:
+    return {
+        "checkins_total": stats.total if stats is not None else None,
+        "checkins_unique": stats.unique if stats is not None else None,
+        "checkins_monthly": stats.monthly if stats is not None else None,
+        "checkins_current_user": stats.current_user if stats is not None else None,
+    }
+
+
+def brewery_row(brewery: Brewery) -> dict:
+    details = brewery.details
+    stats = details.checkin_stats if details is not None else None
+    return {
+        "id_url": brewery.id_url,
+        "fullname": brewery.fullname,
+        "city": brewery.city,
+        "region": brewery.region,
+        "country": brewery.country,
+        "brewery_type": brewery.brewery_type,
+        "number_of_beers": brewery.number_of_beers,
+        "total_ratings": brewery.total_ratings,
+        "weight_avg_ratings": brewery.weight_avg_ratings,
+        "description": details.description if details is not None else None,
+        **_checkin_columns(stats),
+        "likes": stats.likes if stats is not None else None,
+        "brewery_locations": details.brewery_locations if details is not None else None,
+        "top_beers": details.top_beers if details is not None else None,
+        "all_beers": details.all_beers if details is not None else None,
+        "popular_locations": details.popular_locations if details is not None else None,
+    }
+
+
+def beer_row(beer: Beer) -> dict:
+    details = beer.details
+    return {
+        "id_url": beer.id_url,
+        "bid": beer.bid,
+        "brewery_id": beer.brewery_id,
+        "name": beer.name,
+        "style": beer.style,
+        "abv": beer.abv,
+        "ibu": beer.ibu,
+        "weight_avg_ratings": beer.weight_avg_ratings,
+        "total_ratings": beer.total_ratings,
+        "date_added": beer.date_added,
+        "description": details.description if details is not None else None,
+        **_checkin_columns(details.checkin_stats if details is not None else None),
+        "loyal_drinkers": details.loyal_drinkers if details is not None else None,
+        "similar_beers": details.similar_beers if details is not None else None,
+        "verified_locations": details.verified_locations if details is not None else None,
+    }
+
+
+def venue_row(venue: Venue) -> dict:
+    return {
+        "id_venue": venue.id_venue,
+        "name": venue.name,
+        "adress": venue.adress,
+        "map_url": venue.map_url,
+        "is_verified": venue.is_verified,
+        "details": venue.details,
+        **_checkin_columns(venue.stats),
+        "loyal_patrons": venue.loyal_patrons,
+        "num_beers_on_menu": venue.num_beers_on_menu,
+    }
+
+
+def rating_row(beer_id: str, rating: BeerRating) -> dict:
+    return {
+        "beer_id": beer_id,
+        "user_id": rating.user_id,
+        "checkin_venue": rating.checkin_venue,
+        "serving_type": rating.serving_type,
+        "comment": rating.comment,
+        "purchased_at": rating.purchased_at,
+        "number_tagged_friends": rating.number_tagged_friends,
+        "has_picture": rating.has_picture,
+        "checkin_time": rating.checkin_time,
+    }
+
+
+class ParquetExporter:
+    def __init__(
+        self,
+        root: str | Path,
+        partition_by: str | None = "crawl_date",
+        batch_size: int = 10_000,
+        crawl_date: date | None = None,
+        compression: str = "zstd",
+    ) -> None:
+        if pa is None:
+            raise ImportError("pyarrow is required for parquet export, install untappd-miner[parquet].")
+        if batch_size < 1:
+            raise ValueError("'batch_size' must be at least 1.")
+        self.root = Path(root)
+        self.partition_by = partition_by    # Ignored for tables without that column
+        self.batch_size = batch_size    # Rows per parquet row group
+        self.crawl_date = crawl_date or date.today()
+        self.compression = compression
+        self.schemas = _schemas()
+        self.rows_written = {table: 0 for table in self.schemas}
+        self._buffers: dict[tuple[str, str | None], list[dict]] = {}
+        self._writers: dict[tuple[str, str | None], pq.ParquetWriter] = {}
+        self._run_id = uuid.uuid4().hex[:8]    # Appending runs never overwrite files
+
+    def __enter__(self) -> "ParquetExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write_breweries(self, breweries: Iterable[Brewery]) -> None:
+        for brewery in breweries:
+            self._append("breweries", brewery_row(brewery))
+
+    def write_beers(self, beers: Iterable[Beer]) -> None:
+        for beer in beers:
+            self._append("beers", beer_row(beer))
+
+    def write_venues(self, venues: Iterable[Venue]) -> None:
+        for venue in venues:
+            self._append("venues", venue_row(venue))
+
+    def write_ratings(self, beer_id: str, ratings: Iterable[BeerRating]) -> None:
+        for rating in ratings:
+            self._append("ratings", rating_row(beer_id, rating))
+
+    def flush(self) -> None:
+        for key in list(self._buffers):
+            self._flush(key)
+
+    def close(self) -> None:
+        self.flush()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def _append(self, table: str, row: dict) -> None:
+        row["crawl_date"] = self.crawl_date
+        partition = self._partition_value(table, row)
+        key = (table, partition)
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self._flush(key)
+
+    def _flush(self, key: tuple[str, str | None]) -> None:
+        rows = self._buffers.pop(key, [])
+        if not rows:
+            return
+        table, partition = key
+        schema = self._file_schema(table)
+        arrow_table = pa.Table.from_pylist(rows, schema=schema)
+        if key not in self._writers:
+            self._writers[key] = pq.ParquetWriter(
+                self._file_path(table, partition),
+                schema,
+                compression=self.compression
+            )
+        self._writers[key].write_table(arrow_table, row_group_size=self.batch_size)
+        self.rows_written[table] += len(rows)
+
+    def _partitioned(self, table: str) -> bool:
+        return self.partition_by is not None and self.partition_by in self.schemas[table].names
+
+    def _partition_value(self, table: str, row: dict) -> str | None:
+        # Hive-style directory value, the column itself lives in the path
+        if not self._partitioned(table):
+            return None
+        value = row.pop(self.partition_by)
+        return quote(str(value), safe="") if value is not None else NULL_PARTITION
+
+    def _file_schema(self, table: str) -> "pa.Schema":
+        schema = self.schemas[table]
+        if self._partitioned(table):
+            schema = schema.remove(schema.get_field_index(self.partition_by))
+        return schema
+
+    def _file_path(self, table: str, partition: str | None) -> Path:
+        directory = self.root / table
+        if partition is not None:
+            directory = directory / f"{self.partition_by}={partition}"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"part-{self.crawl_date.isoformat()}-{self._run_id}.parquet"
+
+
+def read_table(root: str | Path, table: str, columns: list[str] | None = None, filter=None) -> "pa.Table":
+    # Column pruning and partition filters are pushed down by pyarrow.dataset
+    if pa is None:
+        raise ImportError("pyarrow is required for parquet export, install untappd-miner[parquet].")
+    import pyarrow.dataset as ds
+    dataset = ds.dataset(Path(root) / table, format="parquet", partitioning="hive")
+    return dataset.to_table(columns=columns, filter=filter)
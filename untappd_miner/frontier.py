@@ -0,0 +1,169 @@
+from pathlib import Path
+import json
+import sqlite3
+import threading
+import time
+
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+# Kinds of frontier entries
+TR_PAGE = "tr_page"    # key is "country/brewery_type"
+BREWERY = "brewery"    # key is the brewery id_url
+VENUE = "venue"    # key is the numeric venue id
+
+
+class CrawlFrontier:
+    def __init__(self, path: str | Path = ".untappd_frontier.sqlite", max_attempts: int = 3) -> None:
+        if max_attempts < 1:
+            raise ValueError("'max_attempts' must be at least 1.")
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                payload TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_kind_status ON frontier(kind, status)")
+        self._conn.commit()
+        self.requeue()
+
+    def __enter__(self) -> "CrawlFrontier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def requeue(self) -> int:
+        # New run: work interrupted or failed in a previous run is pending again,
+        # up to max_attempts, so an entry that crashes every run is eventually given up
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE frontier SET status = ?, error = COALESCE(error, 'interrupted'), updated_at = ?
+                WHERE status = ? AND attempts >= ?
+                """,
+                (FAILED, now, IN_PROGRESS, self.max_attempts)
+            )
+            cur = self._conn.execute(
+                """
+                UPDATE frontier SET status = ?, updated_at = ?
+                WHERE status IN (?, ?) AND attempts < ?
+                """,
+                (PENDING, now, IN_PROGRESS, FAILED, self.max_attempts)
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+    def add(self, kind: str, key: str, payload: dict | None = None) -> bool:
+        return self.add_many(kind, [(key, payload)]) == 1
+
+    def add_many(self, kind: str, entries: list[tuple[str, dict | None]]) -> int:
+        # Known entries keep their status
+        now = time.time()
+        rows = [
+            (kind, key, PENDING, json.dumps(payload) if payload is not None else None, now)
+            for key, payload in entries
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO frontier (kind, key, status, payload, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def claim(self, kind: str, key: str) -> bool:
+        # At most once per run: only a pending entry can be claimed
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR IGNORE INTO frontier (kind, key, status, updated_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (kind, key, PENDING, now)
+            )
+            cur = self._conn.execute(
+                """
+                UPDATE frontier SET status = ?, attempts = attempts + 1, updated_at = ?
+                WHERE kind = ? AND key = ? AND status = ?
+                """,
+                (IN_PROGRESS, now, kind, key, PENDING)
+            )
+            self._conn.commit()
+        return cur.rowcount == 1
+
+    def mark_done(self, kind: str, key: str, payload: dict | None = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE frontier SET status = ?, payload = COALESCE(?, payload), error = NULL, updated_at = ?
+                WHERE kind = ? AND key = ?
+                """,
+                (DONE, json.dumps(payload) if payload is not None else None, time.time(), kind, key)
+            )
+            self._conn.commit()
+
+    def mark_failed(self, kind: str, key: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE frontier SET status = ?, error = ?, updated_at = ? WHERE kind = ? AND key = ?",
+                (FAILED, error, time.time(), kind, key)
+            )
+            self._conn.commit()
+
+    def status(self, kind: str, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM frontier WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def entries(self, kind: str, status: str) -> list[tuple[str, dict | None]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, payload FROM frontier WHERE kind = ? AND status = ? ORDER BY rowid",
+                (kind, status)
+            ).fetchall()
+        return [(key, json.loads(payload) if payload is not None else None) for key, payload in rows]
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, status, COUNT(*) FROM frontier GROUP BY kind, status"
+            ).fetchall()
+        counts = {}
+        for kind, status, n in rows:
+            counts.setdefault(kind, {})[status] = n
+        return counts
+
+    def reset(self) -> None:
+        # Forget everything, the next crawl starts from scratch
+        with self._lock:
+            self._conn.execute("DELETE FROM frontier")
+            self._conn.commit()
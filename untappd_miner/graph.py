@@ -0,0 +1,253 @@
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable
+import json
+import sqlite3
+import threading
+import time
+
+
+# Relations kept for each entity kind: (relation, target kind)
+RELATIONS = {
+    "brewery": [("top_beer", "beer"), ("location", "venue"), ("popular_location", "venue")],
+    "beer": [
+        ("brewed_by", "brewery"),
+        ("similar", "beer"),
+        ("loyal_drinker", "user"),
+        ("verified_location", "venue"),
+    ],
+    "venue": [("loyal_patron", "user")],
+    "user": [],
+}
+RELATION_NAMES = {rel for relations in RELATIONS.values() for rel, _ in relations}
+REVERSE = "~"    # "~top_beer" follows top_beer edges backwards, beer -> brewery
+
+
+def brewery_key(id_url: str) -> str:
+    # "/brewery-slug" from the TR page, "brewery-slug" from beer lists
+    return "/" + id_url.strip("/")
+
+
+def trailing_id(href: str | int) -> str:
+    # "/b/slug/123" -> "123", "/v/slug/456" -> "456", 123 -> "123"
+    return str(href).rstrip("/").rsplit("/", 1)[-1]
+
+
+def user_key(href: str) -> str:
+    return href.strip("/").removeprefix("user/")
+
+
+def entity_key(kind: str, entity) -> str:
+    if kind == "brewery":
+        return brewery_key(entity.id_url)
+    if kind == "beer":
+        return str(entity.bid)
+    if kind == "venue":
+        return str(entity.id_venue)
+    raise ValueError(f"'kind' must be one of {['brewery', 'beer', 'venue']}")
+
+
+def entity_edges(kind: str, entity) -> list[tuple[str, str, str]]:
+    # (relation, target kind, target key) of the id lists of a Brewery, Beer or Venue
+    edges = []
+    if kind == "brewery" and entity.details is not None:
+        details = entity.details
+        edges += [("top_beer", "beer", trailing_id(href)) for href in details.top_beers]
+        edges += [("location", "venue", trailing_id(href)) for href in details.brewery_locations]
+        edges += [("popular_location", "venue", trailing_id(href)) for href in details.popular_locations]
+    elif kind == "beer":
+        if entity.brewery_id:
+            edges.append(("brewed_by", "brewery", brewery_key(entity.brewery_id)))
+        details = entity.details
+        if details is not None:
+            edges += [("similar", "beer", trailing_id(bid)) for bid in details.similar_beers]
+            edges += [("loyal_drinker", "user", user_key(u)) for u in details.loyal_drinkers]
+            edges += [("verified_location", "venue", trailing_id(href)) for href in details.verified_locations]
+    elif kind == "venue":
+        edges += [("loyal_patron", "user", user_key(u)) for u in entity.loyal_patrons]
+    return list(dict.fromkeys(edges))
+
+
+class EntityGraph:
+    # Breweries, beers, venues and users linked by the id lists of the dataclasses
+    def __init__(self, path: str | Path = ".untappd_graph.sqlite", batch_size: int = 500) -> None:
+        if batch_size < 1:
+            raise ValueError("'batch_size' must be at least 1.")
+        self.path = Path(path)
+        self.batch_size = batch_size    # Entities buffered by add() before one bulk upsert
+        self._pending: list[tuple[str, object]] = []
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS nodes (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                name TEXT,
+                payload TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS edges (
+                src_kind TEXT NOT NULL,
+                src TEXT NOT NULL,
+                rel TEXT NOT NULL,
+                dst_kind TEXT NOT NULL,
+                dst TEXT NOT NULL,
+                PRIMARY KEY (src_kind, src, rel, dst_kind, dst)
+            ) WITHOUT ROWID
+            """
+        )
+        # Reverse lookups, e.g. breweries listing a venue
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_dst ON edges(dst_kind, dst, rel)")
+        self._conn.commit()
+
+    def __enter__(self) -> "EntityGraph":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute("SELECT kind, COUNT(*) FROM nodes GROUP BY kind").fetchall()
+            edges = self._conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+        return {**dict(rows), "edges": edges}
+
+    ### Writes ###
+
+    def add(self, kind: str, entity) -> None:
+        # Buffered, written with the next bulk upsert
+        with self._lock:
+            self._pending.append((kind, entity))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return self.upsert(pending) if pending else 0
+
+    def upsert(self, entities: Iterable[tuple[str, object]]) -> int:
+        # One transaction, the outgoing edges of each entity are replaced by its current id lists
+        now = time.time()
+        nodes, stubs, edges, sources = [], [], [], []
+        for kind, entity in entities:
+            key = entity_key(kind, entity)
+            payload = json.dumps(asdict(entity), default=str)
+            name = getattr(entity, "fullname", None) or getattr(entity, "name", None)
+            nodes.append((kind, key, name, payload, now))
+            sources.append((kind, key))
+            for rel, dst_kind, dst in entity_edges(kind, entity):
+                edges.append((kind, key, rel, dst_kind, dst))
+                stubs.append((dst_kind, dst, now))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    """
+                    INSERT INTO nodes (kind, key, name, payload, updated_at) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (kind, key) DO UPDATE SET
+                        name = excluded.name, payload = excluded.payload, updated_at = excluded.updated_at
+                    """,
+                    nodes
+                )
+                # Entities only known from an id list, filled in once mined
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO nodes (kind, key, updated_at) VALUES (?, ?, ?)", stubs
+                )
+                self._conn.executemany("DELETE FROM edges WHERE src_kind = ? AND src = ?", sources)
+                self._conn.executemany("INSERT OR IGNORE INTO edges VALUES (?, ?, ?, ?, ?)", edges)
+        return len(nodes)
+
+    ### Queries ###
+
+    def node(self, kind: str, key: str) -> dict | None:
+        # Payload of a mined entity, None for unknown or stub nodes
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(
+                "SELECT payload FROM nodes WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None and row[0] is not None else None
+
+    def neighbours(self, kind: str, keys: str | Iterable[str], rel: str) -> list[tuple[str, str]]:
+        # (kind, key) one hop away from any of keys, rel prefixed with REVERSE walks edges backwards
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        if rel.removeprefix(REVERSE) not in RELATION_NAMES:
+            raise ValueError(f"'rel' must be one of {sorted(RELATION_NAMES)}, optionally prefixed with '{REVERSE}'")
+        if rel.startswith(REVERSE):
+            sql = """
+                SELECT DISTINCT src_kind, src FROM edges
+                WHERE dst_kind = ? AND rel = ? AND dst IN (SELECT value FROM json_each(?))
+                ORDER BY src_kind, src
+            """
+        else:
+            sql = """
+                SELECT DISTINCT dst_kind, dst FROM edges
+                WHERE src_kind = ? AND rel = ? AND src IN (SELECT value FROM json_each(?))
+                ORDER BY dst_kind, dst
+            """
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(sql, (kind, rel.removeprefix(REVERSE), json.dumps(keys))).fetchall()
+        return [tuple(row) for row in rows]
+
+    def walk(self, kind: str, key: str, rels: list[str]) -> list[tuple[str, str]]:
+        # Follow rels in order, e.g. ["top_beer", "verified_location"] from a brewery
+        frontier = [(kind, key)]
+        for rel in rels:
+            by_kind = {}
+            for node_kind, node_key in frontier:
+                by_kind.setdefault(node_kind, []).append(node_key)
+            frontier = sorted({n for k, keys in by_kind.items() for n in self.neighbours(k, keys, rel)})
+            if not frontier:
+                break
+        return frontier
+
+    def within(self, kind: str, key: str, rel: str, hops: int = 2) -> dict[str, int]:
+        # Keys reachable through rel in at most hops, with their distance, e.g. similar beers
+        if hops < 1:
+            raise ValueError("'hops' must be at least 1.")
+        if rel not in RELATION_NAMES:
+            raise ValueError(f"'rel' must be one of {sorted(RELATION_NAMES)}")
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                """
+                WITH RECURSIVE reach(kind, key, depth) AS (
+                    SELECT ?, ?, 0
+                    UNION
+                    SELECT e.dst_kind, e.dst, r.depth + 1
+                    FROM reach r JOIN edges e ON e.src_kind = r.kind AND e.src = r.key AND e.rel = ?
+                    WHERE r.depth < ?
+                )
+                SELECT key, MIN(depth) FROM reach
+                WHERE NOT (kind = ? AND key = ?)
+                GROUP BY kind, key ORDER BY MIN(depth), key
+                """,
+                (kind, key, rel, hops, kind, key)
+            ).fetchall()
+        return dict(rows)
+
+    def venues_pouring(self, brewery_id: str) -> list[str]:
+        # Verified venues of the brewery top beers
+        return [key for _, key in self.walk("brewery", brewery_key(brewery_id), ["top_beer", "verified_location"])]
+
+    def breweries_at(self, venue_id: int | str) -> list[str]:
+        # Breweries listing the venue as one of their locations or popular locations
+        keys = set()
+        for rel in ("location", "popular_location"):
+            keys.update(key for _, key in self.neighbours("venue", str(venue_id), REVERSE + rel))
+        return sorted(keys)
@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+import json
+import re
+
+from bs4 import BeautifulSoup
+
+
+BUNDLED_LOOKUPS = Path(__file__).parent / "data" / "lookups.json"
+LOOKUPS_VERSION = 1
+
+
+@dataclass
+class LookupTables():
+    countries: dict[str, str]    # slug -> display name, e.g. "united-states" -> "United States"
+    brewery_types: dict[str, str]    # slug -> display name, e.g. "brew-pub" -> "Brew Pub"
+    updated: date = field(default_factory=date.today)    # Day the picker page was scraped
+    version: int = LOOKUPS_VERSION
+
+    @classmethod
+    def load(cls, path: str | Path | None = None) -> "LookupTables":
+        # A refreshed copy at path wins over the bundled table, unless it is an older format
+        tables = cls._read(BUNDLED_LOOKUPS)
+        if path is not None and Path(path).exists():
+            saved = cls._read(Path(path))
+            if saved.version == LOOKUPS_VERSION and saved.updated >= tables.updated:
+                tables = saved
+        return tables
+
+    @classmethod
+    def from_picker_page(cls, soup: BeautifulSoup) -> "LookupTables":
+        # Both pickers of the top-rated breweries page
+        return cls(
+            countries=_picker_options(soup, "sort_picker"),
+            brewery_types=_picker_options(soup, "filter_picker"),
+        )
+
+    def save(self, path: str | Path) -> None:
+        data = {
+            "version": self.version,
+            "updated": self.updated.isoformat(),
+            "countries": self.countries,
+            "brewery_types": self.brewery_types,
+        }
+        Path(path).write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+    def is_stale(self, max_age: timedelta) -> bool:
+        return date.today() - self.updated > max_age
+
+    def country_name(self, slug: str) -> str:
+        # Slugs missing from the table keep the old title-case guess
+        name = self.countries.get(slug)
+        return name if name is not None else " ".join(slug.split("-")).title()
+
+    @staticmethod
+    def _read(path: Path) -> "LookupTables":
+        data = json.loads(path.read_text())
+        return LookupTables(
+            countries=data["countries"],
+            brewery_types=data["brewery_types"],
+            updated=date.fromisoformat(data["updated"]),
+            version=data["version"],
+        )
+
+
+def _picker_options(soup: BeautifulSoup, picker_id: str) -> dict[str, str]:
+    picker = soup.find(id=picker_id)
+    if picker is None:
+        raise ValueError(f"No #{picker_id} on the top-rated page, the layout may have changed.")
+    return {
+        option["data-value-slug"]: option.text.strip()
+        for option in picker.find_all("option")
+        if "data-value-slug" in option.attrs
+    }
+
+
+@lru_cache(maxsize=256)
+def _geography_re(country_name: str) -> re.Pattern:
+    # "City, Region Country", "Region Country" or "Country", the country suffix is optional
+    return re.compile(
+        rf"^(?:(?P<city>[^,]*),)?\s*(?P<region>.*?)\s*(?:\b{re.escape(country_name)})?\s*$",
+        re.IGNORECASE,
+    )
+
+
+@lru_cache(maxsize=65536)
+def parse_geography(geography: str, country_name: str) -> tuple[str | None, str | None]:
+    # (city, region) of a TR page location, repeated locations are a cache hit
+    match = _geography_re(country_name).match(geography.strip())
+    city, region = match.group("city"), match.group("region").strip()
+    return (city.strip() or None) if city is not None else None, region or None
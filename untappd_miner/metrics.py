@@ -0,0 +1,182 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import cProfile
+import io
+import pstats
+import threading
+import time
+
+
+# Upper bounds in seconds, from a cached soup lookup to a captcha wait
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass
+class Timing():
+    buckets: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)    # per bucket, last one is +Inf
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+def _label_key(labels: dict) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...], extra: dict | None = None) -> str:
+    pairs = list(labels) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    # Counters and timing histograms, rendered in the Prometheus text format
+    def __init__(self, prefix: str = "untappd_miner", buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._timings: dict[tuple[str, tuple], Timing] = {}
+        self._lock = threading.Lock()    # Shared by crawl threads and the exporter
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                timing = self._timings[key] = Timing(self.buckets)
+            timing.observe(seconds)
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        # e.g. with metrics.span("fetch", host="untappd.com"): ...
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def timing(self, name: str, **labels) -> Timing | None:
+        with self._lock:
+            return self._timings.get((name, _label_key(labels)))
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        # Total seconds and count per span name, all labels merged
+        summary = {}
+        with self._lock:
+            for (name, _), timing in self._timings.items():
+                stage = summary.setdefault(name, {"count": 0, "seconds": 0.0})
+                stage["count"] += timing.count
+                stage["seconds"] += timing.total
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), timing in timings:
+            metric = f"{self.prefix}_{name}_seconds"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), timing.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{metric}_bucket{_format_labels(labels, {'le': le})} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {timing.total:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {timing.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9108, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        # Scrape endpoint on a daemon thread, stop it with server.shutdown()
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+        return server
+
+
+def timed(stage: str):
+    # Method decorator, the instance needs a `metrics` attribute
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.span(stage, method=method.__name__.lstrip("_")):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def profiled(path: str | Path | None = None, sort: str = "cumulative", limit: int = 30):
+    # cProfile a single crawl, stats are dumped to path (snakeviz, pstats) or printed
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+            print(f"Profile written to {path}")
+        else:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+            print(out.getvalue())
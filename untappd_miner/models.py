@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+
+
+@dataclass
+class CheckinStats():
+    total: int
+    unique: int
+    monthly: int
+    current_user: int
+    
+@dataclass
+class BreweryCheckinStats(CheckinStats):
+    likes: int
+
+@dataclass
+class BreweryDetails():
+    description: str
+    checkin_stats: BreweryCheckinStats
+    brewery_locations: list[str]    # Brewery-tied venue ids
+    top_beers: list[str]    # unique beer-name-id slug
+    all_beers: list[str]   # unique beer-name-id slug
+    popular_locations: list[str]   # unique venue_id_url 
+@dataclass
+class Brewery():
+    id_url: str
+    fullname: str
+    city: str
+    region: str
+    country: str
+    brewery_type: str
+    number_of_beers: int
+    total_ratings: int
+    weight_avg_ratings: float
+    details: BreweryDetails
+        
+@dataclass 
+class Venue():
+    id_venue: int
+    name: str
+    adress: str
+    map_url: str
+    is_verified: bool
+    details: list[str]
+    stats: CheckinStats
+    loyal_patrons: list[str]    # user ids
+    num_beers_on_menu: int    # Might be null
+
+@dataclass(slots=True)
+class BeerRating():
+    user_id: str
+    checkin_venue: str    # venue endpoint/id
+    serving_type: str
+    comment: str
+    purchased_at: str    # venue endpoint/id
+    number_tagged_friends: int
+    has_picture: bool
+    checkin_time: datetime
+
+@dataclass
+class BeerDetails():
+    checkin_stats: CheckinStats
+    description: str
+    loyal_drinkers: list[str]    # user id for /user/id endpoint
+    similar_beers: list[int]    # beer ids
+    verified_locations: list[str]    # venue ids
+    individual_ratings: BeerRating
+#TODO FINISH IMPLEMENTATION
+@dataclass
+class Beer():
+    id_url: str    # unique beer for endpoint /b/slug/bid
+    bid: int    # beer id (part of id_url)
+    brewery_id: str
+    name: str
+    style: str
+    abv: float
+    ibu: int
+    weight_avg_ratings: float
+    total_ratings: int
+    date_added: date
+    details: BeerDetails
+    
+@dataclass
+class User():
+    # TODO
+    pass
+
+def brewery_from_dict(data: dict) -> Brewery:
+    # Inverse of dataclasses.asdict for checkpointed/exported breweries
+    details = data["details"]
+    checkin_stats = BreweryCheckinStats(**details["checkin_stats"])
+    brewery_details = BreweryDetails(**{**details, "checkin_stats": checkin_stats})
+    return Brewery(**{**data, "details": brewery_details})
+
+def beer_from_dict(data: dict) -> Beer:
+    # Same for beers, date_added may come back as an ISO string from JSON
+    date_added = data.get("date_added")
+    if isinstance(date_added, str):
+        date_added = date.fromisoformat(date_added)
+    details = data.get("details")
+    if details is not None:
+        details = BeerDetails(**{**details, "checkin_stats": CheckinStats(**details["checkin_stats"])})
+    return Beer(**{**data, "date_added": date_added, "details": details})
+
+def venue_from_dict(data: dict) -> Venue:
+    return Venue(**{**data, "stats": CheckinStats(**data["stats"])})
@@ -0,0 +1,60 @@
+from dataclasses import dataclass, field
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:    # bs4 >= 4.13 exposes the tag-creation hook used by parse_only
+    from bs4.filter import ElementFilter
+except ImportError:
+    ElementFilter = None
+
+
+@dataclass(frozen=True)
+class Region():
+    name: str    # tag name of the subtree root
+    classes: frozenset[str] = field(default_factory=frozenset)    # any of, empty means any tag
+
+    def matches(self, name: str, attrs: dict | None) -> bool:
+        if name != self.name:
+            return False
+        if not self.classes:
+            return True
+        tag_classes = (attrs or {}).get("class") or []
+        if isinstance(tag_classes, str):
+            tag_classes = tag_classes.split()
+        return not self.classes.isdisjoint(tag_classes)
+
+
+def region(name: str, *classes: str) -> Region:
+    return Region(name, frozenset(classes))
+
+
+if ElementFilter is not None:
+    class RegionFilter(ElementFilter):
+        def __init__(self, regions: list[Region]) -> None:
+            self.regions = regions
+
+        def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+            return any(r.matches(name, attrs) for r in self.regions)
+
+        def allow_string_creation(self, string) -> bool:
+            return False    # Top-level text between regions is never read
+
+
+def region_strainer(regions: list[Region]) -> SoupStrainer:
+    # Only the subtrees rooted at one of the regions are built into the soup
+    if ElementFilter is not None:
+        return RegionFilter(regions)
+
+    def in_region(name, attrs=None) -> bool:
+        return not isinstance(name, str) or any(r.matches(name, attrs) for r in regions)
+    return SoupStrainer(in_region)
+
+
+def has_regions(soup: BeautifulSoup, regions: list[Region]) -> bool:
+    # A region missing from a scoped parse means the page layout changed
+    for r in regions:
+        # class_=None would only match tags without a class attribute
+        found = soup.find(r.name, class_=list(r.classes)) if r.classes else soup.find(r.name)
+        if found is None:
+            return False
+    return True
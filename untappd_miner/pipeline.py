@@ -0,0 +1,82 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Callable
+import asyncio
+import os
+
+
+_worker_miner = None    # One parser-only miner per worker process
+
+
+def _init_worker(html_parser: str, scoped_parsing: bool) -> None:
+    global _worker_miner
+    from .untappd_miner import UntappdWebMiner    # Imported in the worker, avoids a cycle
+    _worker_miner = UntappdWebMiner(user_agent="untappd-miner-parser", html_parser=html_parser)
+    _worker_miner.scoped_parsing = scoped_parsing
+
+
+def parse_tr_page(html: bytes, country_slug: str) -> list[dict] | None:
+    # Base info of the breweries of a top-rated page, None if the page is empty
+    soup = _worker_miner.parse_html(html)
+    return _worker_miner._tr_page_breweries(soup, country_slug)
+
+
+def parse_brewery_home(html: bytes):
+    soup = _worker_miner._brewery_home_soup(html)
+    return _worker_miner._brewery_details_from_home_page(soup)
+
+
+def parse_venue_page(html: bytes, venue_id: int):
+    soup = _worker_miner._venue_page_soup(html)
+    return _worker_miner._venue_from_page(soup, venue_id)
+
+
+class ParsePool:
+    # Parser processes fed with raw HTML, keeps BeautifulSoup off the event loop and the GIL
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        html_parser: str = "html.parser",
+        scoped_parsing: bool = True,
+        mp_context: BaseContext | None = None,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers < 1:
+            raise ValueError("'workers' must be at least 1.")
+        self.max_pending = max_pending or 2 * self.workers    # Pages queued or being parsed
+        if self.max_pending < 1:
+            raise ValueError("'max_pending' must be at least 1.")
+        self.html_parser = html_parser
+        self.scoped_parsing = scoped_parsing
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(html_parser, scoped_parsing),
+        )
+        self._slots: asyncio.Semaphore | None = None
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    async def run(self, fn: Callable, *args):
+        # Fetchers wait here once max_pending pages are queued
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Bound to the running loop, a pool can outlive several asyncio.run calls
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._slots_loop = loop
+        return self._slots
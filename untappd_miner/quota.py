@@ -0,0 +1,58 @@
+from collections import deque
+import threading
+import time
+
+
+class HourlyQuota:
+    # Sliding window request budget, e.g. the 100 calls/hour of the Untappd API
+    def __init__(self, limit: int = 100, window: float = 3600.0) -> None:
+        if limit < 1:
+            raise ValueError("'limit' must be at least 1.")
+        self.limit = limit
+        self.window = window
+        self._calls: deque[float] = deque()    # monotonic time of each spent request
+        self._lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        with self._lock:
+            self._prune(time.monotonic())
+            return len(self._calls)
+
+    @property
+    def remaining(self) -> int:
+        return self.limit - self.used
+
+    def reserve(self, n: int = 1) -> int:
+        # Spend up to n requests, returns how many were granted
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            granted = max(0, min(n, self.limit - len(self._calls)))
+            self._calls.extend([now] * granted)
+        return granted
+
+    def sync(self, remaining: int | None, limit: int | None = None) -> None:
+        # The server count wins when it has seen more requests (other clients, restarts)
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+            if remaining is None:
+                return
+            now = time.monotonic()
+            self._prune(now)
+            missing = (self.limit - remaining) - len(self._calls)
+            self._calls.extend([now] * max(0, missing))
+
+    def reset_in(self) -> float:
+        # Seconds until at least one request is available again
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self._calls) < self.limit:
+                return 0.0
+            return self._calls[0] + self.window - now
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0] >= self.window:
+            self._calls.popleft()
@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import asyncio
+import random
+import threading
+import time
+
+
+# Status codes worth retrying, anything else is raised right away
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+
+@dataclass
+class TokenBucket():
+    rate: float    # tokens refilled per second
+    capacity: float    # max burst
+    tokens: float
+    updated_at: float    # monotonic time of last refill
+    blocked_until: float = 0.0    # monotonic time set by Retry-After/throttling
+
+    def refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+
+@dataclass
+class HostWaitStats():
+    requests: int = 0
+    throttled: int = 0
+    total_wait: float = 0.0    # seconds spent waiting for a token
+    max_wait: float = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+class HostRateLimiter:
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 4,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        adaptive: bool = True,
+    ) -> None:
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("'rate' must satisfy 0 < min_rate <= rate <= max_rate.")
+        if burst < 1:
+            raise ValueError("'burst' must be at least 1.")
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.adaptive = adaptive
+        self._buckets: dict[str, TokenBucket] = {}
+        self._stats: dict[str, HostWaitStats] = {}
+        self._lock = threading.Lock()    # Shared by sync threads and the event loop
+
+    @property
+    def stats(self) -> dict[str, HostWaitStats]:
+        return self._stats
+
+    def current_rate(self, url: str) -> float:
+        host = self.host_from_url(url)
+        return self._buckets[host].rate if host in self._buckets else self.rate
+
+    def acquire(self, url: str) -> float:
+        wait = self._reserve(self.host_from_url(url))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, url: str) -> float:
+        wait = self._reserve(self.host_from_url(url))
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def on_success(self, url: str) -> None:
+        # Additive increase towards max_rate
+        if not self.adaptive:
+            return
+        with self._lock:
+            bucket = self._bucket(self.host_from_url(url))
+            bucket.rate = min(self.max_rate, bucket.rate + 0.05 * self.rate)
+
+    def on_throttle(self, url: str, retry_after: float | None = None) -> None:
+        # Multiplicative decrease and pause the host for retry_after
+        host = self.host_from_url(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            if self.adaptive:
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+            if retry_after is not None:
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            self._host_stats(host).throttled += 1
+
+    def _reserve(self, host: str) -> float:
+        # Take a token now (possibly going negative) and return how long to wait for it
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host)
+            bucket.refill(now)
+            bucket.tokens -= 1
+            wait = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            wait = max(wait, bucket.blocked_until - now)
+
+            stats = self._host_stats(host)
+            stats.requests += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+        return wait
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(
+                rate=self.rate,
+                capacity=self.burst,
+                tokens=self.burst,
+                updated_at=time.monotonic()
+            )
+        return self._buckets[host]
+
+    def _host_stats(self, host: str) -> HostWaitStats:
+        if host not in self._stats:
+            self._stats[host] = HostWaitStats()
+        return self._stats[host]
+
+    @staticmethod
+    def host_from_url(url: str) -> str:
+        return urlsplit(str(url)).netloc.lower()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    # Retry-After is either delta-seconds or an HTTP-date
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = 1.0,
+    cap: float = 60.0,
+    retry_after: float | None = None,
+) -> float:
+    # Exponential backoff with full jitter, never shorter than the server asked for
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
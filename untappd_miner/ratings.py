@@ -0,0 +1,284 @@
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+import sqlite3
+import sys
+import threading
+import time
+
+from .models import BeerRating
+
+
+class StringTable:
+    # Interned strings, index 0 is reserved for None
+    def __init__(self) -> None:
+        self.values: list[str | None] = [None]
+        self._index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values) - 1
+
+    def intern(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        idx = self._index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.values.append(value)
+            self._index[value] = idx
+        return idx
+
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(v) for v in self.values if v is not None) + sys.getsizeof(self._index)
+
+
+class RatingStore:
+    # Struct-of-arrays container for BeerRating, rows are only built on access
+    def __init__(self, ratings: Iterable[BeerRating] | None = None) -> None:
+        self.users = StringTable()
+        self.venues = StringTable()    # checkin_venue and purchased_at share the same ids
+        self.serving_types = StringTable()
+        self._user_idx = array("I")
+        self._venue_idx = array("I")
+        self._serving_idx = array("I")
+        self._purchased_idx = array("I")
+        self._tagged_friends = array("H")
+        self._has_picture = array("B")
+        self._checkin_time = array("q")    # epoch seconds, UTC
+        self._comments: list[str | None] = []
+        if ratings is not None:
+            self.extend(ratings)
+
+    def __len__(self) -> int:
+        return len(self._checkin_time)
+
+    def __getitem__(self, i: int | slice) -> BeerRating | list[BeerRating]:
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("RatingStore index out of range")
+        return self._row(i)
+
+    def __iter__(self) -> Iterator[BeerRating]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def append(self, rating: BeerRating) -> None:
+        self._user_idx.append(self.users.intern(rating.user_id))
+        self._venue_idx.append(self.venues.intern(rating.checkin_venue))
+        self._serving_idx.append(self.serving_types.intern(rating.serving_type))
+        self._purchased_idx.append(self.venues.intern(rating.purchased_at))
+        self._tagged_friends.append(min(rating.number_tagged_friends or 0, 0xFFFF))
+        self._has_picture.append(1 if rating.has_picture else 0)
+        self._checkin_time.append(self.to_epoch(rating.checkin_time))
+        self._comments.append(rating.comment or None)
+
+    def extend(self, ratings: Iterable[BeerRating]) -> None:
+        for rating in ratings:
+            self.append(rating)
+
+    @property
+    def checkin_times(self) -> array:
+        # Epoch seconds, e.g. for the newest rating: max(store.checkin_times)
+        return self._checkin_time
+
+    def user_ids(self) -> list[str]:
+        values = self.users.values
+        return [values[i] for i in self._user_idx]
+
+    def nbytes(self) -> int:
+        arrays = (
+            self._user_idx, self._venue_idx, self._serving_idx, self._purchased_idx,
+            self._tagged_friends, self._has_picture, self._checkin_time,
+        )
+        total = sum(a.buffer_info()[1] * a.itemsize for a in arrays)
+        total += sys.getsizeof(self._comments) + sum(sys.getsizeof(c) for c in self._comments if c is not None)
+        return total + self.users.nbytes() + self.venues.nbytes() + self.serving_types.nbytes()
+
+    def _row(self, i: int) -> BeerRating:
+        return BeerRating(
+            user_id=self.users.values[self._user_idx[i]],
+            checkin_venue=self.venues.values[self._venue_idx[i]],
+            serving_type=self.serving_types.values[self._serving_idx[i]],
+            comment=self._comments[i] or "",
+            purchased_at=self.venues.values[self._purchased_idx[i]],
+            number_tagged_friends=self._tagged_friends[i],
+            has_picture=bool(self._has_picture[i]),
+            checkin_time=datetime.fromtimestamp(self._checkin_time[i], tz=timezone.utc),
+        )
+
+    @staticmethod
+    def to_epoch(checkin_time: datetime) -> int:
+        # Naive datetimes are taken as UTC
+        if checkin_time.tzinfo is None:
+            checkin_time = checkin_time.replace(tzinfo=timezone.utc)
+        return int(checkin_time.timestamp())
+
+
+class RatingArchive:
+    # Ratings harvested per beer, with the newest checkin id as high-water mark of each feed
+    # and a cursor for backfills stopped before reaching the mark
+    def __init__(self, path: str | Path = ".untappd_ratings.sqlite") -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ratings (
+                bid INTEGER NOT NULL,
+                checkin_id INTEGER NOT NULL,
+                user_id TEXT,
+                checkin_venue TEXT,
+                serving_type TEXT,
+                comment TEXT,
+                purchased_at TEXT,
+                number_tagged_friends INTEGER,
+                has_picture INTEGER,
+                checkin_time INTEGER NOT NULL,
+                PRIMARY KEY (bid, checkin_id)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS marks (
+                bid INTEGER PRIMARY KEY,
+                checkin_id INTEGER NOT NULL,
+                checkin_time INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cursors (
+                bid INTEGER PRIMARY KEY,
+                checkin_id INTEGER NOT NULL,
+                newest_id INTEGER NOT NULL,
+                newest_time INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def __enter__(self) -> "RatingArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ratings").fetchone()[0]
+
+    def mark(self, bid: int) -> int | None:
+        # Newest checkin id of a fully harvested feed, None if never harvested
+        with self._lock:
+            row = self._conn.execute("SELECT checkin_id FROM marks WHERE bid = ?", (bid,)).fetchone()
+        return row[0] if row is not None else None
+
+    def set_mark(self, bid: int, checkin_id: int, checkin_time: datetime) -> None:
+        # Only moves forward, a late writer with an older feed cannot rewind it
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO marks (bid, checkin_id, checkin_time, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (bid) DO UPDATE SET
+                    checkin_id = excluded.checkin_id,
+                    checkin_time = excluded.checkin_time,
+                    updated_at = excluded.updated_at
+                WHERE excluded.checkin_id > marks.checkin_id
+                """,
+                (bid, checkin_id, RatingStore.to_epoch(checkin_time), time.time())
+            )
+            self._conn.commit()
+
+    def cursor(self, bid: int) -> tuple[int, int, datetime] | None:
+        # (oldest checkin id fetched, newest checkin id and time) of an unfinished backfill
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT checkin_id, newest_id, newest_time FROM cursors WHERE bid = ?", (bid,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], datetime.fromtimestamp(row[2], tz=timezone.utc)
+
+    def set_cursor(self, bid: int, checkin_id: int, newest_id: int, newest_time: datetime) -> None:
+        # The newest checkin becomes the mark once the backfill reaches the previous one
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO cursors (bid, checkin_id, newest_id, newest_time, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (bid) DO UPDATE SET
+                    checkin_id = excluded.checkin_id,
+                    newest_id = excluded.newest_id,
+                    newest_time = excluded.newest_time,
+                    updated_at = excluded.updated_at
+                """,
+                (bid, checkin_id, newest_id, RatingStore.to_epoch(newest_time), time.time())
+            )
+            self._conn.commit()
+
+    def clear_cursor(self, bid: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cursors WHERE bid = ?", (bid,))
+            self._conn.commit()
+
+    def append(self, bid: int, checkins: list[tuple[int, BeerRating]]) -> int:
+        # Rows already archived are ignored, a resumed harvest can overlap the previous one
+        rows = [
+            (
+                bid, checkin_id, r.user_id, r.checkin_venue, r.serving_type, r.comment or None,
+                r.purchased_at, r.number_tagged_friends, int(bool(r.has_picture)),
+                RatingStore.to_epoch(r.checkin_time),
+            )
+            for checkin_id, r in checkins
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO ratings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def bids(self) -> list[int]:
+        # Beers with archived ratings
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT bid FROM ratings ORDER BY bid")]
+
+    def count(self, bid: int) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ratings WHERE bid = ?", (bid,)).fetchone()[0]
+
+    def load(self, bid: int) -> RatingStore:
+        # Oldest first
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT user_id, checkin_venue, serving_type, comment, purchased_at,
+                       number_tagged_friends, has_picture, checkin_time
+                FROM ratings WHERE bid = ? ORDER BY checkin_id
+                """,
+                (bid,)
+            ).fetchall()
+        return RatingStore(
+            BeerRating(
+                user_id=row[0],
+                checkin_venue=row[1],
+                serving_type=row[2],
+                comment=row[3] or "",
+                purchased_at=row[4],
+                number_tagged_friends=row[5],
+                has_picture=bool(row[6]),
+                checkin_time=datetime.fromtimestamp(row[7], tz=timezone.utc),
+            )
+            for row in rows
+        )
@@ -0,0 +1,169 @@
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import re
+import unicodedata
+
+
+# Searchable attributes and unique key of each entity kind
+INDEXED_FIELDS = {
+    "brewery": ("fullname", "city", "region"),
+    "beer": ("name", "style"),
+    "venue": ("name", "adress"),
+}
+ENTITY_KEYS = {"brewery": "id_url", "beer": "id_url", "venue": "id_venue"}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class SearchHit():
+    kind: str
+    key: str
+    score: float
+
+
+def normalize(text: str) -> str:
+    # "Brasserie Dieu du Ciel!" -> "brasserie dieu du ciel!", accents removed
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN_RE.findall(normalize(text)) if text else []
+
+
+def trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, min_similarity: float = 0.5) -> None:
+        self.min_similarity = min_similarity    # Dice coefficient of trigrams for fuzzy matches
+        self._docs: dict[tuple[str, str], dict[str, str]] = {}
+        self._postings: dict[str, set[tuple[str, str, str]]] = defaultdict(set)    # token -> (kind, key, field)
+        self._trigrams: dict[str, set[str]] = defaultdict(set)    # trigram -> tokens
+        self._sorted_tokens: list[str] | None = None    # Rebuilt lazily for prefix lookups
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc: tuple[str, str]) -> bool:
+        return doc in self._docs
+
+    def add_entity(self, kind: str, entity) -> None:
+        # Brewery, Beer or Venue dataclass
+        if kind not in INDEXED_FIELDS:
+            raise ValueError(f"'kind' must be one of {list(INDEXED_FIELDS)}")
+        fields = {f: getattr(entity, f) for f in INDEXED_FIELDS[kind] if getattr(entity, f, None)}
+        self.add(kind, str(getattr(entity, ENTITY_KEYS[kind])), fields)
+
+    def add(self, kind: str, key: str, fields: dict[str, str]) -> None:
+        # Re-adding a document replaces its previous fields
+        if (kind, key) in self._docs:
+            self.remove(kind, key)
+        self._docs[(kind, key)] = dict(fields)
+        for field, text in fields.items():
+            for token in tokenize(text):
+                if token not in self._postings:
+                    self._sorted_tokens = None
+                    for gram in trigrams(token):
+                        self._trigrams[gram].add(token)
+                self._postings[token].add((kind, key, field))
+
+    def remove(self, kind: str, key: str) -> None:
+        fields = self._docs.pop((kind, key), None)
+        if fields is None:
+            return
+        for field, text in fields.items():
+            for token in tokenize(text):
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.discard((kind, key, field))
+                if not postings:
+                    del self._postings[token]
+                    self._sorted_tokens = None
+                    for gram in trigrams(token):
+                        self._trigrams[gram].discard(token)
+                        if not self._trigrams[gram]:
+                            del self._trigrams[gram]
+
+    def search(
+        self,
+        query: str,
+        kind: str | None = None,
+        fields: list[str] | None = None,
+        fuzzy: bool = False,
+        limit: int = 10,
+    ) -> list[SearchHit]:
+        # Every query token must match, the last one as a prefix ("dieu du ci")
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        scores = None
+        for i, token in enumerate(query_tokens):
+            matches = self._token_matches(token, prefix=i == len(query_tokens) - 1, fuzzy=fuzzy)
+            token_scores = {}
+            for matched, quality in matches.items():
+                for doc_kind, key, field in self._postings[matched]:
+                    if kind is not None and doc_kind != kind:
+                        continue
+                    if fields is not None and field not in fields:
+                        continue
+                    doc = (doc_kind, key)
+                    token_scores[doc] = max(token_scores.get(doc, 0.0), quality)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc: s + token_scores[doc] for doc, s in scores.items() if doc in token_scores}
+            if not scores:
+                return []
+
+        hits = [SearchHit(doc_kind, key, score) for (doc_kind, key), score in scores.items()]
+        hits.sort(key=lambda h: (-h.score, h.kind, h.key))
+        return hits[:limit]
+
+    def save(self, path: str | Path) -> None:
+        # Only documents are stored, postings are rebuilt on load
+        docs = [[kind, key, fields] for (kind, key), fields in self._docs.items()]
+        Path(path).write_text(json.dumps({"version": 1, "docs": docs}))
+
+    @classmethod
+    def load(cls, path: str | Path, min_similarity: float = 0.5) -> "SearchIndex":
+        data = json.loads(Path(path).read_text())
+        index = cls(min_similarity=min_similarity)
+        for kind, key, fields in data["docs"]:
+            index.add(kind, key, fields)
+        return index
+
+    def _token_matches(self, token: str, prefix: bool, fuzzy: bool) -> dict[str, float]:
+        # Indexed tokens matching a query token, with a match quality in (0, 1]
+        matches = {}
+        if token in self._postings:
+            matches[token] = 1.0
+        if prefix:
+            tokens = self._tokens()
+            i = bisect_left(tokens, token)
+            while i < len(tokens) and tokens[i].startswith(token):
+                matches.setdefault(tokens[i], 0.8)
+                i += 1
+        if fuzzy:
+            query_grams = trigrams(token)
+            shared = defaultdict(int)
+            for gram in query_grams:
+                for candidate in self._trigrams.get(gram, ()):
+                    shared[candidate] += 1
+            for candidate, n in shared.items():
+                similarity = 2 * n / (len(query_grams) + len(trigrams(candidate)))
+                if similarity >= self.min_similarity:
+                    matches.setdefault(candidate, 0.6 * similarity)
+        return matches
+
+    def _tokens(self) -> list[str]:
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        return self._sorted_tokens
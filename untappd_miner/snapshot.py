@@ -0,0 +1,102 @@
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import json
+import sqlite3
+import threading
+import time
+
+
+# Cheap fields of the top-rated page, a brewery page is refetched when one changes
+SUMMARY_FIELDS = ("total_ratings", "number_of_beers", "weight_avg_ratings")
+
+
+@dataclass
+class SnapshotStats():
+    reused: int = 0
+    changed: int = 0
+    stale: int = 0
+    new: int = 0
+
+
+class BrewerySnapshot:
+    def __init__(
+        self,
+        path: str | Path = ".untappd_snapshot.sqlite",
+        max_age: float = 7 * 24 * 3600,
+    ) -> None:
+        if max_age < 0:
+            raise ValueError("'max_age' must be positive.")
+        self.path = Path(path)
+        self.max_age = max_age
+        self.stats = SnapshotStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS breweries (
+                id_url TEXT PRIMARY KEY,
+                total_ratings INTEGER,
+                number_of_beers INTEGER,
+                weight_avg_ratings REAL,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def __enter__(self) -> "BrewerySnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM breweries").fetchone()[0]
+
+    def previous(self, brewery_data_dict: dict) -> dict | None:
+        # Previous brewery payload if its summary is unchanged and not stale, else None
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT total_ratings, number_of_beers, weight_avg_ratings, payload, fetched_at
+                FROM breweries WHERE id_url = ?
+                """,
+                (brewery_data_dict["id_url"],)
+            ).fetchone()
+        if row is None:
+            self.stats.new += 1
+            return None
+        if tuple(row[:3]) != tuple(brewery_data_dict[f] for f in SUMMARY_FIELDS):
+            self.stats.changed += 1
+            return None
+        if time.time() - row[4] > self.max_age:
+            self.stats.stale += 1
+            return None
+        self.stats.reused += 1
+        return json.loads(row[3])
+
+    def put(self, brewery_data) -> None:
+        # brewery_data is a Brewery fetched from its home page
+        payload = asdict(brewery_data)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO breweries
+                (id_url, total_ratings, number_of_beers, weight_avg_ratings, payload, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    brewery_data.id_url,
+                    *(payload[f] for f in SUMMARY_FIELDS),
+                    json.dumps(payload),
+                    time.time()
+                )
+            )
+            self._conn.commit()
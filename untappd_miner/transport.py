@@ -0,0 +1,131 @@
+from collections import Counter
+from dataclasses import dataclass
+import threading
+
+import httpx
+
+try:    # Optional dependency, pip install untappd-miner[http2]
+    import h2
+except ImportError:
+    h2 = None
+
+try:    # Optional dependency, pip install untappd-miner[brotli]
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+@dataclass
+class TransportConfig():
+    max_connections: int = 20    # Keep at or above the max_concurrency of async crawls
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0    # Idle seconds before a pooled connection is dropped
+    http2: bool = True    # Only if h2 is installed, multiplexes async requests on one connection
+    compression: bool = True    # br (if installed), gzip, deflate
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 30.0    # Waiting for a free connection of the pool
+
+    def __post_init__(self) -> None:
+        if self.max_connections < 1:
+            raise ValueError("'max_connections' must be at least 1.")
+        if not 0 <= self.max_keepalive_connections <= self.max_connections:
+            raise ValueError("'max_keepalive_connections' must be between 0 and max_connections.")
+
+    @property
+    def http2_enabled(self) -> bool:
+        return self.http2 and h2 is not None
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+    def headers(self) -> dict[str, str]:
+        if not self.compression:
+            return {"Accept-Encoding": "identity"}
+        encodings = (["br"] if brotli is not None else []) + ["gzip", "deflate"]
+        return {"Accept-Encoding": ", ".join(encodings)}
+
+    def client(self, **kwargs) -> httpx.Client:
+        return httpx.Client(**self._client_kwargs(), **kwargs)
+
+    def async_client(self, **kwargs) -> httpx.AsyncClient:
+        return httpx.AsyncClient(**self._client_kwargs(), **kwargs)
+
+    def _client_kwargs(self) -> dict:
+        return {
+            "limits": self.limits(),
+            "timeout": self.timeout(),
+            "http2": self.http2_enabled,
+            "headers": self.headers(),
+        }
+
+
+class TransportStats:
+    # Requests per underlying connection, a reuse ratio near 0 means a handshake on every request
+    def __init__(self) -> None:
+        self.requests = 0
+        self.http_versions: Counter[str] = Counter()
+        self._per_connection: dict[int, int] = {}
+        self._streams = []    # Keeps ids unique while counted
+        self._lock = threading.Lock()
+
+    def record(self, res: httpx.Response) -> None:
+        stream = res.extensions.get("network_stream")
+        with self._lock:
+            self.requests += 1
+            self.http_versions[res.http_version] += 1
+            if stream is None:    # Mock transports have no connection
+                return
+            key = id(stream)
+            if key not in self._per_connection:
+                self._streams.append(stream)
+                self._per_connection[key] = 0
+            self._per_connection[key] += 1
+
+    @property
+    def connections(self) -> int:
+        return len(self._per_connection)
+
+    @property
+    def reused(self) -> int:
+        # Requests sent on an already open connection
+        with self._lock:
+            return sum(n - 1 for n in self._per_connection.values())
+
+    def per_connection(self) -> list[int]:
+        with self._lock:
+            return list(self._per_connection.values())
+
+    def summary(self) -> dict:
+        reused = self.reused
+        counted = reused + self.connections
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reused": reused,
+            "reuse_ratio": reused / counted if counted else 0.0,
+            "http_versions": dict(self.http_versions),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.http_versions.clear()
+            self._per_connection.clear()
+            self._streams.clear()
@@ -1,111 +1,97 @@
 from dotenv import dotenv_values
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Iterator, Optional, Union
+from contextlib import asynccontextmanager
+import asyncio
+import re
+import threading
 import time
-from datetime import date, datetime
-from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from dataclasses import asdict, dataclass
 
 import httpx
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
-from selenium.common.exceptions import WebDriverException
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
 
+from .cache import CachedResponse, ResponseCache
+from .frontier import BREWERY, DONE, PENDING, TR_PAGE, VENUE, CrawlFrontier
+from .graph import EntityGraph
+from .lookups import LookupTables, parse_geography
+from .search import SearchIndex
+from .snapshot import BrewerySnapshot
+from .webdriver_pool import WebDriverPool, export_cookies
+from .metrics import Metrics, timed
+from .models import (    # Re-exported, the dataclasses used to live here
+    Beer,
+    BeerDetails,
+    BeerRating,
+    Brewery,
+    BreweryCheckinStats,
+    BreweryDetails,
+    CheckinStats,
+    User,
+    Venue,
+    beer_from_dict,
+    brewery_from_dict,
+    venue_from_dict,
+)
+from .parsing import has_regions, region, region_strainer
+from .pipeline import ParsePool, parse_brewery_home, parse_tr_page, parse_venue_page
+from .quota import HourlyQuota
+from .ratings import RatingArchive
+from .transport import TransportConfig, TransportStats
+from .rate_limit import (
+    HostRateLimiter, 
+    RETRY_STATUSES, 
+    THROTTLE_STATUSES, 
+    backoff_delay, 
+    parse_retry_after,
+)
 
-@dataclass
-class CheckinStats():
-    total: int
-    unique: int
-    monthly: int
-    current_user: int
-    
-@dataclass
-class BreweryCheckinStats(CheckinStats):
-    likes: int
-
-@dataclass
-class BreweryDetails():
-    description: str
-    checkin_stats: BreweryCheckinStats
-    brewery_locations: list[str]    # Brewery-tied venue ids
-    top_beers: list[str]    # unique beer-name-id slug
-    all_beers: list[str]   # unique beer-name-id slug
-    popular_locations: list[str]   # unique venue_id_url 
-@dataclass
-class Brewery():
-    id_url: str
-    fullname: str
-    city: str
-    region: str
-    country: str
-    brewery_type: str
-    number_of_beers: int
-    total_ratings: int
-    weight_avg_ratings: float
-    details: BreweryDetails
-        
-@dataclass 
-class Venue():
-    id_venue: int
-    name: str
-    adress: str
-    map_url: str
-    is_verified: bool
-    details: list[str]
-    stats: CheckinStats
-    loyal_patrons: list[str]    # user ids
-    num_beers_on_menu: int    # Might be null
+if TYPE_CHECKING:    # Selenium is only imported once a browser is needed
+    from selenium import webdriver
 
-@dataclass
-class BeerRating():
-    user_id: str
-    checkin_venue: str    # venue endpoint/id
-    serving_type: str
-    comment: str
-    purchased_at: str    # venue endpoint/id
-    number_tagged_friends: int
-    has_picture: bool
-    checkin_time: datetime
 
-@dataclass
-class BeerDetails():
-    checkin_stats: CheckinStats
-    description: str
-    loyal_drinkers: list[str]    # user id for /user/id endpoint
-    similar_beers: list[int]    # beer ids
-    verified_locations: list[str]    # venue ids
-    individual_ratings: BeerRating
-#TODO FINISH IMPLEMENTATION
-@dataclass
-class Beer():
-    id_url: str    # unique beer for endpoint /b/slug/bid
-    bid: int    # beer id (part of id_url)
-    brewery_id: str
-    name: str
-    style: str
-    abv: float
-    ibu: int
-    weight_avg_ratings: float
-    total_ratings: int
-    date_added: date
-    details: BeerDetails
-    
-@dataclass
-class User():
-    # TODO
-    pass
+def venue_id_from_href(href: str) -> int | None:
+    # "/v/slug/123" as listed by brewery sidebars, or "/venue/123"
+    match = re.search(r"/(?:v/[^/]+|venue)/(\d+)/?$", href)
+    return int(match.group(1)) if match is not None else None
         
 class UntappdMiner:    
-    def __init__(self, dotenv_file: str | None = None) -> None:
+    def __init__(
+        self, 
+        dotenv_file: str | None = None, 
+        html_parser: str = "html.parser",
+        transport: TransportConfig | None = None,
+    ) -> None:
         self.dotenv_file = dotenv_file
-        self.client = httpx.Client()    # Init a client to store/send cookies
+        self.html_parser = html_parser    # bs4 tree builder, "lxml" is much faster if installed
+        self.transport = transport or TransportConfig()    # Pool limits, timeouts, HTTP/2, compression
+        self.client = self.transport.client()    # Init a client to store/send cookies
+        self.transport_stats = TransportStats()    # Connection reuse of both clients
+        self.async_client = None    # Only opened for the duration of an async crawl
+        self.rate_limiter = HostRateLimiter()    # Can be shared between miners
+        self.cache: ResponseCache | None = None    # Opt-in on-disk response cache
+        self.frontier: CrawlFrontier | None = None    # Opt-in checkpoints to resume crawls
+        self.snapshot: BrewerySnapshot | None = None    # Opt-in incremental recrawls
+        self.search_index: SearchIndex | None = None    # Opt-in, kept in sync with breweries/beers
+        self.graph: EntityGraph | None = None    # Opt-in, relationships of every stored entity
+        self.metrics = Metrics()    # Per-stage timings and counters, see metrics.render()
         self.breweries = {}    # keys will be unique url/id
         self.beers = {}
+        self.venues = {}    # keys are the numeric venue ids
              
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        self.client.close()
+        if self.graph is not None:
+            self.graph.flush()
+    
     @property
     def dotenv_file(self) -> Union[Path, None]:
         return self._dotenv_file
@@ -120,6 +106,19 @@ class UntappdMiner:
         if dotenv_file is not None and not isinstance(dotenv_file, Path):
             dotenv_file = Path(dotenv_file)
         self._dotenv_file = dotenv_file
+    
+    @property
+    def html_parser(self) -> str:
+        return self._html_parser
+    
+    @html_parser.setter
+    def html_parser(self, html_parser: str) -> None:
+        # Fail early if the backend is not installed
+        if builder_registry.lookup(html_parser) is None:
+            raise ValueError(
+                f"'html_parser' {html_parser!r} is not available, install it or use 'html.parser'."
+            )
+        self._html_parser = html_parser
         
     # Basic get request
     def fetch_url(
@@ -128,18 +127,166 @@ class UntappdMiner:
         headers: dict | None = None, 
         params: dict | None = None,
         max_retries: int = 3,
+        follow_redirects: bool = False,    # Only for endpoints known to redirect, e.g. /venue/{id}
     ) -> httpx.Response:
+        cached, is_fresh, headers = self._cache_lookup(url, headers, params)
+        if is_fresh:
+            return cached.to_response(params)
+        
         for i in range(max_retries):
             try:
+                with self.metrics.span("rate_limit_wait"):
+                    self.rate_limiter.acquire(url)
                 print(f"Fetching data from {url} with {params=}")
-                res = self.client.get(url=url, headers=headers, params=params)
+                with self.metrics.span("fetch", host=httpx.URL(url).host):
+                    res = self.client.get(url=url, headers=headers, params=params, follow_redirects=follow_redirects)
+                self._count_response(res)
+                res = self._cache_store(url, params, res, cached)
                 res.raise_for_status()
+                self.rate_limiter.on_success(url)
                 return res
-            except httpx.RequestError as e:
-                print(f"An error occured for request: {e}")
-                if i == max_retries - 1:
-                    raise e
-                time.sleep(1)
+            except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                delay = self._retry_delay(url, e, attempt=i, max_retries=max_retries)
+                with self.metrics.span("backoff"):
+                    time.sleep(delay)
+    
+    # Async get request, requires an open async_session
+    async def afetch_url(
+        self, 
+        url: str, 
+        headers: dict | None = None, 
+        params: dict | None = None,
+        max_retries: int = 3,
+        follow_redirects: bool = False,    # Only for endpoints known to redirect, e.g. /venue/{id}
+    ) -> httpx.Response:
+        if self.async_client is None:
+            raise RuntimeError("afetch_url must be awaited inside 'async with miner.async_session()'.")
+        
+        cached, is_fresh, headers = self._cache_lookup(url, headers, params)
+        if is_fresh:
+            return cached.to_response(params)
+        
+        for i in range(max_retries):
+            try:
+                with self.metrics.span("rate_limit_wait"):
+                    await self.rate_limiter.aacquire(url)
+                print(f"Fetching data from {url} with {params=}")
+                with self.metrics.span("fetch", host=httpx.URL(url).host):
+                    res = await self.async_client.get(url=url, headers=headers, params=params, follow_redirects=follow_redirects)
+                self._count_response(res)
+                res = self._cache_store(url, params, res, cached)
+                res.raise_for_status()
+                self.rate_limiter.on_success(url)
+                return res
+            except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                delay = self._retry_delay(url, e, attempt=i, max_retries=max_retries)
+                with self.metrics.span("backoff"):
+                    await asyncio.sleep(delay)
+    
+    def _cache_lookup(
+        self, 
+        url: str, 
+        headers: dict | None, 
+        params: dict | None,
+    ) -> tuple[CachedResponse | None, bool, dict | None]:
+        # Fresh hit skips the network, stale hit is revalidated with its validators
+        if self.cache is None:
+            return None, False, headers
+        cached = self.cache.get(url, params)
+        if cached is None:
+            self.cache.stats.misses += 1
+            self.metrics.inc("cache", result="miss")
+            return None, False, headers
+        if cached.is_fresh(self.cache.ttl):
+            self.cache.stats.hits += 1
+            self.metrics.inc("cache", result="hit")
+            print(f"Cache hit for {url} with {params=}")
+            return cached, True, headers
+        return cached, False, {**(headers or {}), **cached.validators()}
+    
+    def _cache_store(
+        self, 
+        url: str, 
+        params: dict | None, 
+        res: httpx.Response, 
+        cached: CachedResponse | None,
+    ) -> httpx.Response:
+        # Replay the stored copy on 304, store new successful responses
+        if self.cache is None:
+            return res
+        if res.status_code == 304 and cached is not None:
+            self.cache.stats.revalidated += 1
+            self.metrics.inc("cache", result="revalidated")
+            self.cache.refresh(cached)
+            return cached.to_response(params)
+        if cached is not None:
+            self.cache.stats.misses += 1
+            self.metrics.inc("cache", result="miss")
+        self.cache.put(url, params, res)
+        return res
+    
+    def _retry_delay(
+        self, 
+        url: str, 
+        error: httpx.HTTPStatusError | httpx.RequestError, 
+        attempt: int, 
+        max_retries: int,
+    ) -> float:
+        # Raise if not retryable, otherwise return how long to back off
+        print(f"An error occured for request: {error}")
+        retry_after = None
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            if status not in RETRY_STATUSES:
+                raise error
+            retry_after = parse_retry_after(error.response.headers.get("Retry-After"))
+            if status in THROTTLE_STATUSES:
+                self.rate_limiter.on_throttle(url, retry_after)
+        if attempt == max_retries - 1:
+            raise error
+        self.metrics.inc("retries")
+        return backoff_delay(attempt, retry_after=retry_after)
+    
+    def _count_response(self, res: httpx.Response) -> None:
+        self.transport_stats.record(res)
+        self.metrics.inc("requests", status=res.status_code)
+        self.metrics.inc("response_bytes", len(res.content))
+    
+    @asynccontextmanager
+    async def async_session(self):
+        # Nested sessions reuse the open client
+        if self.async_client is not None:
+            yield self.async_client
+            return
+        
+        # Share the cookies of the sync client with the async one
+        async with self.transport.async_client(cookies=self.client.cookies) as async_client:
+            self.async_client = async_client
+            try:
+                yield async_client
+            finally:
+                self.async_client = None
+    
+    def _store_brewery(self, brewery_data: Brewery) -> None:
+        self.breweries[brewery_data.id_url] = brewery_data
+        if self.search_index is not None:
+            self.search_index.add_entity("brewery", brewery_data)
+        if self.graph is not None:
+            self.graph.add("brewery", brewery_data)
+    
+    def _store_beer(self, beer: Beer) -> None:
+        self.beers[beer.id_url] = beer
+        if self.search_index is not None:
+            self.search_index.add_entity("beer", beer)
+        if self.graph is not None:
+            self.graph.add("beer", beer)
+    
+    def _store_venue(self, venue: Venue) -> None:
+        self.venues[venue.id_venue] = venue
+        if self.search_index is not None:
+            self.search_index.add_entity("venue", venue)
+        if self.graph is not None:
+            self.graph.add("venue", venue)
     
     def parse_response(self, res: httpx.Response) -> dict | str:
         content_type = res.headers["content-type"]
@@ -150,6 +297,29 @@ class UntappdMiner:
         else:
             return res
     
+    def parse_html(self, html: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+        with self.metrics.span("parse", scoped=parse_only is not None):
+            return BeautifulSoup(html, self._html_parser, parse_only=parse_only)
+    
+    # Fetch and parse once, the soup is then shared by every extractor
+    def fetch_soup(
+        self, 
+        url: str, 
+        headers: dict | None = None, 
+        params: dict | None = None,
+    ) -> BeautifulSoup:
+        response = self.fetch_url(url=url, headers=headers, params=params)
+        return self.parse_html(self.parse_response(response))
+    
+    async def afetch_soup(
+        self, 
+        url: str, 
+        headers: dict | None = None, 
+        params: dict | None = None,
+    ) -> BeautifulSoup:
+        response = await self.afetch_url(url=url, headers=headers, params=params)
+        return self.parse_html(self.parse_response(response))
+    
     @staticmethod
     def parse_dotenv(dotenv_file: Path | None, key: str) -> dict | None:
         # dotenv file is optional for webminer
@@ -163,17 +333,47 @@ class UntappdMiner:
         return value
         
 
+@dataclass
+class ApiBatch():
+    results: dict[str, dict]    # entity id -> "response" payload of the API
+    failed: dict[str, str]    # entity id -> error
+    deferred: list[str]    # entity ids not fetched for lack of quota
+
 class UntappdApiMiner(UntappdMiner):
     BASE_API = "https://api.untappd.com"
+    API_ENDPOINTS = {
+        "brewery": "/v4/brewery/info/{id}",
+        "beer": "/v4/beer/info/{id}",
+        "venue": "/v4/venue/info/{id}",
+        "brewery_checkins": "/v4/brewery/checkins/{id}",
+        "beer_checkins": "/v4/beer/checkins/{id}",
+        "venue_checkins": "/v4/venue/checkins/{id}",
+    }
+    # Web pages (or browser sessions) needed for the same data, API calls go where they save most
+    WEB_PAGE_COST = {
+        "brewery": 1,
+        "beer": 1,
+        "venue": 1,
+        "brewery_checkins": 3,
+        "beer_checkins": 3,
+        "venue_checkins": 3,
+    }
     
-    def __init__(self, dotenv_file: str | None = None) -> None:
-        super().__init__(dotenv_file)
+    def __init__(
+        self, 
+        dotenv_file: str | None = None, 
+        hourly_limit: int = 100,
+        transport: TransportConfig | None = None,
+    ) -> None:
+        super().__init__(dotenv_file, transport=transport)
         self._client_id = None
         self._client_secret = None
         if self._dotenv_file is not None:    # For API-related methods
             self._client_id = self.parse_dotenv(self._dotenv_file, "CLIENT_ID")
             self._client_secret = self.parse_dotenv(self._dotenv_file, "CLIENT_SECRET")
         self._post_req_counter = 0
+        self.quota = HourlyQuota(limit=hourly_limit)
+        self.api_reserve = 0    # Calls of the hourly quota kept for manual use
     
     @property
     def post_req_counter(self) -> int:
@@ -183,31 +383,142 @@ class UntappdApiMiner(UntappdMiner):
     def post_req_counter(self, value: int) -> None:
         self._post_req_counter = value
     
-    def get_brewery_info_API(self, brewery_id: int):
-        # Construct url for endpoint
-        endpoint = f"/v4/brewery/info/{str(brewery_id)}"
-        url = self.BASE_API_URL + endpoint
-        print(f"Fetching {url}...")
+    def get_brewery_info_API(self, brewery_id: int) -> httpx.Response:
+        return self.fetch_api("brewery", brewery_id)
+    
+    def fetch_api(self, kind: str, entity_id: int | str, params: dict | None = None) -> httpx.Response:
+        url = self.__api_url(kind, entity_id)
+        if self.quota.reserve() == 0:
+            raise RuntimeError(f"API quota exhausted, next call available in {self.quota.reset_in():.0f}s")
+        res = self.fetch_url(url, params=self.__credentials(params))
+        self.__count_api_call(res)
+        return res
+    
+    async def afetch_api(self, kind: str, entity_id: int | str, params: dict | None = None) -> httpx.Response:
+        url = self.__api_url(kind, entity_id)
+        if self.quota.reserve() == 0:
+            raise RuntimeError(f"API quota exhausted, next call available in {self.quota.reset_in():.0f}s")
+        res = await self.afetch_url(url, params=self.__credentials(params))
+        self.__count_api_call(res)
+        return res
+    
+    def get_many_API(self, kind: str, entity_ids: list[int | str], max_concurrency: int = 5) -> ApiBatch:
+        return asyncio.run(self.aget_many_API(kind, entity_ids, max_concurrency))
+    
+    async def aget_many_API(
+        self, 
+        kind: str, 
+        entity_ids: list[int | str], 
+        max_concurrency: int = 5,
+    ) -> ApiBatch:
+        if max_concurrency < 1:
+            raise ValueError("'max_concurrency' must be at least 1.")
+        if kind not in self.API_ENDPOINTS:
+            raise ValueError(f"'kind' must be one of {list(self.API_ENDPOINTS)}")
+        entity_ids = [str(entity_id) for entity_id in dict.fromkeys(entity_ids)]
         
+        # Only as many ids as the quota allows, the rest is handed back
+        n_budget = max(0, self.quota.remaining - self.api_reserve)
+        to_fetch, deferred = entity_ids[:n_budget], entity_ids[n_budget:]
+        batch = ApiBatch(results={}, failed={}, deferred=deferred)
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async def fetch_one(entity_id: str) -> None:
+            async with semaphore:
+                try:
+                    res = await self.afetch_api(kind, entity_id)
+                    # A body without the "response" envelope fails the id, not the batch
+                    batch.results[entity_id] = self.parse_response(res)["response"]
+                except (httpx.HTTPError, RuntimeError, KeyError, TypeError, ValueError) as e:
+                    batch.failed[entity_id] = f"{type(e).__name__}: {e}"
+        
+        async with self.async_session():
+            await asyncio.gather(*[fetch_one(entity_id) for entity_id in to_fetch])
+        return batch
+    
+    def plan_sources(self, wanted: dict[str, list[int | str]]) -> dict[str, dict[str, list[str]]]:
+        # Split ids between API and web, the quota goes to the costliest web paths first
+        budget = max(0, self.quota.remaining - self.api_reserve)
+        plan = {}
+        for kind in sorted(wanted, key=lambda k: self.WEB_PAGE_COST[k], reverse=True):
+            entity_ids = [str(entity_id) for entity_id in dict.fromkeys(wanted[kind])]
+            n_api = min(budget, len(entity_ids))
+            plan[kind] = {"api": entity_ids[:n_api], "web": entity_ids[n_api:]}
+            budget -= n_api
+        return plan
+    
+    def __api_url(self, kind: str, entity_id: int | str) -> str:
+        if kind not in self.API_ENDPOINTS:
+            raise ValueError(f"'kind' must be one of {list(self.API_ENDPOINTS)}")
+        return self.BASE_API + self.API_ENDPOINTS[kind].format(id=entity_id)
+    
+    def __credentials(self, params: dict | None) -> dict:
         # Client credentials for get request
-        params = {
+        return {
+            **(params or {}),
             "client_id": self._client_id,
             "client_secret": self._client_secret
-        }        
-        
-        res = self.fetch_url(url, params=params)
-        return res
+        }
+    
+    def __count_api_call(self, res: httpx.Response) -> None:
+        # Server side counters, if sent, correct the local quota
+        self.post_req_counter += 1
+        remaining = res.headers.get("X-Ratelimit-Remaining")
+        limit = res.headers.get("X-Ratelimit-Limit")
+        self.quota.sync(
+            int(remaining) if remaining is not None and remaining.isdigit() else None,
+            int(limit) if limit is not None and limit.isdigit() else None,
+        )
     
 class UntappdWebMiner(UntappdMiner):
     BASE_URL = "https://untappd.com"
+    DEFAULT_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/119.0"
     BEER_TR_ENDPOINT = "/beer/top_rated"
     BREWERY_TR_ENDPOINT = "/brewery/top_rated"
+    MORE_BEER_ENDPOINT = "/brewery/more_beer/{brewery_num_id}/{offset}"    # Backs "Show More"
+    BEER_LIST_PAGE_SIZE = 25    # Beers on the first list page and per "Show More" fragment
+    VENUE_ENDPOINT = "/venue/{venue_id}"    # Redirects to /v/slug/venue_id
+    BEER_ENDPOINT = "/beer/{bid}"    # Redirects to /b/slug/bid
+    BEER_FEED_ENDPOINT = "/beer/more_feed/{bid}/{max_id}"    # Checkins older than max_id
     
     ENDPOINT_TR_NAMES = ["beer", "brewery"]
     
-    def __init__(self, dotenv_file: str | None = None, user_agent: str | None = None) -> None:
-        super().__init__(dotenv_file)
+    # Subtrees of the brewery home page read by the _brewery_* extractors
+    BREWERY_HOME_REGIONS = [
+        region("div", "beer-descrption-read-less"),    # description
+        region("div", "stats"),    # checkin stats
+        region("abbr"),    # likes
+        region("div", "sidebar"),    # locations, top beers, popular locations
+    ]
+    
+    # Same for venue pages, the beer menu is only listed by verified venues
+    VENUE_PAGE_REGIONS = [
+        region("div", "venue-header"),    # name, categories, address, verified badge
+        region("div", "stats"),    # checkin stats
+        region("div", "sidebar"),    # loyal patrons
+    ]
+    VENUE_MENU_REGION = region("div", "menu-header")
+    
+    def __init__(
+        self, 
+        dotenv_file: str | None = None, 
+        user_agent: str | None = None, 
+        html_parser: str = "html.parser",
+        transport: TransportConfig | None = None,
+    ) -> None:
+        super().__init__(dotenv_file, html_parser, transport)
         self._user_agent = self.__ua_setter_on_init(user_agent)    # Set a default UA if none provided
+        self.scoped_parsing = True    # Only build BREWERY_HOME_REGIONS of brewery pages
+        self._brewery_home_strainer = region_strainer(self.BREWERY_HOME_REGIONS)
+        self._venue_page_strainer = region_strainer(self.VENUE_PAGE_REGIONS + [self.VENUE_MENU_REGION])
+        self.headless_webdriver = False    # Login CAPTCHA is solved by hand in the browser window
+        self.webdriver_pool: WebDriverPool | None = None    # Logged-in drivers, created on first use
+        self.parse_pool: ParsePool | None = None    # Opt-in parser processes for async crawls
+        self.lookups = LookupTables.load()    # Country/brewery type slugs, no request at startup
+        self._lookups_path: Path | None = None
+        self.lookups_max_age = timedelta(days=30)    # Older saved tables are refreshed in the background
+        self._lookups_refresh: threading.Thread | None = None
+        self.rating_archive: RatingArchive | None = None    # Opt-in, ratings are then harvested incrementally
         
     @property
     def user_agent(self) -> str:
@@ -216,71 +527,290 @@ class UntappdWebMiner(UntappdMiner):
     @user_agent.setter
     def user_agent(self, custom_ua: str | None):
         self._user_agent = custom_ua
+    
+    @property
+    def lookups_path(self) -> Path | None:
+        return self._lookups_path
+    
+    @lookups_path.setter
+    def lookups_path(self, path: str | Path | None):
+        # Opt-in, refreshed lookup tables are saved there and loaded by the next runs.
+        # Without it the bundled tables are used as is, however old they are
+        self._lookups_path = Path(path) if path is not None else None
+        if self._lookups_path is not None:
+            self.lookups = LookupTables.load(self._lookups_path)
         
-    def get_top_rated_breweries(self, country: str = "all", brewery_type: str = "all") -> Brewery:
-        possible_countries = self._get_countries_slug(endpoint="brewery")
-        possible_btypes = self._get_brewery_type_slug()
+    def get_top_rated_breweries(self, country: str = "all", brewery_type: str = "all") -> dict[str, Brewery]:
+        self._load_checkpointed_breweries()
+        for brewery_data in self.iter_top_rated_breweries(country, brewery_type):
+            self._store_brewery(brewery_data)
+        return self.breweries
+    
+    # Yield each brewery as soon as its page is parsed, nothing is kept in self.breweries
+    def iter_top_rated_breweries(self, country: str = "all", brewery_type: str = "all") -> Iterator[Brewery]:
+        headers = {"User-Agent": self._user_agent} 
+        countries, brewery_types = self._tr_filters(country, brewery_type)
+        seen_ids = set()    # id_url already handled during this crawl
         
-        # Validate country and brewery_type
-        countries = possible_countries if country == "all" else None
-        if country not in possible_countries and countries is None:
-            raise ValueError(f"'country' must be one of {possible_countries}")
-        countries = [country] if countries is None else countries
-
-        brewery_types = possible_btypes if brewery_type == "all" else None
-        if brewery_type not in possible_btypes and brewery_types is None:
-            raise ValueError(f"'country' must be one of {possible_btypes}")
-        brewery_types = [brewery_type] if brewery_types is None else brewery_types
+        # Resume breweries listed by a TR page of an interrupted run
+        for brewery_data_dict in self._resumed_baseinfo():
+            brewery_data = self.__brewery_from_home_page(brewery_data_dict, seen_ids)
+            if brewery_data is not None:
+                yield brewery_data
         
         # Get all data for each possible endpoint
         url = self.BASE_URL + self.BREWERY_TR_ENDPOINT
-        headers = {"User-Agent": self._user_agent} 
         for c_slug in countries:
             for btype in brewery_types:
+                page_key = f"{c_slug}/{btype}"
+                if not self._checkpoint_claim(TR_PAGE, page_key):
+                    continue
+                
                 # Per country and brewery_type request
                 params = {"country": c_slug, "brewery_type": btype}
-                response = self.fetch_url(url=url, headers=headers, params=params)
-                html = self.parse_response(response)
+                try:
+                    soup = self.fetch_soup(url=url, headers=headers, params=params)
+                except httpx.HTTPError as e:
+                    self._checkpoint_failed(TR_PAGE, page_key, e)
+                    continue
                 
-                # Skip if content is empty
-                if self.__empty_content(html, endpoint_name="brewery"):
+                # Skip if content is empty, otherwise populate from TR page
+                breweries_data = self._tr_page_breweries(soup, c_slug)
+                if breweries_data is None:
                     print(f"Empty content for country: {c_slug} and brewery_type: {btype}")
+                    self._checkpoint_tr_page(page_key, [])
                     continue
-                # Populate from TR page
-                soup = BeautifulSoup(html, "html.parser")
-                brewery_data_dict = self._brewery_baseinfo_from_tr_page(soup, c_slug)
-                
-                # Fetch brewery page to populate details
-                brew_url = self.BASE_URL + brewery_data_dict["id_url"]
-                brew_resp = self.fetch_url(url=brew_url, headers=headers)
-                brew_home_html = self.parse_response(brew_resp)
-                soup = BeautifulSoup(brew_home_html, "html.parser")
-                
-                # Setup details container and fill info
-                brew_details_dict = {}
-                brew_details_dict["description"] = self._brewery_description(soup)
-                brew_details_dict["checkin_stats"] = self._brewery_checkin_stats(soup)
-                
-                # Sidebar info from main page (locations, top beers, popular locations)
-                brew_details_dict["brewery_locations"] = self._brewery_locations(soup)
-                brew_details_dict["top_beers"] = self._brewery_top_beers(soup)
-                brew_details_dict["popular_locations"] = self._brewery_popular_locations(soup)
-                
-                # Fetch all beers for a brewery
-                # TODO GET ALL BEERS FOR A BREWERY                
-                
-                # TODO GET BREWERY/BEER DETAILS 
-                # Add to breweries container based on dataclass
-                # brewery_data = Brewery()
-                # if brewery_data.id_url not in self.breweries:
-                #     self.breweries[brewery_data.id_url] = brewery_data
-                # print(self.breweries)
-                    
-        # Get the BreweryDetails data
-        for brewery_id in self.breweries:
-            pass
+                self._checkpoint_tr_page(page_key, breweries_data)
+                for brewery_data_dict in breweries_data:
+                    brewery_data = self.__brewery_from_home_page(brewery_data_dict, seen_ids)
+                    if brewery_data is not None:
+                        yield brewery_data
     
-                    
+    async def aget_top_rated_breweries(
+        self, 
+        country: str = "all", 
+        brewery_type: str = "all",
+        max_concurrency: int = 10,
+    ) -> dict[str, Brewery]:
+        self._load_checkpointed_breweries()
+        async for brewery_data in self.aiter_top_rated_breweries(country, brewery_type, max_concurrency):
+            self._store_brewery(brewery_data)
+        return self.breweries
+    
+    # Async variant, yields in completion order. Use contextlib.aclosing to stop early.
+    async def aiter_top_rated_breweries(
+        self, 
+        country: str = "all", 
+        brewery_type: str = "all",
+        max_concurrency: int = 10,
+    ) -> AsyncIterator[Brewery]:
+        if max_concurrency < 1:
+            raise ValueError("'max_concurrency' must be at least 1.")
+        
+        # Shared limit for TR pages and brewery pages in flight
+        semaphore = asyncio.Semaphore(max_concurrency)
+        queue = asyncio.Queue(maxsize=max_concurrency)    # Slow consumers pause the crawl
+        pending_ids = set()    # id_url already scheduled during this crawl
+        
+        countries, brewery_types = self._tr_filters(country, brewery_type)
+        async with self.async_session():
+            # Resume breweries listed by a TR page of an interrupted run
+            tasks = [
+                self.__abrewery_from_home_page(brewery_data_dict, semaphore, queue, pending_ids)
+                for brewery_data_dict in self._resumed_baseinfo()
+            ]
+            tasks += [
+                self.__atr_page_breweries(c_slug, btype, semaphore, queue, pending_ids)
+                for c_slug in countries
+                for btype in brewery_types
+            ]
+            producer = asyncio.create_task(self.__aproduce(tasks, queue))
+            try:
+                while not (queue.empty() and producer.done()):
+                    brewery_data = await queue.get()
+                    if brewery_data is None:
+                        break
+                    yield brewery_data
+                await producer    # Raise crawl errors
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                    await asyncio.gather(producer, return_exceptions=True)
+    
+    def refresh_lookups(self) -> LookupTables:
+        # Both pickers live on the top-rated page, one request refreshes the two tables
+        headers = {"User-Agent": self._user_agent}
+        soup = self.fetch_soup(url=self.BASE_URL + self.BREWERY_TR_ENDPOINT, headers=headers)
+        self.lookups = LookupTables.from_picker_page(soup)
+        if self.lookups_path is not None:
+            self.lookups.save(self.lookups_path)
+        return self.lookups
+    
+    def _tr_filters(self, country: str, brewery_type: str) -> tuple[list[str], list[str]]:
+        # Validated against the lookup tables, the crawl never waits for a refresh
+        if (
+            self.lookups_path is not None
+            and self.lookups.is_stale(self.lookups_max_age)
+            and self._lookups_refresh is None
+        ):
+            self._lookups_refresh = threading.Thread(target=self.__refresh_lookups_quietly, daemon=True)
+            self._lookups_refresh.start()
+        return self._validate_tr_filters(
+            country, brewery_type, list(self.lookups.countries), list(self.lookups.brewery_types)
+        )
+    
+    def _validate_tr_filters(
+        self, 
+        country: str, 
+        brewery_type: str, 
+        possible_countries: list[str], 
+        possible_btypes: list[str],
+    ) -> tuple[list[str], list[str]]:
+        # Validate country and brewery_type
+        countries = possible_countries if country == "all" else None
+        if country not in possible_countries and countries is None:
+            raise ValueError(f"'country' must be one of {possible_countries}")
+        countries = [country] if countries is None else countries
+
+        brewery_types = possible_btypes if brewery_type == "all" else None
+        if brewery_type not in possible_btypes and brewery_types is None:
+            raise ValueError(f"'brewery_type' must be one of {possible_btypes}")
+        brewery_types = [brewery_type] if brewery_types is None else brewery_types
+        return countries, brewery_types
+    
+    def _load_checkpointed_breweries(self) -> None:
+        # Breweries finished by a previous run are not fetched again
+        if self.frontier is None:
+            return
+        for _, payload in self.frontier.entries(BREWERY, DONE):
+            brewery_data = brewery_from_dict(payload)
+            self._store_brewery(brewery_data)
+    
+    def _resumed_baseinfo(self) -> list[dict]:
+        if self.frontier is None:
+            return []
+        return [payload for _, payload in self.frontier.entries(BREWERY, PENDING) if payload is not None]
+    
+    def _checkpoint_claim(self, kind: str, key: str) -> bool:
+        return self.frontier is None or self.frontier.claim(kind, key)
+    
+    def _checkpoint_tr_page(self, page_key: str, breweries_data: list[dict]) -> None:
+        # Record the listed breweries before the page so none is lost on a crash
+        if self.frontier is None:
+            return
+        self.frontier.add_many(BREWERY, [(d["id_url"], d) for d in breweries_data])
+        self.frontier.mark_done(TR_PAGE, page_key)
+    
+    def _checkpoint_failed(self, kind: str, key: str, error: Exception) -> None:
+        # Without checkpoints the error is raised as before
+        if self.frontier is None:
+            raise error
+        print(f"Failed {kind} {key}, will be retried on the next run: {error}")
+        self.frontier.mark_failed(kind, key, str(error))
+    
+    def _load_checkpointed_venues(self) -> None:
+        if self.frontier is None:
+            return
+        for _, payload in self.frontier.entries(VENUE, DONE):
+            self._store_venue(venue_from_dict(payload))
+    
+    def _venue_hrefs(self, breweries: Iterable[Brewery]) -> dict[int, str]:
+        # Unique venue ids of all brewery sidebars, minus the venues already mined
+        hrefs = {}
+        for brewery_data in breweries:
+            details = brewery_data.details
+            if details is None:
+                continue
+            for href in details.brewery_locations + details.popular_locations:
+                venue_id = venue_id_from_href(href)
+                if venue_id is None:
+                    continue
+                if venue_id in self.venues or venue_id in hrefs:
+                    self.metrics.inc("venue_links", result="duplicate")
+                    continue
+                self.metrics.inc("venue_links", result="new")
+                hrefs[venue_id] = href
+        return hrefs
+    
+    def _record_venue(self, venue: Venue) -> None:
+        if self.frontier is not None:
+            self.frontier.mark_done(VENUE, str(venue.id_venue), asdict(venue))
+        self._store_venue(venue)
+    
+    def _unchanged_brewery_details(self, brewery_data_dict: dict) -> BreweryDetails | None:
+        if self.snapshot is None:
+            return None
+        previous = self.snapshot.previous(brewery_data_dict)
+        return brewery_from_dict(previous).details if previous is not None else None
+    
+    def _record_brewery(self, brewery_data: Brewery, fetched: bool) -> None:
+        if self.frontier is not None:
+            self.frontier.mark_done(BREWERY, brewery_data.id_url, asdict(brewery_data))
+        if self.snapshot is not None and fetched:
+            self.snapshot.put(brewery_data)
+    
+    def _brewery_from_baseinfo(self, brewery_data_dict: dict) -> Brewery:
+        # Top-rated base info completed with the brewery home page
+        brew_url = self.BASE_URL + brewery_data_dict["id_url"]
+        headers = {"User-Agent": self._user_agent}
+        brew_resp = self.fetch_url(url=brew_url, headers=headers)
+        soup_home = self._brewery_home_soup(self.parse_response(brew_resp))
+        details = self._brewery_details_from_home_page(soup_home)
+        return Brewery(**brewery_data_dict, details=details)
+    
+    def _brewery_home_soup(self, html: str) -> BeautifulSoup:
+        return self._scoped_soup(html, self._brewery_home_strainer, self.BREWERY_HOME_REGIONS, "Brewery")
+    
+    def _venue_page_soup(self, html: str) -> BeautifulSoup:
+        return self._scoped_soup(html, self._venue_page_strainer, self.VENUE_PAGE_REGIONS, "Venue")
+    
+    def _scoped_soup(self, html: str, strainer: SoupStrainer, regions: list, page: str) -> BeautifulSoup:
+        if not self.scoped_parsing:
+            return self.parse_html(html)
+        
+        # Fall back to a full parse if a region is missing from the page
+        soup = self.parse_html(html, parse_only=strainer)
+        if not has_regions(soup, regions):
+            print(f"{page} page regions not found, parsing the whole page")
+            soup = self.parse_html(html)
+        return soup
+    
+    def _tr_page_breweries(self, soup: BeautifulSoup, country_slug: str) -> list[dict] | None:
+        # None if the TR page has no breweries for this country and brewery_type
+        if self.__empty_content(soup, endpoint_name="brewery"):
+            return None
+        return self._brewery_baseinfo_from_tr_page(soup, country_slug)
+    
+    async def _aparse_tr_page(self, res: httpx.Response, country_slug: str) -> list[dict] | None:
+        if self.parse_pool is None:
+            return self._tr_page_breweries(self.parse_html(self.parse_response(res)), country_slug)
+        with self.metrics.span("parse_pool", page="top_rated"):
+            return await self.parse_pool.run(parse_tr_page, res.content, country_slug)
+    
+    async def _aparse_brewery_home(self, res: httpx.Response) -> BreweryDetails:
+        # Event loop keeps fetching while a worker process parses the page
+        if self.parse_pool is None:
+            return self._brewery_details_from_home_page(self._brewery_home_soup(self.parse_response(res)))
+        with self.metrics.span("parse_pool", page="brewery"):
+            return await self.parse_pool.run(parse_brewery_home, res.content)
+    
+    async def _aparse_venue_page(self, res: httpx.Response, venue_id: int) -> Venue:
+        if self.parse_pool is None:
+            return self._venue_from_page(self._venue_page_soup(self.parse_response(res)), venue_id)
+        with self.metrics.span("parse_pool", page="venue"):
+            return await self.parse_pool.run(parse_venue_page, res.content, venue_id)
+    
+    def _brewery_details_from_home_page(self, soup: BeautifulSoup) -> BreweryDetails:
+        # Sidebar info from main page (locations, top beers, popular locations)
+        brewery_details = BreweryDetails(
+            description=self._brewery_description(soup),
+            checkin_stats=self._brewery_checkin_stats(soup),
+            brewery_locations=self._brewery_locations(soup),
+            top_beers=self._brewery_top_beers(soup),
+            all_beers=[],    # TODO GET ALL BEERS FOR A BREWERY
+            popular_locations=self._brewery_popular_locations(soup),
+        )
+        return brewery_details
                     
     #TODO GET DATA FROM THE BREWERY PAGE     
     def get_brewery_details(self, brewery_id: str, detailed_checkins: bool=False) -> Brewery:
@@ -292,30 +822,177 @@ class UntappdWebMiner(UntappdMiner):
         # Get the base page for a given brewery
         url = self.BASE_URL + f"/{brewery_id}"
         headers = {"User-Agent": self._user_agent}
-        response = self.fetch_url(url=url, headers=headers)
-        html = self.parse_response(response)
+        soup = self.fetch_soup(url=url, headers=headers)
              
         # TODO get 
         
         
     
-    #TODO GET DATA FROM THE VENUE PAGE
-    def get_venue_details(self, venue_id: int) -> Venue:
-        pass
+    def get_venue_details(self, venue_id: int | str) -> Venue:
+        # Numeric id, or the "/v/slug/id" href of a brewery sidebar
+        href = venue_id if isinstance(venue_id, str) else self.VENUE_ENDPOINT.format(venue_id=venue_id)
+        venue_id = venue_id_from_href(href)
+        if venue_id is None:
+            raise ValueError(f"'{href}' is not a venue id or venue url.")
+        
+        headers = {"User-Agent": self._user_agent}
+        res = self.fetch_url(url=self.BASE_URL + href, headers=headers, follow_redirects=True)
+        venue = self._venue_from_page(self._venue_page_soup(self.parse_response(res)), venue_id)
+        self._store_venue(venue)
+        return venue
     
-    #TODO GET DATA 
-    def all_beers_from_brewery(self, brewery_id: int) -> list[Beer]:
-        pass
+    def get_venues(self, breweries: Iterable[Brewery] | None = None, max_concurrency: int = 10) -> dict[int, Venue]:
+        return asyncio.run(self.aget_venues(breweries, max_concurrency))
+    
+    async def aget_venues(
+        self, 
+        breweries: Iterable[Brewery] | None = None, 
+        max_concurrency: int = 10,
+    ) -> dict[int, Venue]:
+        # Venues listed by the brewery pages, each fetched once however many breweries list it
+        if max_concurrency < 1:
+            raise ValueError("'max_concurrency' must be at least 1.")
+        self._load_checkpointed_venues()
+        hrefs = self._venue_hrefs(self.breweries.values() if breweries is None else breweries)
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async with self.async_session():
+            tasks = [self.__avenue(venue_id, href, semaphore) for venue_id, href in hrefs.items()]
+            await asyncio.gather(*tasks)
+        return self.venues
+    
+    def all_beers_from_brewery(self, brewery_id: str, max_concurrency: int = 4) -> list[Beer]:
+        return asyncio.run(self.aall_beers_from_brewery(brewery_id, max_concurrency))
+    
+    async def aall_beers_from_brewery(self, brewery_id: str, max_concurrency: int = 4) -> list[Beer]:
+        if max_concurrency < 1:
+            raise ValueError("'max_concurrency' must be at least 1.")
+        brewery_id = str(brewery_id).strip("/")
+        
+        # First page of the brewery beer list, as served before any "Show More"
+        url = self.BASE_URL + f"/{brewery_id}" + "/beer"
+        headers = {"User-Agent": self._user_agent}
+        async with self.async_session():
+            response = await self.afetch_url(url=url, headers=headers)
+            html = self.parse_response(response)
+            soup = self.parse_html(html)
+            beers = self._beers_from_beer_list(soup, brewery_id)
+            brewery_num_id = self.__brewery_num_id(soup, html)
+            
+            if brewery_num_id is None:
+                print(f"No paginated endpoint found for {brewery_id}, falling back to selenium")
+                beers = await asyncio.to_thread(self.__all_beers_with_webdriver, brewery_id)
+            elif self._count_beer_items(soup) >= self.BEER_LIST_PAGE_SIZE:    # Shorter lists fit on one page
+                try:
+                    beers += await self.__amore_beers(brewery_id, brewery_num_id, max_concurrency)
+                except (httpx.HTTPError, ValueError) as e:
+                    print(f"Paginated beer list failed for {brewery_id} ({e}), falling back to selenium")
+                    beers = await asyncio.to_thread(self.__all_beers_with_webdriver, brewery_id)
+        
+        # Same beer can be listed twice if the list moved between pages
+        unique_beers = {}
+        for beer in beers:
+            unique_beers.setdefault(beer.id_url, beer)
+        for beer in unique_beers.values():
+            self._store_beer(beer)
+        return list(unique_beers.values())
     
     #TODO GET DATA FROM THE BEER PAGE
     def get_beer_details(self, beer_id: int) -> Beer:
         pass
     
-    # TODO GET LAST X ratings for a beer  
-    def get_all_beer_ratings(self, beer_id: int) -> list[dict]:
-        pass
+    def get_all_beer_ratings(self, beer_id: int, max_pages: int | None = None) -> list[BeerRating]:
+        return asyncio.run(self.aget_all_beer_ratings(beer_id, max_pages))
     
-    def _get_countries_slug(self, endpoint: str) -> list[str]:
+    async def aget_all_beer_ratings(self, beer_id: int, max_pages: int | None = None) -> list[BeerRating]:
+        # Newest first, pages back until the high-water mark of the archive (or the first checkin)
+        if max_pages is not None and max_pages < 1:
+            raise ValueError("'max_pages' must be at least 1.")
+        beer_id = int(beer_id)
+        archive = self.rating_archive
+        mark = archive.mark(beer_id) if archive is not None else None
+        cursor = archive.cursor(beer_id) if archive is not None else None
+        
+        headers = {"User-Agent": self._user_agent}
+        if cursor is None:
+            url = self.BASE_URL + self.BEER_ENDPOINT.format(bid=beer_id)
+            newest = None    # (checkin id, checkin time) of the first page, the next mark
+            oldest = None
+        else:
+            # Resume a backfill stopped by max_pages below the oldest checkin it fetched
+            oldest, newest_id, newest_time = cursor
+            newest = (newest_id, newest_time)
+            url = self.BASE_URL + self.BEER_FEED_ENDPOINT.format(bid=beer_id, max_id=oldest)
+        new_checkins = []
+        pages = 0
+        complete = False
+        async with self.async_session():
+            while max_pages is None or pages < max_pages:
+                res = await self.afetch_url(url=url, headers=headers, follow_redirects=True)
+                checkins = self._checkins_from_feed(self.parse_html(self.parse_response(res)))
+                pages += 1
+                if newest is None and checkins:
+                    checkin_id, r = max(checkins, key=lambda c: c[0])
+                    newest = (checkin_id, r.checkin_time)
+                
+                # Stored page by page, an interrupted backfill keeps what it fetched
+                fresh = [(checkin_id, r) for checkin_id, r in checkins if mark is None or checkin_id > mark]
+                if archive is not None:
+                    archive.append(beer_id, fresh)
+                new_checkins += fresh
+                if not checkins or len(fresh) < len(checkins):
+                    complete = True
+                    break
+                oldest = min(checkin_id for checkin_id, _ in checkins)
+                url = self.BASE_URL + self.BEER_FEED_ENDPOINT.format(bid=beer_id, max_id=oldest)
+        
+        # Mark only moves once the feed was read down to the previous mark,
+        # a harvest stopped by max_pages leaves a cursor the next run resumes from
+        if archive is not None and newest is not None:
+            if complete:
+                archive.set_mark(beer_id, *newest)
+                archive.clear_cursor(beer_id)
+            else:
+                archive.set_cursor(beer_id, oldest, *newest)
+        self.metrics.inc("ratings", len(new_checkins))
+        return [r for _, r in new_checkins]
+    
+    def harvest_ratings(
+        self, 
+        beer_ids: Iterable[int] | None = None, 
+        max_concurrency: int = 4, 
+        max_pages: int | None = None,
+    ) -> dict[int, int]:
+        return asyncio.run(self.aharvest_ratings(beer_ids, max_concurrency, max_pages))
+    
+    async def aharvest_ratings(
+        self, 
+        beer_ids: Iterable[int] | None = None, 
+        max_concurrency: int = 4, 
+        max_pages: int | None = None,
+    ) -> dict[int, int]:
+        # New ratings per beer (all of self.beers by default), cost follows the activity since the last run
+        if self.rating_archive is None:
+            raise RuntimeError("harvest_ratings needs a rating_archive to keep the ratings and marks.")
+        if max_concurrency < 1:
+            raise ValueError("'max_concurrency' must be at least 1.")
+        beer_ids = [beer.bid for beer in self.beers.values()] if beer_ids is None else beer_ids
+        
+        semaphore = asyncio.Semaphore(max_concurrency)    # Beers in parallel, each feed in order
+        
+        async def harvest_one(bid: int) -> tuple[int, int | None]:
+            async with semaphore:
+                try:
+                    return bid, len(await self.aget_all_beer_ratings(bid, max_pages))
+                except httpx.HTTPError as e:
+                    print(f"Ratings of beer {bid} not harvested: {e}")
+                    return bid, None
+        
+        async with self.async_session():
+            results = await asyncio.gather(*(harvest_one(bid) for bid in dict.fromkeys(beer_ids)))
+        return {bid: n for bid, n in results if n is not None}
+    
+    def _get_countries_slug(self, endpoint: str, soup: BeautifulSoup | None = None) -> list[str]:
         # Validate and construct endpoint 0=beer 1=brewery
         if endpoint not in self.ENDPOINT_TR_NAMES:
             raise ValueError(f"'endpoint' must be one of {self.ENDPOINT_TR_NAMES}")
@@ -326,13 +1003,12 @@ class UntappdWebMiner(UntappdMiner):
         if endpoint == self.ENDPOINT_TR_NAMES[1]:
             url = self.BASE_URL + self.BREWERY_TR_ENDPOINT
         
-        # Get source from given endpoint
-        headers = {"User-Agent": self._user_agent}
-        response = self.fetch_url(url=url, headers=headers)
-        html = self.parse_response(response)
+        # Get source from given endpoint unless already parsed
+        if soup is None:
+            headers = {"User-Agent": self._user_agent}
+            soup = self.fetch_soup(url=url, headers=headers)
         
         # Fetch countries from endpoint
-        soup = BeautifulSoup(html, "html.parser")
         selecter_country_id = soup.find(id="sort_picker")
 
         countries = []
@@ -341,16 +1017,19 @@ class UntappdWebMiner(UntappdMiner):
                 countries.append(option["data-value-slug"])
         return countries
     
-    def _get_brewery_type_slug(self, exclude_cider_mead: bool = False) -> list[str]:
+    def _get_brewery_type_slug(
+        self, 
+        exclude_cider_mead: bool = False, 
+        soup: BeautifulSoup | None = None,
+    ) -> list[str]:
         url = self.BASE_URL + self.BREWERY_TR_ENDPOINT
         
-        # Get source from given endpoint
-        headers = {"User-Agent": self._user_agent}
-        response = self.fetch_url(url=url, headers=headers)
-        html: str = self.parse_response(response)
+        # Get source from given endpoint unless already parsed
+        if soup is None:
+            headers = {"User-Agent": self._user_agent}
+            soup = self.fetch_soup(url=url, headers=headers)
         
         # Fetch brewerytypes from endpoint
-        soup = BeautifulSoup(html, "html.parser")
         selecter_btypes = soup.find(id="filter_picker")
 
         brewery_types = []
@@ -362,10 +1041,12 @@ class UntappdWebMiner(UntappdMiner):
             brewery_types = [btype for btype in brewery_types if btype not in ["cidery", "meadery"]]
         return brewery_types
     
-    def _brewery_baseinfo_from_tr_page(self, soup: BeautifulSoup, country_slug: str) -> dict[int|float|str]:
+    @timed("extract")
+    def _brewery_baseinfo_from_tr_page(self, soup: BeautifulSoup, country_slug: str) -> list[dict[int|float|str]]:
         # Format in readable name
-        country_name = self.__country_name_from_slug(country_slug)
+        country_name = self.lookups.country_name(country_slug)
         
+        breweries_data = []
         beer_items = soup.find_all("div", {"class": "beer-item"})
         for bi in beer_items:
             # Get the TopRated data first
@@ -379,14 +1060,7 @@ class UntappdWebMiner(UntappdMiner):
             # Geography can be city, region country or city, country or country
             pstyle = bi.find_all("p", {"class": "style"})
             geography = pstyle[0].text.strip()
-            brewery_data_dict["city"] = geography.split(",")[0].strip() if "," in geography else None
-            region_country_temp = geography.split(",")[1].strip() if "," in geography else geography
-            region_temp = region_country_temp.split(" ") if " " in region_country_temp else None
-            if region_temp is not None:
-                region_temp = self.__remove_rightmost_country(country_name, region_temp)
-                brewery_data_dict["region"] = " ".join(region_temp)
-            else:
-                brewery_data_dict["region"] = None
+            brewery_data_dict["city"], brewery_data_dict["region"] = parse_geography(geography, country_name)
             brewery_data_dict["country"] = country_name
             brewery_data_dict["brewery_type"] = pstyle[1].text.strip()
             
@@ -398,8 +1072,10 @@ class UntappdWebMiner(UntappdMiner):
             brewery_data_dict["total_ratings"] = int(num_ratings_temp.split(" ")[0].replace(",", ""))
             div_rating = bi.find("div", {"class": "rating"})
             brewery_data_dict["weight_avg_ratings"] = float(div_rating.find("div", {"class": "caps"}).attrs["data-rating"])
-        return brewery_data_dict
+            breweries_data.append(brewery_data_dict)
+        return breweries_data
     
+    @timed("extract")
     def _brewery_description(self, soup: BeautifulSoup) -> str:
         # Long-form description
         lf_description = soup.find(
@@ -407,6 +1083,7 @@ class UntappdWebMiner(UntappdMiner):
         ).text.strip().removesuffix(" Show Less")
         return lf_description
     
+    @timed("extract")
     def _brewery_checkin_stats(self, soup: BeautifulSoup) -> BreweryCheckinStats:
         stats_div = soup.find_all("div", {"class": "stats"})
         stats_p = stats_div[0].find_all("p")
@@ -431,6 +1108,7 @@ class UntappdWebMiner(UntappdMiner):
                 )
         return brewery_checkin_stats
     
+    @timed("extract")
     def _brewery_locations(self, soup: BeautifulSoup) -> list[str] | list[Venue]:
         # Sidebar content with locations
         h3 = soup.find("h3", text="Brewery Locations")
@@ -442,6 +1120,7 @@ class UntappdWebMiner(UntappdMiner):
         
         return hrefs
     
+    @timed("extract")
     def _brewery_top_beers(self, soup: BeautifulSoup) -> list[str] | list[Beer]: 
         # Sidebar content with top beers
         h3 = soup.find("h3", text="Top Beers")
@@ -453,6 +1132,7 @@ class UntappdWebMiner(UntappdMiner):
         
         return hrefs
     
+    @timed("extract")
     def _brewery_popular_locations(self, soup: BeautifulSoup) -> list[str] | list[Venue]:
         # Sidebar content with popular locations
         h3 = soup.find("h3", text="Popular Locations")
@@ -463,27 +1143,205 @@ class UntappdWebMiner(UntappdMiner):
         hrefs = [link.get("href") for link in links if link is not None]
         return hrefs
     
+    def _venue_from_page(self, soup: BeautifulSoup, venue_id: int) -> Venue:
+        header = soup.find("div", {"class": "venue-header"})
+        name, details = self._venue_name(header)
+        adress, map_url = self._venue_address(header)
+        venue = Venue(
+            id_venue=venue_id,
+            name=name,
+            adress=adress,
+            map_url=map_url,
+            is_verified=header.find(class_="verified") is not None,
+            details=details,
+            stats=self._venue_checkin_stats(soup),
+            loyal_patrons=self._venue_loyal_patrons(soup),
+            num_beers_on_menu=self.__number_from_p(soup.find("div", {"class": "menu-header"}), "count", int),
+        )
+        return venue
+    
+    @timed("extract")
+    def _venue_name(self, header: BeautifulSoup) -> tuple[str, list[str]]:
+        # Name and categories, e.g. "Bar, Beer Store"
+        name = header.find("h1").text.strip()
+        h2 = header.find("h2")
+        categories = [c.strip() for c in h2.text.split(",") if c.strip()] if h2 is not None else []
+        return name, categories
+    
+    @timed("extract")
+    def _venue_address(self, header: BeautifulSoup) -> tuple[str | None, str | None]:
+        p = header.find("p", {"class": "address"})
+        if p is None:
+            return None, None
+        
+        # Street address is the text around the map link
+        adress = " ".join(s.strip() for s in p.find_all(string=True, recursive=False) if s.strip())
+        link = p.find("a")
+        return adress or None, link.get("href") if link is not None else None
+    
+    @timed("extract")
+    def _venue_checkin_stats(self, soup: BeautifulSoup) -> CheckinStats:
+        counts = {}
+        for p in soup.find("div", {"class": "stats"}).find_all("p"):
+            spans = p.find_all("span")
+            counts[spans[0].text.strip()] = int(spans[1].text.replace(",", ""))
+        return CheckinStats(
+            total=counts.get("Total"),
+            unique=counts.get("Unique"),
+            monthly=counts.get("Monthly"),
+            current_user=counts.get("You"),
+        )
+    
+    @timed("extract")
+    def _venue_loyal_patrons(self, soup: BeautifulSoup) -> list[str]:
+        # Sidebar box of the venue regulars, user ids for the /user/id endpoint
+        h3 = soup.find("h3", string="Loyal Patrons")
+        if h3 is None:
+            return []
+        patrons = []
+        for div in h3.find_next_siblings("div"):
+            link = div.find("a", href=re.compile(r"^/user/"))
+            if link is not None:
+                patrons.append(link.get("href").removeprefix("/user/").strip("/"))
+        return patrons
+    
+    @timed("extract")
+    def _checkins_from_feed(self, soup: BeautifulSoup) -> list[tuple[int, BeerRating]]:
+        # (checkin id, rating) of an activity feed page or "Show More" fragment, newest first
+        checkins = []
+        for item in soup.find_all("div", attrs={"data-checkin-id": True}):
+            user = item.find("a", {"class": "user"})
+            text = item.find("p", {"class": "text"})
+            venue = text.find("a", href=re.compile(r"^/v/")) if text is not None else None
+            serving = item.find(class_="serving")
+            comment = item.find("p", {"class": "comment-text"})
+            purchased = item.find("p", {"class": "purchased"})
+            purchased = purchased.find("a") if purchased is not None else None
+            tagged = item.find("div", {"class": "tagged-friends"})
+            checkin_time = self.__checkin_time(item.find("a", {"class": "time"}))
+            if user is None or checkin_time is None:
+                continue
+            rating = BeerRating(
+                user_id=user.get("href").removeprefix("/user/").strip("/"),
+                checkin_venue=venue.get("href") if venue is not None else None,
+                serving_type=(serving.text.strip() or None) if serving is not None else None,
+                comment=comment.text.strip() if comment is not None else "",
+                purchased_at=purchased.get("href") if purchased is not None else None,
+                number_tagged_friends=len(tagged.find_all("a")) if tagged is not None else 0,
+                has_picture=item.find(class_="photo") is not None,
+                checkin_time=checkin_time,
+            )
+            checkins.append((int(item.attrs["data-checkin-id"]), rating))
+        return checkins
+    
     def _beer_baseinfo_from_tr_page(self, html: str) -> dict:
         pass
     
-    def _brewery_all_beers(self, brewery_endpoint: str) -> list[Beer]:
+    @timed("extract")
+    def _beers_from_beer_list(self, soup: BeautifulSoup, brewery_id: str) -> list[Beer]:
+        # Beer items of a brewery beer list page or of a "Show More" fragment
+        beers = []
+        for bi in soup.find_all("div", {"class": "beer-item"}):
+            pname = bi.find("p", {"class": "name"})
+            if pname is None or pname.find("a") is None:
+                continue
+            id_url = pname.find("a").attrs["href"].strip()
+            bid = id_url.rstrip("/").rsplit("/", 1)[-1]
+            if not bid.isdigit():
+                print(f"Skipping beer item without a numeric id: {id_url}")
+                continue
+            pstyle = bi.find("p", {"class": "style"})
+            div_details = bi.find("div", {"class": "details"})
+            div_caps = bi.find("div", {"class": "caps"})
+            
+            beers.append(Beer(
+                id_url=id_url,
+                bid=int(bid),
+                brewery_id=brewery_id,
+                name=pname.text.strip(),
+                style=pstyle.text.strip() if pstyle is not None else None,
+                abv=self.__number_from_p(div_details, "abv", float),
+                ibu=self.__number_from_p(div_details, "ibu", int),
+                weight_avg_ratings=float(div_caps.attrs["data-rating"]) if div_caps is not None else None,
+                total_ratings=self.__number_from_p(div_details, "raters", int),
+                date_added=self.__date_from_p(div_details, "date"),
+                details=None,    # Filled by get_beer_details
+            ))
+        return beers
+    
+    def _count_beer_items(self, soup: BeautifulSoup) -> int:
+        # Listed items, skipped ones included, tell a full page from the last one
+        return len(soup.find_all("div", {"class": "beer-item"}))
+    
+    def _brewery_all_beers(self, brewery_endpoint: str) -> str:
         # brewery_beer_url = self.BASE_URL + brewery_url + "/beer"
         # headers = {"User-Agent": self._user_agent}
         # response = self.fetch_url(url=brewery_beer_url, headers=headers)
         
-        # Naviguate to brewery beer page
-        driver = self.__init_webdriver_login(headless_mode=False)
+        # Naviguate to brewery beer page with a pooled logged-in driver
         url = self.BASE_URL + f"/{brewery_endpoint}" + "/beer"
-        self.__webdriver_navigate(driver, url)
-        
-        # load all beers client-side "show-more" button
-        html = self._load_all_beers(driver)
+        with self._get_webdriver_pool().session() as driver:
+            self.__webdriver_navigate(driver, url)
+            
+            # load all beers client-side "show-more" button
+            html = self._load_all_beers(driver)
+        return html
+    
+    def _get_webdriver_pool(self) -> WebDriverPool:
+        if self.webdriver_pool is None:
+            self.webdriver_pool = WebDriverPool(factory=self.__new_webdriver_session)
+        return self.webdriver_pool
+    
+    def close_webdrivers(self) -> None:
+        if self.webdriver_pool is not None:
+            self.webdriver_pool.close()
+            self.webdriver_pool = None
+    
+    def close(self) -> None:
+        self.close_webdrivers()
+        super().close()
         
-        with open("test_beers.html", "w") as f:
-            f.write(html)
-        driver.quit()
+    async def __amore_beers(
+        self, 
+        brewery_id: str, 
+        brewery_num_id: str, 
+        max_concurrency: int,
+    ) -> list[Beer]:
+        # Fetch "Show More" offsets in waves until a short or empty page
+        headers = {"User-Agent": self._user_agent, "X-Requested-With": "XMLHttpRequest"}
+        page_size = self.BEER_LIST_PAGE_SIZE
+        beers = []
+        offset = page_size
+        while True:
+            offsets = [offset + i * page_size for i in range(max_concurrency)]
+            responses = await asyncio.gather(*[
+                self.afetch_url(
+                    url=self.BASE_URL + self.MORE_BEER_ENDPOINT.format(brewery_num_id=brewery_num_id, offset=o),
+                    headers=headers
+                )
+                for o in offsets
+            ])
+            for response in responses:
+                fragment = self.parse_response(response)
+                if not isinstance(fragment, str):
+                    raise ValueError("Unexpected content for the paginated beer list.")
+                page_soup = self.parse_html(fragment)
+                beers += self._beers_from_beer_list(page_soup, brewery_id)
+                if self._count_beer_items(page_soup) < page_size:
+                    return beers
+            offset = offsets[-1] + page_size
+    
+    def __all_beers_with_webdriver(self, brewery_id: str) -> list[Beer]:
+        html = self._brewery_all_beers(brewery_id)
+        return self._beers_from_beer_list(self.parse_html(html), brewery_id)
+    
+    @timed("selenium")
+    def _load_all_beers(self, driver: "webdriver.Firefox") -> str:
+        from selenium.common.exceptions import NoSuchElementException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
         
-    def _load_all_beers(self, driver: webdriver) -> str:
         while True:
             try:
                 # Popup or obscuring ele blocking button
@@ -516,23 +1374,21 @@ class UntappdWebMiner(UntappdMiner):
     def __ua_setter_on_init(self, ua_init: str | None) -> str:
         # Set default otherwise pick from .env
         if ua_init is None and self.parse_dotenv(self._dotenv_file, "USER_AGENT") is None:
-            ua = "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/119.0"
+            ua = self.DEFAULT_USER_AGENT
         elif ua_init is None:
             ua = self.parse_dotenv(self._dotenv_file, "USER_AGENT")
         else:    # Hardcoded ua
             ua = ua_init
         return ua
     
-    def __empty_content(self, html: str, endpoint_name: str) -> bool:
-        if html == "" or html is None:
+    def __empty_content(self, soup: BeautifulSoup, endpoint_name: str) -> bool:
+        if soup is None or not soup.contents:
             raise ValueError(f"Empty content for endpoint: {endpoint_name}")
         
         if endpoint_name not in self.ENDPOINT_TR_NAMES:
             raise ValueError(f"'endpoint' must be one of {self.ENDPOINT_TR_NAMES}")
         
         # Check content according to toprated endpoint 0=beer 1=brewery
-        soup = BeautifulSoup(html, "html.parser")
-        
         # TODO Figure out what the empty ocntent of beers would be
         if endpoint_name == self.ENDPOINT_TR_NAMES[0]:
             pass
@@ -540,18 +1396,189 @@ class UntappdWebMiner(UntappdMiner):
             ptags = soup.find_all("p", attrs={"class": "no-activity"})
             return len(ptags) > 0    # presence no-activity p-tag means empty content
     
-    def __country_name_from_slug(self, slug: str) -> str:
-        country_name = " ".join(slug.split("-")).title()
-        return country_name
+    def __brewery_from_home_page(self, brewery_data_dict: dict, seen_ids: set[str]) -> Brewery | None:
+        id_url = brewery_data_dict["id_url"]
+        if id_url in self.breweries or id_url in seen_ids:
+            return None
+        seen_ids.add(id_url)
+        if not self._checkpoint_claim(BREWERY, id_url):
+            return None
+        
+        # Unchanged breweries keep the details of the previous snapshot
+        details = self._unchanged_brewery_details(brewery_data_dict)
+        if details is not None:
+            brewery_data = Brewery(**brewery_data_dict, details=details)
+            self._record_brewery(brewery_data, fetched=False)
+            return brewery_data
+        
+        # Fetch brewery page to populate details
+        try:
+            brewery_data = self._brewery_from_baseinfo(brewery_data_dict)
+        except (httpx.HTTPError, AttributeError, TypeError, ValueError) as e:
+            # A page missing a sidebar box fails that brewery only
+            self._checkpoint_failed(BREWERY, id_url, e)
+            return None
+        self._record_brewery(brewery_data, fetched=True)
+        return brewery_data
+    
+    async def __aproduce(self, tasks: list, queue: asyncio.Queue) -> None:
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Wake up the consumer, if the queue is full it will see the producer is done
+            try:
+                queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+    
+    async def __atr_page_breweries(
+        self, 
+        c_slug: str, 
+        btype: str, 
+        semaphore: asyncio.Semaphore, 
+        queue: asyncio.Queue,
+        pending_ids: set[str],
+    ) -> None:
+        page_key = f"{c_slug}/{btype}"
+        if not self._checkpoint_claim(TR_PAGE, page_key):
+            return
+        
+        # Per country and brewery_type request
+        url = self.BASE_URL + self.BREWERY_TR_ENDPOINT
+        headers = {"User-Agent": self._user_agent}
+        params = {"country": c_slug, "brewery_type": btype}
+        try:
+            async with semaphore:
+                res = await self.afetch_url(url=url, headers=headers, params=params)
+                breweries_data = await self._aparse_tr_page(res, c_slug)
+        except httpx.HTTPError as e:
+            self._checkpoint_failed(TR_PAGE, page_key, e)
+            return
+        
+        # Skip if content is empty
+        if breweries_data is None:
+            print(f"Empty content for country: {c_slug} and brewery_type: {btype}")
+            self._checkpoint_tr_page(page_key, [])
+            return
+        
+        # Fan out brewery pages not already mined or scheduled
+        self._checkpoint_tr_page(page_key, breweries_data)
+        tasks = [
+            self.__abrewery_from_home_page(brewery_data_dict, semaphore, queue, pending_ids)
+            for brewery_data_dict in breweries_data
+        ]
+        await asyncio.gather(*tasks)
     
-    def __remove_rightmost_country(self, country_name: str, state_country_list: list[str]) -> list[str]:
-        scl_reversed = state_country_list[::-1]
-        if country_name in scl_reversed:
-            scl_reversed.remove(country_name)
-        scl_normal = scl_reversed[::-1]
-        return scl_normal
+    async def __abrewery_from_home_page(
+        self, 
+        brewery_data_dict: dict, 
+        semaphore: asyncio.Semaphore,
+        queue: asyncio.Queue,
+        pending_ids: set[str],
+    ) -> None:
+        # Skip breweries already mined or scheduled
+        id_url = brewery_data_dict["id_url"]
+        if id_url in self.breweries or id_url in pending_ids:
+            return
+        pending_ids.add(id_url)
+        if not self._checkpoint_claim(BREWERY, id_url):
+            return
+        
+        # Unchanged breweries keep the details of the previous snapshot
+        details = self._unchanged_brewery_details(brewery_data_dict)
+        if details is not None:
+            brewery_data = Brewery(**brewery_data_dict, details=details)
+            self._record_brewery(brewery_data, fetched=False)
+            await queue.put(brewery_data)
+            return
+        
+        # Fetch brewery page to populate details
+        brew_url = self.BASE_URL + id_url
+        headers = {"User-Agent": self._user_agent}
+        async with semaphore:
+            try:
+                brew_resp = await self.afetch_url(url=brew_url, headers=headers)
+                details = await self._aparse_brewery_home(brew_resp)
+            except (httpx.HTTPError, AttributeError, TypeError, ValueError) as e:
+                # A page missing a sidebar box fails that brewery only
+                self._checkpoint_failed(BREWERY, id_url, e)
+                return
+            brewery_data = Brewery(**brewery_data_dict, details=details)
+            self._record_brewery(brewery_data, fetched=True)
+            
+            # Hold the slot until handed over so a full queue stops fetching
+            await queue.put(brewery_data)
     
-    def __init_webdriver_login(self, headless_mode: bool=True) -> webdriver:
+    async def __avenue(self, venue_id: int, href: str, semaphore: asyncio.Semaphore) -> None:
+        # Frontier claim keeps the venue from being fetched again by a resumed or parallel crawl
+        if not self._checkpoint_claim(VENUE, str(venue_id)):
+            return
+        headers = {"User-Agent": self._user_agent}
+        async with semaphore:
+            try:
+                res = await self.afetch_url(url=self.BASE_URL + href, headers=headers, follow_redirects=True)
+                venue = await self._aparse_venue_page(res, venue_id)
+            except (httpx.HTTPError, AttributeError, TypeError, ValueError) as e:
+                # A page without the venue header (removed or private venue) fails that venue only
+                self._checkpoint_failed(VENUE, str(venue_id), e)
+                return
+        self._record_venue(venue)
+    
+    def __brewery_num_id(self, soup: BeautifulSoup, html: str) -> str | None:
+        # Numeric id used by the "Show More" endpoint
+        tag = soup.find(attrs={"data-brewery-id": True})
+        if tag is not None:
+            return tag.attrs["data-brewery-id"]
+        match = re.search(r"more_beer/(\d+)", html)
+        return match.group(1) if match is not None else None
+    
+    def __number_from_p(self, div: BeautifulSoup | None, p_class: str, cast: type) -> int | float | None:
+        # e.g. "6.5% ABV", "1,234 Ratings", "N/A IBU"
+        p = div.find("p", {"class": p_class}) if div is not None else None
+        if p is None:
+            return None
+        value = p.text.strip().split(" ")[0].replace(",", "").rstrip("%")
+        try:
+            return cast(value)
+        except ValueError:
+            return None
+    
+    def __date_from_p(self, div: BeautifulSoup | None, p_class: str) -> date | None:
+        # e.g. "Added 01/15/20"
+        p = div.find("p", {"class": p_class}) if div is not None else None
+        if p is None:
+            return None
+        value = p.text.strip().removeprefix("Added").strip()
+        for fmt in ("%m/%d/%y", "%m/%d/%Y", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        return None
+    
+    def __checkin_time(self, link: BeautifulSoup | None) -> datetime | None:
+        # e.g. "Sat, 14 Oct 2023 20:11:08 +0000"
+        if link is None:
+            return None
+        try:
+            return datetime.strptime(link.text.strip(), "%a, %d %b %Y %H:%M:%S %z")
+        except ValueError:
+            return None
+    
+    def __refresh_lookups_quietly(self) -> None:
+        # Runs during a crawl, the outcome goes to the metrics rather than the crawl output
+        try:
+            self.refresh_lookups()
+            self.metrics.inc("lookups_refresh", result="ok")
+        except (httpx.HTTPError, ValueError):
+            self.metrics.inc("lookups_refresh", result="error")    # The previous tables are kept
+    
+    def __init_webdriver_login(self, headless_mode: bool=True) -> "webdriver.Firefox":
+        # Selenium (~0.25s to import) is only loaded when a browser is launched
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.firefox.options import Options
+        
         # launch configuration
         options = Options()
         if headless_mode:
@@ -577,7 +1604,8 @@ class UntappdWebMiner(UntappdMiner):
         # Solve CAPTCHA by manually
         catpcha_timelimit = 15
         print("Solve CAPTCHA by manually user...")
-        time.sleep(catpcha_timelimit)
+        with self.metrics.span("captcha_wait"):
+            time.sleep(catpcha_timelimit)
 
         #! NOT WORKING AS EXPECTED TO LISTEN TO CAPTCHA BIENG COMPLETED
         # # Switch to the iframe
@@ -613,7 +1641,17 @@ class UntappdWebMiner(UntappdMiner):
             raise ValueError("Error clicking login button.")  
         return driver
         
-    def __webdriver_navigate(self, driver: webdriver, url: str) -> None:
+    def __new_webdriver_session(self) -> "webdriver.Firefox":
+        # Logged-in cookies also let httpx fetch pages that need an account
+        driver = self.__init_webdriver_login(headless_mode=self.headless_webdriver)
+        n_cookies = export_cookies(driver, self.client)
+        print(f"Exported {n_cookies} session cookies to the httpx client")
+        return driver
+    
+    @timed("selenium")
+    def __webdriver_navigate(self, driver: "webdriver.Firefox", url: str) -> None:
+        from selenium.common.exceptions import WebDriverException
+        
         print(f"Navigating to selenium webdriver to {url}...")
         try:
             driver.get(url)
@@ -0,0 +1,162 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+import queue
+import threading
+import time
+
+import httpx
+
+
+@dataclass
+class WebDriverSession():
+    driver: object    # selenium WebDriver, logged in
+    created_at: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+@dataclass
+class PoolStats():
+    launched: int = 0
+    reused: int = 0
+    recycled: int = 0
+
+
+class WebDriverPool:
+    def __init__(
+        self,
+        factory: Callable[[], object],
+        size: int = 2,
+        max_uses: int = 100,
+        max_age: float = 3600,
+        acquire_timeout: float | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError("'size' must be at least 1.")
+        self.factory = factory    # Launches and logs in a new driver
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.acquire_timeout = acquire_timeout
+        self.stats = PoolStats()
+        self._idle: queue.LifoQueue[WebDriverSession] = queue.LifoQueue()
+        self._open = 0    # sessions launched and not quit, idle or in use
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> "WebDriverPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @contextmanager
+    def session(self) -> Iterator[object]:
+        # Borrow a healthy logged-in driver, a driver that raised is not returned
+        from selenium.common.exceptions import WebDriverException
+        
+        session = self._acquire()
+        try:
+            yield session.driver
+        except WebDriverException:
+            self._discard(session)
+            raise
+        except BaseException:
+            self._release(session)
+            raise
+        else:
+            self._release(session)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(session)
+
+    def _acquire(self) -> WebDriverSession:
+        if self._closed:
+            raise RuntimeError("WebDriverPool is closed.")
+        while True:
+            # Reuse an idle session first
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                session = None
+            if session is not None:
+                if self._is_healthy(session):
+                    session.uses += 1
+                    self.stats.reused += 1
+                    return session
+                self._discard(session)
+                self.stats.recycled += 1
+                continue
+
+            # Launch a new one if under size, else wait for a release
+            with self._lock:
+                can_launch = self._open < self.size
+                if can_launch:
+                    self._open += 1
+            if can_launch:
+                try:
+                    driver = self.factory()
+                except BaseException:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+                self.stats.launched += 1
+                return WebDriverSession(driver=driver, uses=1)
+            try:
+                session = self._idle.get(timeout=self.acquire_timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No webdriver released within {self.acquire_timeout}s.")
+            self._idle.put(session)
+
+    def _release(self, session: WebDriverSession) -> None:
+        expired = (
+            session.uses >= self.max_uses
+            or time.monotonic() - session.created_at > self.max_age
+        )
+        if self._closed or expired:
+            self._discard(session)
+            if expired:
+                self.stats.recycled += 1
+            return
+        self._idle.put(session)
+
+    def _discard(self, session: WebDriverSession) -> None:
+        from selenium.common.exceptions import WebDriverException
+        
+        with self._lock:
+            self._open -= 1
+        try:
+            session.driver.quit()
+        except WebDriverException:
+            pass    # Already dead
+
+    def _is_healthy(self, session: WebDriverSession) -> bool:
+        from selenium.common.exceptions import WebDriverException
+        
+        if time.monotonic() - session.created_at > self.max_age:
+            return False
+        try:
+            session.driver.current_url    # Round trip to the browser
+        except WebDriverException:
+            return False
+        return True
+
+
+def export_cookies(driver, client: httpx.Client) -> int:
+    # Copy the browser session cookies so plain pages can be fetched with httpx
+    cookies = driver.get_cookies()
+    for cookie in cookies:
+        client.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/")
+        )
+    return len(cookies)